@@ -0,0 +1,417 @@
+"""
+Benchmark suite for the Permit Management GUI
+Runs the dashboard, data views, exports, batch writes and analytics at several
+table sizes and writes the timings as JSON. Backends:
+  fake   - fake_oracledb.py, generated rows and a simulated round-trip (default)
+  oracle - a real database, e.g. a local container built from the phase_4..7 scripts
+Usage: python benchmark.py [--scales 10000 100000 1000000] [--baseline previous.json]
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Benchmark configuration
+BENCH_SCALES = [10000, 100000, 1000000]   # rows in each large table per run
+BENCH_REPEAT = 3            # timed runs per case; the median is reported
+BENCH_TOLERANCE = 0.25      # slower than baseline by more than this fraction is a regression
+BENCH_MIN_DELTA = 0.005     # s; smaller slowdowns are noise, whatever the ratio
+BENCH_SCROLL_JUMPS = 100    # scroll positions visited by the data view scroll case
+BENCH_TOUCHED_ROWS = 50     # rows changed before the incremental refresh case
+BENCH_DASHBOARD_HITS = 1000  # cached dashboard reads timed by the warm case
+BENCH_IMPORT_ROWS = 10000   # citizens per file in the import case
+BENCH_IMPORT_REPEATS = 100  # every this many rows the file repeats a citizen of the first run
+BENCH_SUBMIT_ROWS = 10000   # applications per submit case
+BENCH_OUTPUT_DIR = 'benchmarks'
+
+gui = None      # permit_management_gui, imported once the backend is chosen
+tk = None
+
+
+class InlineTasks:
+    """TaskRunner stand-in that runs work on the calling thread, so a case times all of it"""
+
+    pending = []
+
+    def submit(self, work, on_success=None, on_error=None, text=None, group=None):
+        try:
+            result = work()
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(e)
+            return None
+        if on_success:
+            on_success(result)
+        return None
+
+    def cancel_group(self, group):
+        pass
+
+    def set_text(self, text):
+        pass
+
+    def current(self):
+        return None
+
+
+def load_app_class():
+    class BenchmarkApp(gui.PermitManagementApp):
+        """PermitManagementApp without its main window: loaders and screens only"""
+
+        def __init__(self, db, root=None):
+            self.root = root
+            self.db = db
+            self.tasks = InlineTasks()
+            self.dashboard_cache = gui.TTLCache(gui.DASHBOARD_CACHE_TTL)
+            self.content_frame = tk.Frame(root) if root else None
+            if root:
+                self.content_frame.pack(fill=tk.BOTH, expand=True)
+            self.view = None
+
+        def create_data_view(self, title, config):
+            super().create_data_view(title, config)
+            self.view = config['view']
+            self.root.update_idletasks()
+
+    return BenchmarkApp
+
+
+# ---- cases: each returns the number of rows it handled ----
+
+def case_dashboard_cold(ctx):
+    ctx.app.dashboard_cache.invalidate()
+    return len(ctx.app.get_dashboard_stats())
+
+def case_dashboard_warm(ctx):
+    ctx.app.get_dashboard_stats()
+    for _ in range(BENCH_DASHBOARD_HITS):
+        ctx.app.get_dashboard_stats()
+    return BENCH_DASHBOARD_HITS
+
+def view_open(screen):
+    def case(ctx):
+        getattr(ctx.app, screen)()
+        return len(ctx.app.view.tree.get_children())
+    case.needs_display = True
+    return case
+
+def case_view_scroll(ctx):
+    ctx.app.show_applications()
+    view = ctx.app.view
+    total = view.total or 0
+    for step in range(BENCH_SCROLL_JUMPS + 1):
+        view.scroll_to(total * step // BENCH_SCROLL_JUMPS)
+        ctx.root.update_idletasks()
+    return (BENCH_SCROLL_JUMPS + 1) * view.visible
+case_view_scroll.needs_display = True
+
+def case_view_refresh(ctx):
+    ctx.app.show_applications()
+    view = ctx.app.view
+    # only the refresh counts, not opening the screen
+    ctx.db.metrics.reset()
+    if ctx.fake:
+        ctx.fake.reset_counters()
+        ctx.fake.touch('APPLICATION', BENCH_TOUCHED_ROWS)
+    started = time.perf_counter()
+    view.refresh()
+    ctx.root.update_idletasks()
+    ctx.timed_from = started
+    return BENCH_TOUCHED_ROWS
+case_view_refresh.needs_display = True
+
+def case_export_audit_csv(ctx):
+    return gui.export_audit_log(ctx.db, lambda cursor: gui.stream_to_csv(
+        cursor, os.path.join(ctx.folder, 'audit.csv'), header=gui.AUDIT_CSV_HEADER))
+
+def case_export_audit_json(ctx):
+    return gui.export_audit_log(ctx.db, lambda cursor: gui.stream_audit_json(
+        cursor, os.path.join(ctx.folder, 'audit.jsonl')))
+
+def export_all(fmt):
+    def case(ctx):
+        report = gui.ParallelExport(ctx.db, ctx.folder, fmt=fmt).run(gui.EXPORT_TABLES)
+        errors = [entry['error'] for entry in report['tables'] if entry['error']]
+        if errors:
+            raise RuntimeError(errors[0])
+        return report['total_rows']
+    case.parallel = True
+    return case
+
+import_runs = itertools.count()
+
+def case_import_citizens(ctx):
+    # fresh national IDs and emails each run, except every BENCH_IMPORT_REPEATS'th row,
+    # which later runs find already registered
+    run = next(import_runs)
+    path = os.path.join(ctx.folder, f'citizens-{run}.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(gui.CitizenImport.FIELDS)
+        for i in range(BENCH_IMPORT_ROWS):
+            key = 0 if i % BENCH_IMPORT_REPEATS == 0 else run
+            writer.writerow([f'First{i}', f'Last{i}', '1990-05-17', f'2{key:05d}{i:011d}',
+                             f'import{key}.{i}@example.rw', '+250780000000', 'Kigali', 'Citizen'])
+    gui.CitizenImport(ctx.db, path).run()
+    return BENCH_IMPORT_ROWS
+case_import_citizens.writes = True
+
+def case_submit_applications(ctx):
+    citizens = ctx.db.query('export_citizens_bounds')[0][1]
+    permit_types = ctx.db.query('export_permit_types_bounds')[0][1]
+    applications = [(i % citizens + 1, i % permit_types + 1, None, None) for i in range(BENCH_SUBMIT_ROWS)]
+    return len(gui.ApplicationIntake(ctx.db).submit(applications))
+case_submit_applications.writes = True
+
+def case_monthly_revenue(ctx):
+    return len(ctx.db.query('monthly_revenue', {'year': str(datetime.now().year)}))
+
+def case_dept_performance(ctx):
+    return len(ctx.app.load_dept_performance())
+
+def case_top_permits(ctx):
+    return len(ctx.app.load_top_permits())
+
+CASES = [
+    ('dashboard_cold', case_dashboard_cold),
+    ('dashboard_warm', case_dashboard_warm),
+    ('view_open_citizens', view_open('show_citizens')),
+    ('view_open_applications', view_open('show_applications')),
+    ('view_open_audit_logs', view_open('show_audit_logs')),
+    ('view_scroll_applications', case_view_scroll),
+    ('view_refresh_applications', case_view_refresh),
+    ('export_audit_csv', case_export_audit_csv),
+    ('export_audit_json', case_export_audit_json),
+    ('export_all_csv', export_all('csv')),
+    ('export_all_parquet', export_all('parquet')),
+    ('import_citizens', case_import_citizens),
+    ('submit_applications', case_submit_applications),
+    ('analytics_monthly_revenue', case_monthly_revenue),
+    ('analytics_dept_performance', case_dept_performance),
+    ('analytics_top_permits', case_top_permits),
+]
+
+
+class Context:
+    def __init__(self, db, app, root, fake, folder):
+        self.db = db
+        self.app = app
+        self.root = root
+        self.fake = fake
+        self.folder = folder
+        self.timed_from = None
+
+
+def skip_reason(name, case, ctx):
+    if getattr(case, 'needs_display', False) and ctx.root is None:
+        return "no display (run under xvfb-run for the data view cases)"
+    if getattr(case, 'writes', False) and not ctx.fake:
+        return "inserts rows; fake backend only"
+    if name.endswith('_parquet'):
+        if gui.pq is None:
+            return "pyarrow not installed"
+        if ctx.fake:
+            return "fake backend has no DataFrame fetches"
+    return None
+
+def run_case(name, case, ctx, repeat):
+    """Median of repeat runs, with the statement metrics of the median run"""
+    runs = []
+    for _ in range(repeat):
+        ctx.db.metrics.reset()
+        if ctx.fake:
+            ctx.fake.reset_counters()
+        ctx.timed_from = None
+        started = time.perf_counter()
+        rows = case(ctx)
+        seconds = time.perf_counter() - (ctx.timed_from or started)
+
+        statements = ctx.db.metrics.snapshot()
+        run = {
+            'seconds': seconds,
+            'rows': rows,
+            'statements': sum(entry['calls'] for entry in statements),
+            'round_trips': sum(entry['round_trips'] for entry in statements),
+            'bytes_in': sum(entry['bytes_in'] for entry in statements),
+        }
+        if ctx.fake:
+            run['latency_seconds'] = ctx.fake.wait_seconds
+            run['serve_seconds'] = ctx.fake.serve_seconds
+        runs.append(run)
+
+    runs.sort(key=lambda run: run['seconds'])
+    median = runs[len(runs) // 2]
+    result = {
+        'median_s': round(median['seconds'], 4),
+        'min_s': round(runs[0]['seconds'], 4),
+        'runs_s': [round(run['seconds'], 4) for run in runs],
+        'rows': median['rows'],
+        'rows_per_s': round(median['rows'] / median['seconds']) if median['seconds'] else None,
+        'statements': median['statements'],
+        'round_trips': median['round_trips'],
+        'bytes_in': median['bytes_in'],
+    }
+    if ctx.fake:
+        # summed over threads, so only a single-threaded case can subtract them from wall time
+        result['fake_latency_s'] = round(median['latency_seconds'], 4)
+        result['fake_serve_s'] = round(median['serve_seconds'], 4)
+        if not getattr(case, 'parallel', False):
+            result['client_s'] = round(median['seconds'] - median['latency_seconds']
+                                       - median['serve_seconds'], 4)
+    return result
+
+def table_sizes(db):
+    sizes = {}
+    for table, pk, name in gui.EXPORT_TABLES:
+        sizes[table] = db.query(f'export_{name}_bounds')[0][2]
+    return sizes
+
+def run_scale(scale, args):
+    fake = None
+    if args.backend == 'fake':
+        import fake_oracledb
+        fake = fake_oracledb.install(scale, args.latency_ms)
+
+    db = gui.DatabaseManager(gui.DB_CONFIG, metrics=gui.QueryMetrics(slow_log=None))
+    db.pool = db._create_pool()
+    root = make_root()
+    app = load_app_class()(db, root)
+
+    entry = {'scale': scale if fake else None, 'tables': table_sizes(db), 'cases': {}}
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            ctx = Context(db, app, root, fake, folder)
+            for name, case in CASES:
+                if args.cases and not any(pattern in name for pattern in args.cases):
+                    continue
+                reason = skip_reason(name, case, ctx)
+                if reason:
+                    entry['cases'][name] = {'skipped': reason}
+                    print(f"  {name:<30} skipped: {reason}")
+                    continue
+                try:
+                    result = run_case(name, case, ctx, args.repeat)
+                except Exception as e:
+                    entry['cases'][name] = {'error': str(e)}
+                    print(f"  {name:<30} error: {e}")
+                    continue
+                entry['cases'][name] = result
+                print(f"  {name:<30}{result['median_s']:>10.4f} s{result['rows']:>12,} rows"
+                      f"{result['round_trips']:>8,} trips")
+    finally:
+        if root is not None:
+            root.destroy()
+        db.disconnect()
+    return entry
+
+def make_root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    return root
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# ---- regression check ----
+
+def compare(results, baseline, tolerance):
+    """(scale, case, what, baseline, now) for every case that got slower or chattier"""
+    previous = {entry['scale']: entry['cases'] for entry in baseline['scales']}
+    regressions = []
+    for entry in results['scales']:
+        for name, now in entry['cases'].items():
+            before = previous.get(entry['scale'], {}).get(name)
+            if not before or 'median_s' not in before or 'median_s' not in now:
+                continue
+            if (now['median_s'] > before['median_s'] * (1 + tolerance)
+                    and now['median_s'] - before['median_s'] > BENCH_MIN_DELTA):
+                regressions.append((entry['scale'], name, 'median_s', before['median_s'], now['median_s']))
+            if now['round_trips'] > before['round_trips']:
+                regressions.append((entry['scale'], name, 'round_trips', before['round_trips'], now['round_trips']))
+    return regressions
+
+
+def main():
+    global gui, tk
+    parser = argparse.ArgumentParser(description="Permit Management GUI benchmarks")
+    parser.add_argument('--backend', choices=['fake', 'oracle'], default='fake',
+                        help="fake: in-process stand-in driver; oracle: the database in DB_CONFIG or --dsn")
+    parser.add_argument('--scales', type=int, nargs='+', default=BENCH_SCALES,
+                        help="rows per large table for the fake backend (ignored for oracle)")
+    parser.add_argument('--repeat', type=int, default=BENCH_REPEAT)
+    parser.add_argument('--latency-ms', type=float, default=None,
+                        help="simulated round-trip time of the fake backend")
+    parser.add_argument('--cases', nargs='+', help="run only cases whose name contains one of these")
+    parser.add_argument('--dsn')
+    parser.add_argument('--user')
+    parser.add_argument('--password')
+    parser.add_argument('--output', help=f"result file (default {BENCH_OUTPUT_DIR}/<backend>-<timestamp>.json)")
+    parser.add_argument('--baseline', help="earlier result file; exit 1 if any case regressed against it")
+    parser.add_argument('--tolerance', type=float, default=BENCH_TOLERANCE)
+    args = parser.parse_args()
+
+    if args.backend == 'fake':
+        import fake_oracledb
+        if args.latency_ms is None:
+            args.latency_ms = fake_oracledb.FAKE_LATENCY_MS
+        fake_oracledb.install(1, args.latency_ms)     # before the GUI imports oracledb
+    import tkinter
+    import permit_management_gui
+    gui, tk = permit_management_gui, tkinter
+
+    for key in ('dsn', 'user', 'password'):
+        if getattr(args, key):
+            gui.DB_CONFIG[key] = getattr(args, key)
+
+    results = {
+        'suite': 'permit_management_gui',
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'backend': args.backend,
+        'latency_ms': args.latency_ms if args.backend == 'fake' else None,
+        'repeat': args.repeat,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scales': []
+    }
+    for scale in (args.scales if args.backend == 'fake' else [None]):
+        print(f"Scale {scale:,} rows" if scale else "Database as loaded")
+        results['scales'].append(run_scale(scale, args))
+
+    output = args.output or os.path.join(
+        BENCH_OUTPUT_DIR, f"{args.backend}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for scale, name, what, before, now in regressions:
+            print(f"REGRESSION scale={scale} {name}: {what} {before} -> {now}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
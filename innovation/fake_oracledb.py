@@ -0,0 +1,796 @@
+"""
+In-process stand-in for the oracledb driver, used by benchmark.py
+Serves the statements the GUI runs from generated rows, so the client side can be
+measured at any scale without an Oracle instance. Not a database: only the
+statement shapes listed in FakeDatabase are understood.
+"""
+
+import re
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import islice
+
+# Benchmark backend configuration
+FAKE_LATENCY_MS = 0.5       # simulated network round-trip per execute, call or fetch batch
+FAKE_SMALL_TABLES = {'PERMIT_TYPE': 20, 'DEPARTMENT': 8, 'HOLIDAYS': 10}
+FAKE_TABLE_RATIOS = {       # rows per scale unit for the large tables
+    'CITIZEN': 1.0, 'APPLICATION': 1.0, 'REVIEW_STEP': 1.0,
+    'DOCUMENT': 1.0, 'ISSUED_LICENSE': 0.3, 'AUDIT_LOG': 1.0
+}
+FAKE_EPOCH = datetime(2024, 1, 1)
+VIEW_WRAPPERS = ('view_count', 'view_count_keyed', 'view_page', 'view_changes')  # answered by query shape
+
+
+class Error(Exception):
+    pass
+
+class DatabaseError(Error):
+    pass
+
+class NotSupportedError(Error):
+    pass
+
+class DbType:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"<DbType {self.name}>"
+
+DB_TYPE_NUMBER = DbType('DB_TYPE_NUMBER')
+DB_TYPE_VARCHAR = DbType('DB_TYPE_VARCHAR')
+DB_TYPE_CHAR = DbType('DB_TYPE_CHAR')
+DB_TYPE_DATE = DbType('DB_TYPE_DATE')
+DB_TYPE_TIMESTAMP = DbType('DB_TYPE_TIMESTAMP')
+DB_TYPE_TIMESTAMP_TZ = DbType('DB_TYPE_TIMESTAMP_TZ')
+DB_TYPE_TIMESTAMP_LTZ = DbType('DB_TYPE_TIMESTAMP_LTZ')
+DB_TYPE_CLOB = DbType('DB_TYPE_CLOB')
+DB_TYPE_BLOB = DbType('DB_TYPE_BLOB')
+DB_TYPE_LONG = DbType('DB_TYPE_LONG')
+DB_TYPE_LONG_RAW = DbType('DB_TYPE_LONG_RAW')
+DB_TYPE_CURSOR = DbType('DB_TYPE_CURSOR')
+NUMBER = DB_TYPE_NUMBER
+STRING = DB_TYPE_VARCHAR
+DATETIME = DB_TYPE_DATE
+CURSOR = DB_TYPE_CURSOR
+POOL_GETMODE_TIMEDWAIT = 3
+
+# Column names and types of the phase_5 / phase_7 tables: (table, primary key, columns)
+SCHEMA = {
+    'CITIZEN': ('citizen_id', [
+        ('citizen_id', NUMBER), ('first_name', STRING), ('last_name', STRING),
+        ('date_of_birth', DATETIME), ('national_id', STRING), ('email', STRING),
+        ('phone', STRING), ('address', STRING), ('residency_status', STRING),
+        ('registration_date', DATETIME), ('status', STRING)]),
+    'PERMIT_TYPE': ('permit_type_id', [
+        ('permit_type_id', NUMBER), ('permit_name', STRING), ('category', STRING),
+        ('description', STRING), ('validity_period', NUMBER), ('processing_fee', NUMBER),
+        ('estimated_days', NUMBER), ('required_docs', STRING), ('is_active', STRING),
+        ('created_date', DATETIME)]),
+    'DEPARTMENT': ('department_id', [
+        ('department_id', NUMBER), ('department_name', STRING), ('department_code', STRING),
+        ('description', STRING), ('head_officer', STRING), ('contact_email', STRING),
+        ('is_active', STRING)]),
+    'APPLICATION': ('application_id', [
+        ('application_id', NUMBER), ('citizen_id', NUMBER), ('permit_type_id', NUMBER),
+        ('application_number', STRING), ('submission_date', DATETIME), ('status', STRING),
+        ('priority_level', STRING), ('payment_status', STRING), ('payment_amount', NUMBER),
+        ('notes', STRING), ('last_updated', DATETIME), ('assigned_officer_id', NUMBER),
+        ('estimated_completion', DATETIME)]),
+    'REVIEW_STEP': ('step_id', [
+        ('step_id', NUMBER), ('application_id', NUMBER), ('department_id', NUMBER),
+        ('step_number', NUMBER), ('review_date', DATETIME), ('step_status', STRING),
+        ('reviewer_name', STRING), ('comments', STRING), ('decision', STRING),
+        ('completion_date', DATETIME), ('processing_time', NUMBER)]),
+    'ISSUED_LICENSE': ('license_id', [
+        ('license_id', NUMBER), ('application_id', NUMBER), ('license_number', STRING),
+        ('issue_date', DATETIME), ('expiration_date', DATETIME), ('validity_days', NUMBER),
+        ('issued_by', STRING), ('digital_signature', STRING), ('qr_code', STRING),
+        ('license_status', STRING), ('renewal_eligible', STRING)]),
+    'DOCUMENT': ('document_id', [
+        ('document_id', NUMBER), ('application_id', NUMBER), ('document_type', STRING),
+        ('file_name', STRING), ('file_path', STRING), ('file_size', NUMBER),
+        ('upload_date', DATETIME), ('verified', STRING), ('verified_by', STRING)]),
+    'HOLIDAYS': ('holiday_id', [
+        ('holiday_id', NUMBER), ('holiday_date', DATETIME), ('holiday_name', STRING),
+        ('holiday_type', STRING), ('created_date', DATETIME)]),
+    'AUDIT_LOG': ('audit_id', [
+        ('audit_id', NUMBER), ('table_name', STRING), ('operation_type', STRING),
+        ('operation_date', DATETIME), ('operation_time', DB_TYPE_TIMESTAMP),
+        ('username', STRING), ('status', STRING), ('denial_reason', STRING),
+        ('record_id', NUMBER), ('old_values', DB_TYPE_CLOB), ('new_values', DB_TYPE_CLOB)]),
+}
+
+# Values cycled through for the check-constrained columns
+CHOICES = {
+    'residency_status': ['Citizen', 'Citizen', 'Citizen', 'Resident', 'Foreigner'],
+    'status': ['Active', 'Active', 'Active', 'Active', 'Inactive', 'Suspended'],
+    'priority_level': ['Normal', 'Normal', 'Low', 'High', 'Urgent'],
+    'payment_status': ['Paid', 'Paid', 'Pending', 'Waived', 'Refunded'],
+    'step_status': ['Completed', 'Completed', 'Pending', 'In Progress', 'Blocked', 'Escalated'],
+    'decision': ['Approved', 'Approved', None, 'Rejected', 'Revision Required'],
+    'license_status': ['Active', 'Active', 'Active', 'Expired', 'Revoked', 'Suspended'],
+    'operation_type': ['INSERT', 'UPDATE', 'UPDATE', 'DELETE'],
+    'table_name': ['CITIZEN', 'APPLICATION', 'REVIEW_STEP', 'DOCUMENT'],
+    'category': ['Business', 'Construction', 'Transport', 'Health', 'Environment'],
+    'document_type': ['National ID', 'Proof of Address', 'Tax Clearance', 'Site Plan'],
+    'is_active': ['Y', 'Y', 'Y', 'N'],
+    'renewal_eligible': ['Y', 'N'],
+    'verified': ['Y', 'N'],
+    'holiday_type': ['PUBLIC'],
+}
+APPLICATION_STATUSES = ['Approved', 'Approved', 'Submitted', 'Under Review', 'Rejected',
+                        'Documentation Required', 'Cancelled', 'On Hold']
+AUDIT_STATUSES = ['ALLOWED', 'ALLOWED', 'ALLOWED', 'DENIED']
+
+
+def count_of(n, k, m):
+    """How many i in range(n) have i % m == k"""
+    return n // m + (1 if k < n % m else 0)
+
+def top_level_split(text, separator=','):
+    """Split on separators outside parentheses and quotes"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(text):
+        if ch == "'":
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and text.startswith(separator, i):
+            parts.append(text[start:i])
+            start = i + len(separator)
+    parts.append(text[start:])
+    return [part.strip() for part in parts]
+
+def outer_from(sql):
+    """Offset of the FROM that ends the outermost select list"""
+    depth = 0
+    for match in re.finditer(r"[()]|\bFROM\b", sql, re.I):
+        token = match.group(0)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth == 0:
+            return match.start()
+    return -1
+
+
+class FakeDatabase:
+    """Generated rows for every table at a given scale, plus the statement handlers
+
+    Row i of a table is a pure function of i, so a million-row table costs nothing
+    until it is fetched, and a result is generated lazily as the cursor reads it.
+    """
+
+    def __init__(self, scale, latency_ms=FAKE_LATENCY_MS):
+        self.scale = scale
+        self.latency = latency_ms / 1000.0
+        self.sizes = dict(FAKE_SMALL_TABLES)
+        for table, ratio in FAKE_TABLE_RATIOS.items():
+            self.sizes[table] = max(1, int(scale * ratio))
+        self.changed = {}           # table -> keys touched since the last delta query
+        self.round_trips = 0
+        self.wait_seconds = 0.0     # simulated latency
+        self.serve_seconds = 0.0    # time spent generating rows
+        self.projections = {}
+        self.generators = {}
+        self.inserted = {'national_id': set(), 'email': set()}   # CITIZEN keys added by executemany
+        self.deleted = {}           # table -> tombstoned keys, reported by every deleted-keys query
+        self.cancels = 0            # Connection.cancel() calls
+
+    def reset_counters(self):
+        self.round_trips = 0
+        self.wait_seconds = 0.0
+        self.serve_seconds = 0.0
+
+    def round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            started = time.perf_counter()
+            time.sleep(self.latency)
+            self.wait_seconds += time.perf_counter() - started
+
+    def touch(self, table, count):
+        """Mark the newest count rows of table as changed for the next incremental refresh"""
+        size = self.sizes[table]
+        self.changed.setdefault(table, set()).update(range(size, max(0, size - count), -1))
+
+    # ---- row generation ----
+
+    def value(self, table, column, i):
+        function = self.generators.get((table, column))
+        if function is None:
+            function = self.generators[(table, column)] = self.generator(table, column)
+        return function(i)
+
+    def generator(self, table, column):
+        """Function of the row index i giving column's value, chosen once per column"""
+        sizes = self.sizes
+        if column == SCHEMA[table][0]:
+            return lambda i: i + 1
+        if column == 'citizen_id':
+            return lambda i: (i * 7919) % sizes['CITIZEN'] + 1
+        if column == 'application_id':
+            return lambda i: (i * 104729) % sizes['APPLICATION'] + 1
+        if column == 'permit_type_id':
+            return lambda i: i % sizes['PERMIT_TYPE'] + 1
+        if column == 'department_id':
+            return lambda i: i % sizes['DEPARTMENT'] + 1
+
+        choices = CHOICES.get(column)
+        if table == 'APPLICATION' and column == 'status':
+            choices = APPLICATION_STATUSES
+        elif table == 'AUDIT_LOG' and column == 'status':
+            choices = AUDIT_STATUSES
+        if choices:
+            return lambda i: choices[i % len(choices)]
+
+        if column == 'date_of_birth':
+            return lambda i: datetime(1950, 1, 1) + timedelta(days=(i * 37) % 20000)
+        if column == 'holiday_date':
+            return lambda i: datetime(2025, 1, 1) + timedelta(days=i * 29)
+        if column == 'operation_time':
+            return lambda i: FAKE_EPOCH + timedelta(seconds=i * 60)
+        if column in ('expiration_date', 'estimated_completion', 'completion_date'):
+            return lambda i: FAKE_EPOCH + timedelta(days=i % 700 + 30)
+        if column.endswith('_date') or column == 'last_updated':
+            return lambda i: FAKE_EPOCH + timedelta(days=i % 700)
+
+        if column in ('payment_amount', 'processing_fee'):
+            return lambda i: float(5000 + (i * 250) % 95000)
+        if column == 'file_size':
+            return lambda i: 20480 + (i * 4099) % 5000000
+        if column in ('validity_period', 'validity_days'):
+            return lambda i: 365
+        if column in ('estimated_days', 'processing_time'):
+            return lambda i: 1 + i % 30
+        if column == 'step_number':
+            return lambda i: 1 + i % 4
+        if column in ('record_id', 'assigned_officer_id'):
+            return lambda i: 1 + (i * 31) % max(1, self.scale)
+
+        if column == 'application_number':
+            return lambda i: f"APP-{2024 + i % 2}-{i + 1:08d}"
+        if column == 'license_number':
+            return lambda i: f"LIC-{i + 1:08d}"
+        if column == 'national_id':
+            return lambda i: f"1{1960 + i % 45}8{i + 1:011d}"
+        if column in ('email', 'contact_email'):
+            return lambda i: f"user{i + 1}@example.rw"
+        if column == 'phone':
+            return lambda i: f"+25078{(i + 1) % 10000000:07d}"
+        if column in ('old_values', 'new_values'):
+            statuses = CHOICES['status']
+            return lambda i: '{"status":"%s","id":%d}' % (statuses[i % 6], i + 1)
+        label = column.replace('_', ' ').title()
+        if column == 'notes':
+            return lambda i: None if i % 3 else f"{label} {i + 1}"
+        return lambda i: f"{label} {i + 1}"
+
+    def row(self, table, i, columns=None):
+        return tuple(self.value(table, column, i) for column in columns or self.columns(table))
+
+    def row_function(self, table, columns=None):
+        """Function of i building a whole row, for streaming large results"""
+        functions = [self.generator(table, column) for column in columns or self.columns(table)]
+        return lambda i: tuple(function(i) for function in functions)
+
+    def columns(self, table):
+        return [column for column, _ in SCHEMA[table][1]]
+
+    def description(self, table, columns=None):
+        types = dict(SCHEMA[table][1])
+        return [(column.upper(), types.get(column, STRING), None, None, None, None, True)
+                for column in columns or self.columns(table)]
+
+    def scan(self, table, low=None, high=None, descending=False, offset=0, limit=None):
+        """Lazily generate row indexes of table in key order, filtered by key range"""
+        size = self.sizes[table]
+        first = max(0, (low or 1) - 1)
+        last = min(size, (high or size + 1) - 1)
+        indexes = range(last - 1, first - 1, -1) if descending else range(first, last)
+        stop = None if limit is None else offset + limit
+        return islice(indexes, offset, stop)
+
+    # ---- statement dispatch ----
+
+    def execute(self, sql, params):
+        """(description, row iterator) for a statement; raises Error for unknown shapes"""
+        params = params or {}
+        tag = re.search(r'/\* permit:(\S+) \*/', sql)
+        if tag and tag.group(1) not in VIEW_WRAPPERS:
+            return self.named(tag.group(1), params)
+
+        # data view wrappers: answered from the shape of the query they wrap
+        text = ' '.join(sql[tag.end():].split()) if tag else ' '.join(sql.split())
+        match = re.match(r"SELECT COUNT\(\*\), SYSDATE(, MAX\(\w+\))? FROM \((.*)\)$", text, re.I)
+        if match:
+            size = self.sizes[self.projection(match.group(2))[0]]
+            if match.group(1):
+                return self.rows_description(['COUNT(*)', 'SYSDATE', 'MAX']), iter([(size, datetime.now(), size)])
+            return self.rows_description(['COUNT(*)', 'SYSDATE']), iter([(size, datetime.now())])
+
+        match = re.match(r"(.*) OFFSET :row_offset ROWS FETCH NEXT :page_size ROWS ONLY$", text, re.I)
+        if match:
+            return self.project(match.group(1), offset=params['row_offset'], limit=params['page_size'])
+
+        # changes of the view's own table only; watched joined tables are not simulated
+        match = re.match(r"SELECT \* FROM \((.*?)\) WHERE (\w+) IN \(SELECT \2 FROM (\w+) WHERE .*\)$", text, re.I)
+        if match:
+            keys = sorted(self.changed.pop(match.group(3).upper(), set()), reverse=True)
+            return self.project(match.group(1), keys=keys)
+
+        raise DatabaseError(f"fake backend cannot answer: {text[:120]}")
+
+    def named(self, name, params):
+        sizes = self.sizes
+        if name == 'dashboard_stats':
+            applications = sizes['APPLICATION']
+            statuses = len(APPLICATION_STATUSES)
+            pending = sum(count_of(applications, k, statuses) for k, status in enumerate(APPLICATION_STATUSES)
+                          if status in ('Submitted', 'Under Review'))
+            row = (sum(count_of(sizes['CITIZEN'], k, 6) for k in range(4)), applications, pending,
+                   applications * 52500.0 * 2 / 5,
+                   sum(count_of(sizes['ISSUED_LICENSE'], k, 6) for k in range(3)),
+                   sum(count_of(sizes['PERMIT_TYPE'], k, 4) for k in range(3)),
+                   sum(count_of(sizes['DEPARTMENT'], k, 4) for k in range(3)),
+                   sizes['AUDIT_LOG'])
+            return self.rows_description(['C%d' % i for i in range(8)]), iter([row])
+
+        if name == 'monthly_revenue':
+            monthly = sizes['APPLICATION'] / 24
+            rows = [(f"{params['year']}-{month:02d}", monthly * 52500.0, int(monthly)) for month in range(1, 13)]
+            return self.rows_description(['MONTH', 'REVENUE', 'APP_COUNT']), iter(rows)
+
+        if name == 'server_time':
+            return self.rows_description(['SYSDATE']), iter([(datetime.now(),)])
+
+        if name == 'view_deleted_keys':
+            keys = [(key,) for key in sorted(self.deleted.get(params['table_name'], ()))]
+            return self.rows_description(['ROW_KEY']), iter(keys)
+
+        if name == 'audit_log_all':
+            return self.table_rows('AUDIT_LOG')
+
+        if name == 'eligibility_matrix':
+            # collection parameters only accept collection binds, as in fn_eligibility_matrix
+            if not all(isinstance(params.get(bind), DbObject) for bind in ('citizen_ids', 'permit_type_ids')):
+                raise DatabaseError("PLS-00306: wrong number or types of arguments in call to "
+                                    "'FN_ELIGIBILITY_MATRIX'")
+            permit_type_ids = params['permit_type_ids'] or range(1, sizes['PERMIT_TYPE'] + 1)
+            rows = []
+            for citizen_id in sorted(set(params['citizen_ids'])):
+                for permit_type_id in sorted(permit_type_ids):
+                    if not self.active('CITIZEN', citizen_id):
+                        reason = 'Citizen or Permit Type not found'
+                    elif not self.active('PERMIT_TYPE', permit_type_id):
+                        reason = 'Permit type is inactive'
+                    else:
+                        reason = None
+                    rows.append((citizen_id, permit_type_id,
+                                 self.value('PERMIT_TYPE', 'permit_name', permit_type_id - 1),
+                                 'NOT_ELIGIBLE' if reason else 'ELIGIBLE', reason))
+            return self.rows_description(['CITIZEN_ID', 'PERMIT_TYPE_ID', 'PERMIT_NAME', 'VERDICT', 'REASON']), iter(rows)
+
+        if name == 'citizen_duplicates':
+            rows = [(national_id, None) for national_id in params['national_ids']
+                    if self.citizen_exists('national_id', national_id)]
+            rows += [(None, email) for email in params['emails'] if self.citizen_exists('email', email)]
+            return self.rows_description(['NATIONAL_ID', 'EMAIL']), iter(rows)
+
+        match = re.match(r"export_(\w+?)(_bounds|_range)?$", name)
+        if match:
+            table = {'citizens': 'CITIZEN', 'applications': 'APPLICATION', 'permit_types': 'PERMIT_TYPE',
+                     'departments': 'DEPARTMENT', 'licenses': 'ISSUED_LICENSE', 'review_steps': 'REVIEW_STEP',
+                     'documents': 'DOCUMENT', 'holidays': 'HOLIDAYS', 'audit_logs': 'AUDIT_LOG'}[match.group(1)]
+            if match.group(2) == '_bounds':
+                return self.rows_description(['MIN', 'MAX', 'COUNT']), iter([(1, sizes[table], sizes[table])])
+            if match.group(2) == '_range':
+                return self.table_rows(table, params['low'], params['high'])
+            return self.table_rows(table)
+
+        raise DatabaseError(f"fake backend has no handler for statement {name}")
+
+    def call(self, name, parameters):
+        """REF CURSOR results of the PL/SQL entry points the benchmarks run"""
+        if name == 'sp_export_audit_log':
+            columns = ['audit_id', 'table_name', 'operation_type', 'operation_date', 'operation_time',
+                       'username', 'status', 'denial_reason', 'record_id', 'old_values', 'new_values']
+            rows = map(self.audit_export_row(columns), self.scan('AUDIT_LOG'))
+            return self.description('AUDIT_LOG', columns), rows
+
+        if name == 'pkg_analytics.get_all_department_performance':
+            departments = self.sizes['DEPARTMENT']
+            pending = self.sizes['REVIEW_STEP'] // 6
+            rows = [(i + 1, self.value('DEPARTMENT', 'department_name', i), 60.0 + (i * 7) % 40,
+                     count_of(pending, i, departments)) for i in range(departments)]
+            return self.rows_description(['ID', 'NAME', 'SCORE', 'PENDING']), iter(rows)
+
+        if name == 'pkg_analytics.get_top_permit_types':
+            limit = parameters[0] if parameters else 5
+            per_type = self.sizes['APPLICATION'] // self.sizes['PERMIT_TYPE']
+            rows = [(self.value('PERMIT_TYPE', 'permit_name', i), i + 1, per_type, per_type // 4,
+                     52500.0, FAKE_EPOCH, FAKE_EPOCH + timedelta(days=700)) for i in range(limit)]
+            return self.rows_description(['PERMIT', 'ID', 'TOTAL', 'APPROVED', 'AVG_FEE', 'FIRST', 'LAST']), iter(rows)
+
+        if name == 'pkg_application_mgmt.submit_applications':
+            citizen_ids, permit_type_ids, _, _, app_ids, app_numbers, errors = parameters
+            ids, numbers, messages = [], [], []
+            for citizen_id, permit_type_id in zip(citizen_ids, permit_type_ids):
+                if not self.active('CITIZEN', citizen_id):
+                    message = f"Invalid or inactive citizen ID: {citizen_id if citizen_id is not None else ''}"
+                elif not self.active('PERMIT_TYPE', permit_type_id):
+                    message = f"Invalid or inactive permit type ID: {permit_type_id if permit_type_id is not None else ''}"
+                else:
+                    self.sizes['APPLICATION'] += 1
+                    application_id = self.sizes['APPLICATION']
+                    ids.append(application_id)
+                    numbers.append(f"APP-{datetime.now().year}-{application_id:08d}")
+                    messages.append(None)
+                    continue
+                ids.append(None)
+                numbers.append(None)
+                messages.append(message)
+            self.touch('APPLICATION', len(ids) - ids.count(None))
+            app_ids.value = DbObject(None, ids)
+            app_numbers.value = DbObject(None, numbers)
+            errors.value = DbObject(None, messages)
+            return None, iter(())
+
+        raise DatabaseError(f"fake backend has no handler for {name}")
+
+    def execute_many(self, sql, rows):
+        """Apply an array DML statement; returns a BatchError per refused row"""
+        tag = re.search(r'/\* permit:(\S+) \*/', sql)
+        if not tag or tag.group(1) != 'citizen_insert':
+            raise DatabaseError(f"fake backend cannot run array DML: {' '.join(sql.split())[:120]}")
+
+        errors, added = [], 0
+        for offset, row in enumerate(rows):
+            for column, index in (('national_id', 'UK_CITIZEN_NATIONAL_ID'), ('email', 'UK_CITIZEN_EMAIL')):
+                if self.citizen_exists(column, row[column]):
+                    errors.append(BatchError(offset, 1, f"unique constraint (GAKUBA.{index}) violated"))
+                    break
+            else:
+                self.inserted['national_id'].add(row['national_id'])
+                self.inserted['email'].add(row['email'])
+                added += 1
+        self.sizes['CITIZEN'] += added
+        self.touch('CITIZEN', added)
+        return errors
+
+    def citizen_exists(self, column, value):
+        """Whether a generated or inserted CITIZEN row already holds this unique value"""
+        if value in self.inserted[column]:
+            return True
+        pattern = r"1(\d{4})8(\d{11})$" if column == 'national_id' else r"user(\d+)@example\.rw$"
+        match = re.match(pattern, str(value))
+        if not match:
+            return False
+        i = int(match.group(match.lastindex)) - 1
+        return 0 <= i < self.sizes['CITIZEN'] and str(value) == self.value('CITIZEN', column, i)
+
+    def active(self, table, key):
+        """Whether key is an existing row of table whose status column says it is usable"""
+        if key is None or not 1 <= key <= self.sizes[table]:
+            return False
+        if table == 'CITIZEN':
+            return self.value(table, 'status', key - 1) == 'Active'
+        return self.value(table, 'is_active', key - 1) == 'Y'
+
+    def audit_export_row(self, columns):
+        # the procedure returns operation_time as HH24:MI:SS text
+        row = self.row_function('AUDIT_LOG', columns)
+
+        def build(i):
+            values = row(i)
+            return values[:4] + (values[4].strftime('%H:%M:%S'),) + values[5:]
+        return build
+
+    def table_rows(self, table, low=None, high=None):
+        return self.description(table), map(self.row_function(table), self.scan(table, low, high))
+
+    def rows_description(self, names):
+        return [(name, None, None, None, None, None, True) for name in names]
+
+    # ---- data view projections ----
+
+    def projection(self, sql):
+        """(base table, descending, [(kind, [(table, column)], ...)]) of a data view query"""
+        cached = self.projections.get(sql)
+        if cached:
+            return cached
+
+        start = re.search(r"\bSELECT\b", sql, re.I).end()
+        end = outer_from(sql)
+        tail = sql[end:]
+        aliases = {}
+        base = None
+        for table, alias in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?!ON\b|JOIN\b|WHERE\b|ORDER\b)(\w+))?", tail, re.I):
+            table = table.upper()
+            base = base or table
+            aliases[(alias or table).lower()] = table
+
+        expressions = []
+        for expression in top_level_split(sql[start:end]):
+            refs = []
+            for alias, column in re.findall(r"(?:\b(\w+)\.)?\b([a-z_]+)\b", expression, re.I):
+                table = aliases.get(alias.lower()) if alias else base
+                if table and column.lower() in dict(SCHEMA[table][1]):
+                    refs.append((table, column.lower()))
+            upper = expression.upper()
+            if 'TO_CHAR' in upper:
+                kind = 'datetime' if 'HH24' in upper else 'date'
+            elif '||' in expression:
+                kind = 'concat'
+            elif upper.startswith('ROUND'):
+                kind = 'kb'
+            else:
+                kind = 'value'
+            expressions.append((kind, refs, expression))
+
+        descending = bool(re.search(r"ORDER BY [^)]*\bDESC\b", tail, re.I))
+        cached = self.projections[sql] = (base, descending, expressions)
+        return cached
+
+    def project(self, sql, offset=0, limit=None, keys=None):
+        base, descending, expressions = self.projection(sql)
+        pk = SCHEMA[base][0]
+
+        def related(table, i):
+            # a joined table's row is the one the base row's foreign key points at
+            if table == base:
+                return i
+            return self.value(base, SCHEMA[table][0], i) - 1
+
+        def evaluate(kind, refs, i):
+            values = [self.value(table, column, related(table, i)) for table, column in refs]
+            if kind == 'concat':
+                return ' '.join(str(v) for v in values if v is not None)
+            value = values[0] if values else None
+            if value is None:
+                return None
+            if kind == 'date':
+                return value.strftime('%Y-%m-%d')
+            if kind == 'datetime':
+                return value.strftime('%Y-%m-%d %H:%M:%S')
+            if kind == 'kb':
+                return round(value / 1024, 2)
+            return value
+
+        if keys is not None:
+            indexes = iter([key - 1 for key in keys if 1 <= key <= self.sizes[base]])
+        else:
+            indexes = self.scan(base, descending=descending, offset=offset, limit=limit)
+        rows = (tuple(evaluate(kind, refs, i) for kind, refs, _ in expressions) for i in indexes)
+        names = [expression.split()[-1].upper() for _, _, expression in expressions]
+        return self.rows_description(names), rows
+
+
+class DbObject(list):
+    """Collection instance; a list that also answers aslist()"""
+
+    def __init__(self, object_type, values=()):
+        super().__init__(values)
+        self.type = object_type
+
+    def aslist(self):
+        return list(self)
+
+class ObjectType:
+    def __init__(self, name):
+        self.name = name
+
+    def newobject(self, values=None):
+        return DbObject(self, values or [])
+
+class BatchError:
+    """One row refused by executemany(..., batcherrors=True)"""
+
+    def __init__(self, offset, code, message):
+        self.offset = offset
+        self.code = code
+        self.full_code = f"ORA-{code:05d}"
+        self.message = f"{self.full_code}: {message}"
+
+class Var:
+    def __init__(self, type_code, arraysize=None):
+        self.type_code = type_code
+        self.value = None
+
+    def getvalue(self):
+        return self.value
+
+    def setvalue(self, pos, value):
+        self.value = value
+
+
+class Cursor:
+    """Cursor that transfers prefetchrows rows with the execute and arraysize rows per later round-trip"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.db = connection.db
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.outputtypehandler = None
+        self.description = None
+        self.rowcount = 0
+        self._rows = iter(())
+        self._buffer = deque()
+        self._errors = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def _open(self, description, rows, prefetch):
+        self.description = description
+        self._rows = rows
+        self._buffer = deque()
+        self.rowcount = 0
+        if prefetch:
+            self._transfer(self.prefetchrows)
+
+    def _transfer(self, count):
+        started = time.perf_counter()
+        self._buffer.extend(islice(self._rows, max(1, count)))
+        self.db.serve_seconds += time.perf_counter() - started
+
+    def _take(self, count):
+        rows = []
+        while len(rows) < count:
+            if not self._buffer:
+                self.db.round_trip()
+                self._transfer(self.arraysize)
+                if not self._buffer:
+                    break
+            while self._buffer and len(rows) < count:
+                rows.append(self._buffer.popleft())
+        self.rowcount += len(rows)
+        return rows
+
+    def execute(self, statement, parameters=None, **kwargs):
+        self.db.round_trip()
+        started = time.perf_counter()
+        description, rows = self.db.execute(statement, parameters if parameters is not None else kwargs)
+        self.db.serve_seconds += time.perf_counter() - started
+        self._open(description, rows, prefetch=True)
+
+    def executemany(self, statement, parameters, batcherrors=False, **kwargs):
+        self.db.round_trip()
+        started = time.perf_counter()
+        errors = self.db.execute_many(statement, parameters)
+        self.db.serve_seconds += time.perf_counter() - started
+        if errors and not batcherrors:
+            raise DatabaseError(errors[0].message)
+        self.rowcount = len(parameters) - len(errors)
+        self._errors = errors
+
+    def getbatcherrors(self):
+        return self._errors
+
+    def callproc(self, name, parameters=None, **kwargs):
+        self.db.round_trip()
+        description, rows = self.db.call(name, parameters or [])
+        for value in parameters or []:
+            if isinstance(value, Cursor):
+                value._open(description, rows, prefetch=False)
+        return parameters
+
+    def callfunc(self, name, return_type, parameters=None, **kwargs):
+        self.db.round_trip()
+        description, rows = self.db.call(name, parameters or [])
+        result = Cursor(self.connection)
+        result._open(description, rows, prefetch=False)
+        return result
+
+    def var(self, type_code, arraysize=None, **kwargs):
+        return Var(type_code, arraysize)
+
+    def setinputsizes(self, *args, **kwargs):
+        pass
+
+    def fetchone(self):
+        rows = self._take(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size=None):
+        return self._take(size or self.arraysize)
+
+    def fetchall(self):
+        rows = []
+        while True:
+            batch = self._take(self.arraysize)
+            if not batch:
+                return rows
+            rows.extend(batch)
+
+    def close(self):
+        self._rows = iter(())
+        self._buffer.clear()
+
+
+class Connection:
+    def __init__(self, db):
+        self.db = db
+        self.autocommit = False
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self.db.round_trip()
+
+    def rollback(self):
+        self.db.round_trip()
+
+    def gettype(self, name):
+        return ObjectType(name)
+
+    def is_healthy(self):
+        return True
+
+    def cancel(self):
+        self.db.cancels += 1
+
+    def close(self):
+        pass
+
+    def fetch_df_all(self, *args, **kwargs):
+        raise NotSupportedError("fake backend does not produce DataFrames")
+
+    def fetch_df_batches(self, *args, **kwargs):
+        raise NotSupportedError("fake backend does not produce DataFrames")
+
+class Pool:
+    def __init__(self, db, min=1, max=8, increment=1, **kwargs):
+        self.db = db
+        self.min = min
+        self.max = max
+        self.increment = increment
+        self.opened = min
+        self.busy = 0
+
+    def acquire(self):
+        self.busy += 1
+        self.opened = max(self.opened, self.busy)
+        return Connection(self.db)
+
+    def release(self, connection):
+        self.busy -= 1
+
+    def drop(self, connection):
+        self.busy -= 1
+
+    def close(self, force=False):
+        pass
+
+
+database = None     # the FakeDatabase every pool serves, set by install()
+
+def create_pool(user=None, password=None, dsn=None, **kwargs):
+    if database is None:
+        raise DatabaseError("fake backend not installed; call fake_oracledb.install(scale)")
+    return Pool(database, **kwargs)
+
+def install(scale, latency_ms=FAKE_LATENCY_MS):
+    """Serve `import oracledb` from this module with a FakeDatabase of the given scale"""
+    global database
+    database = FakeDatabase(scale, latency_ms)
+    sys.modules['oracledb'] = sys.modules[__name__]
+    return database
@@ -0,0 +1,472 @@
+"""
+Synthetic data generator and bulk loader for load testing
+Generates referentially consistent CITIZEN -> APPLICATION -> REVIEW_STEP / DOCUMENT /
+ISSUED_LICENSE rows on top of the PERMIT_TYPE and DEPARTMENT reference data from
+phase_5, and loads them with array DML from parallel worker processes.
+Each chunk of rows is a pure function of (seed, chunk), so runs are reproducible and
+workers never coordinate: ids, application numbers and step/document id ranges are
+reserved per chunk up front.
+Usage: python load_test_data.py --citizens 1000000 [--apps-per-citizen 1.5] [--workers 8]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import oracledb
+
+# Generator configuration
+LOAD_SEED = 27670               # same seed, same rows
+LOAD_CITIZENS = 100000
+LOAD_APPS_PER_CITIZEN = 1.5
+LOAD_YEARS = 3                  # citizens register and apply across this many years up to today
+LOAD_MAX_STEPS = 4              # review steps per application
+
+# Loader configuration
+LOAD_CHUNK = 10000              # parent rows generated and committed per worker task
+LOAD_BATCH_SIZE = 5000          # rows bound per executemany round-trip
+LOAD_WORKERS = 4                # worker processes, each with its own connection
+LOAD_TRIGGER_TABLES = ('CITIZEN', 'APPLICATION')   # triggers --disable-triggers turns off while loading
+LOAD_TRIGGER_FILE = 'load_test_data_triggers.json'  # triggers a run disabled, until it re-enables them
+
+# Distributions; each value appears once per percentage point
+def weights(*pairs):
+    return tuple(value for value, weight in pairs for _ in range(weight))
+
+RESIDENCY = weights(('Citizen', 85), ('Resident', 10), ('Foreigner', 5))
+CITIZEN_STATUS = weights(('Active', 92), ('Inactive', 6), ('Suspended', 2))
+PRIORITY = weights(('Normal', 70), ('High', 15), ('Low', 10), ('Urgent', 5))
+OPEN_STATUS = weights(('Submitted', 45), ('Under Review', 35),
+                      ('Documentation Required', 12), ('On Hold', 8))
+CLOSED_STATUS = weights(('Approved', 72), ('Rejected', 14), ('Cancelled', 5), ('Under Review', 4),
+                        ('Documentation Required', 3), ('On Hold', 2))
+PAYMENT = {
+    'Approved': weights(('Paid', 95), ('Waived', 5)),
+    'Rejected': weights(('Paid', 55), ('Refunded', 30), ('Pending', 15)),
+    'Cancelled': weights(('Refunded', 50), ('Pending', 50))
+}
+OPEN_PAYMENT = weights(('Pending', 60), ('Paid', 40))
+LICENSE_STATUS = weights(('Active', 98), ('Revoked', 1), ('Suspended', 1))   # unexpired licenses
+
+# (fewest steps, most steps, (step_status, decision) of the last step); earlier steps are approved
+STEP_PLANS = {
+    'Submitted': (0, 0, None),
+    'Cancelled': (0, 1, ('Pending', None)),
+    'Under Review': (1, LOAD_MAX_STEPS - 1, ('In Progress', None)),
+    'Documentation Required': (1, 2, ('Blocked', 'Revision Required')),
+    'On Hold': (1, 2, ('Escalated', None)),
+    'Rejected': (1, LOAD_MAX_STEPS, ('Completed', 'Rejected')),
+    'Approved': (2, LOAD_MAX_STEPS, ('Completed', 'Approved'))
+}
+STEP_NAMES = (
+    ('Financial Officer', 'Payment verification completed'),
+    ('Review Officer', 'Document verification and technical review'),
+    ('Senior Officer', 'Technical compliance verification'),
+    ('Director', 'Final approval review')
+)
+
+FIRST_NAMES = ('Jean', 'Marie', 'Patrick', 'Alice', 'Eric', 'Grace', 'Emmanuel', 'Diane', 'Olivier',
+               'Claudine', 'Innocent', 'Josiane', 'Didier', 'Aline', 'Fabrice', 'Chantal', 'Yves',
+               'Solange', 'Thierry', 'Esther', 'Kevin', 'Divine', 'Samuel', 'Clarisse', 'David')
+LAST_NAMES = ('Mugabo', 'Uwase', 'Niyonzima', 'Mukamana', 'Habimana', 'Uwimana', 'Nshimiyimana',
+              'Ingabire', 'Hakizimana', 'Mutoni', 'Ndayisaba', 'Umutoni', 'Bizimana', 'Iradukunda',
+              'Tuyishime', 'Nyiraneza', 'Mugisha', 'Keza', 'Gasana', 'Uwera', 'Kamanzi', 'Ishimwe')
+STREETS = ('KG', 'KN', 'KK', 'NM', 'RN', 'MU')
+DISTRICTS = ('Kigali', 'Gasabo', 'Kicukiro', 'Nyarugenge', 'Musanze', 'Huye', 'Rubavu', 'Rwamagana',
+             'Muhanga', 'Nyagatare', 'Rusizi', 'Karongi')
+NOTES = ('Applicant requested expedited processing', 'Follow-up call scheduled',
+         'Site inspection pending', 'Resubmitted after corrections', 'Fee paid at district office')
+
+COLUMNS = {
+    'citizen': ('citizen_id', 'first_name', 'last_name', 'date_of_birth', 'national_id', 'email',
+                'phone', 'address', 'residency_status', 'registration_date', 'status'),
+    'application': ('application_id', 'citizen_id', 'permit_type_id', 'application_number',
+                    'submission_date', 'status', 'priority_level', 'payment_status', 'payment_amount',
+                    'notes', 'last_updated', 'assigned_officer_id', 'estimated_completion'),
+    'review_step': ('step_id', 'application_id', 'department_id', 'step_number', 'review_date',
+                    'step_status', 'reviewer_name', 'comments', 'decision', 'completion_date',
+                    'processing_time'),
+    'document': ('document_id', 'application_id', 'document_type', 'file_name', 'file_path',
+                 'file_size', 'upload_date', 'verified', 'verified_by'),
+    'issued_license': ('license_id', 'application_id', 'license_number', 'issue_date',
+                       'expiration_date', 'validity_days', 'issued_by', 'digital_signature',
+                       'qr_code', 'license_status', 'renewal_eligible')
+}
+INSERTS = {
+    table: f"INSERT INTO {table} ({', '.join(columns)}) "
+           f"VALUES ({', '.join(f':{i + 1}' for i in range(len(columns)))})"
+    for table, columns in COLUMNS.items()
+}
+
+# (sequence, table, key) restarted past the loaded rows
+SEQUENCES = (
+    ('seq_citizen_id', 'citizen', 'citizen_id'),
+    ('seq_application_id', 'application', 'application_id'),
+    ('seq_review_step_id', 'review_step', 'step_id'),
+    ('seq_document_id', 'document', 'document_id'),
+    ('seq_license_id', 'issued_license', 'license_id')
+)
+
+
+class Plan:
+    """Everything a worker needs to generate any chunk: sizes, id bases and reference data"""
+
+    def __init__(self, citizens, apps_per_citizen, years, seed, bases, number_base,
+                 permit_types, departments):
+        self.citizens = citizens
+        self.applications = round(citizens * apps_per_citizen)
+        self.seed = seed
+        self.as_of = datetime.combine(datetime.now().date(), datetime.min.time())
+        self.start = self.as_of - timedelta(days=365 * years)
+        self.citizen_base, self.app_base, self.step_base, self.doc_base, self.license_base = bases
+        self.number_base = number_base
+        # (id, fee, estimated_days, validity_period, required documents); cheaper permits are more common
+        self.permit_types = [(pid, float(fee), days, validity,
+                              [doc.strip() for doc in docs.split(',') if doc.strip()] or ['ID Copy'])
+                             for pid, fee, days, validity, docs in permit_types]
+        self.permit_weights = []
+        total = 0
+        for permit in self.permit_types:
+            total += 1e6 / (permit[1] + 50000)
+            self.permit_weights.append(total)
+        self.departments = departments
+        self.max_docs = max(len(permit[4]) for permit in self.permit_types)
+
+    def chunks(self, count):
+        return (count + LOAD_CHUNK - 1) // LOAD_CHUNK
+
+    def registered(self, index):
+        """Registration date of the index-th generated citizen; sign-ups spread evenly over the window"""
+        return self.start + (self.as_of - self.start) * (index / self.citizens)
+
+
+def business_hours(rng, moment):
+    """moment moved to a weekday between 08:00 and 17:00"""
+    moment = moment.replace(hour=8 + int(rng.random() * 9), minute=rng.randrange(60),
+                            second=0, microsecond=0)
+    if moment.weekday() >= 5:
+        moment -= timedelta(days=moment.weekday() - 4)
+    return moment
+
+
+def citizen_rows(plan, chunk):
+    rng = random.Random(f'{plan.seed}:citizen:{chunk}')
+    rows = []
+    for index in range(chunk * LOAD_CHUNK, min(plan.citizens, (chunk + 1) * LOAD_CHUNK)):
+        citizen_id = plan.citizen_base + index + 1
+        registered = plan.registered(index)
+        born = (registered - timedelta(days=365.25 * rng.triangular(18, 85, 32))).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append((
+            citizen_id, first, last, born,
+            f'NID{born:%Y%m%d}{citizen_id:08d}',
+            f'{first}.{last}.{citizen_id}@email.com'.lower(),
+            f'+2507{rng.choice("8923")}{rng.randrange(10 ** 7):07d}',
+            f'{rng.choice(STREETS)} {rng.randint(1, 999)} St, {rng.choice(DISTRICTS)}',
+            rng.choice(RESIDENCY), registered, rng.choice(CITIZEN_STATUS)
+        ))
+    return [('citizen', rows)]
+
+
+def application_rows(plan, chunk):
+    """Applications of one chunk with their review steps, documents and licenses"""
+    rng = random.Random(f'{plan.seed}:application:{chunk}')
+    applications, steps, documents, licenses = [], [], [], []
+    step_id = plan.step_base + chunk * LOAD_CHUNK * LOAD_MAX_STEPS
+    doc_id = plan.doc_base + chunk * LOAD_CHUNK * plan.max_docs
+    for index in range(chunk * LOAD_CHUNK, min(plan.applications, (chunk + 1) * LOAD_CHUNK)):
+        app_id = plan.app_base + index + 1
+        citizen = int(plan.citizens * rng.random() ** 1.5)    # early sign-ups have had longer to apply
+        permit_id, fee, estimated_days, validity, required = rng.choices(
+            plan.permit_types, cum_weights=plan.permit_weights)[0]
+        registered = plan.registered(citizen)
+        submitted = business_hours(rng, registered + (plan.as_of - registered) * rng.random())
+        age = (plan.as_of - submitted).total_seconds() / 86400
+
+        if age < estimated_days * (0.5 + rng.random()):
+            status = rng.choice(OPEN_STATUS)
+            updated = submitted + timedelta(days=age * rng.random())
+            payment = rng.choice(OPEN_PAYMENT)
+        else:
+            status = rng.choice(CLOSED_STATUS)
+            updated = submitted + timedelta(days=min(age, estimated_days * rng.lognormvariate(0, 0.4)))
+            payment = rng.choice(PAYMENT.get(status, OPEN_PAYMENT))
+        applications.append((
+            app_id, plan.citizen_base + citizen + 1, permit_id,
+            f'APP-{submitted:%Y}-{plan.number_base + index + 1:08d}', submitted, status,
+            rng.choice(PRIORITY), payment, 0 if payment == 'Waived' else fee,
+            rng.choice(NOTES) if rng.random() < 0.1 else None, updated,
+            None if status == 'Submitted' else rng.randint(1001, 1050),
+            submitted + timedelta(days=estimated_days)
+        ))
+
+        fewest, most, last = STEP_PLANS[status]
+        count = rng.randint(fewest, most)
+        span = updated - submitted
+        for number in range(1, count + 1):
+            state, decision = last if number == count else ('Completed', 'Approved')
+            reviewed = submitted + span * ((number - 1) / count)
+            completed = submitted + span * (number / count) if state == 'Completed' else None
+            role, comment = STEP_NAMES[min(number, len(STEP_NAMES)) - 1]
+            step_id += 1
+            steps.append((
+                step_id, app_id, rng.choice(plan.departments), number, reviewed, state,
+                f'{role} {rng.randint(1, 40)}', comment, decision, completed,
+                int((completed - reviewed).total_seconds() // 60) if completed else None
+            ))
+
+        # A Documentation Required application is missing one of its permit's documents
+        uploads = required[:-1] if status == 'Documentation Required' and len(required) > 1 else required
+        checked = status in ('Approved', 'Rejected') or count > 1
+        for number, doc_type in enumerate(uploads, 1):
+            file_name = f"{doc_type.lower().replace(' ', '_')}_{app_id}_{number}.pdf"
+            verified = checked and rng.random() < 0.95
+            doc_id += 1
+            documents.append((
+                doc_id, app_id, doc_type, file_name,
+                f'C:\\APP\\KIM\\PERMIT_DOCUMENTS\\{submitted:%Y}\\{file_name}',
+                1024 + int(rng.lognormvariate(12.9, 0.7)),
+                submitted - timedelta(minutes=rng.randint(0, 120)),
+                'Y' if verified else 'N', f'Verifier {rng.randint(1, 20)}' if verified else None
+            ))
+
+        if status == 'Approved':
+            expires = updated + timedelta(days=validity)
+            if expires < plan.as_of:
+                license_status = 'Expired'
+            else:
+                license_status = rng.choice(LICENSE_STATUS)
+            license_number = f'LIC-{app_id:06d}-{updated:%Y}'
+            licenses.append((
+                plan.license_base + index + 1, app_id, license_number, updated, expires, validity,
+                f'License Officer {rng.randint(1, 10)}',
+                'SHA256:' + hashlib.sha256(license_number.encode()).hexdigest().upper(),
+                f'QR{app_id:010d}', license_status,
+                'Y' if license_status != 'Revoked' and expires < plan.as_of + timedelta(days=90) else 'N'
+            ))
+    return [('application', applications), ('review_step', steps),
+            ('document', documents), ('issued_license', licenses)]
+
+
+GENERATORS = {'citizen': citizen_rows, 'application': application_rows}
+
+
+# ---- workers ----
+
+connection = None   # one per worker process
+
+def open_connection(config):
+    global connection
+    connection = oracledb.connect(**config)
+
+
+def load_chunk(kind, plan, chunk, batch_size):
+    """Generate one chunk and insert it in batches; the whole chunk commits or none of it does"""
+    began = time.perf_counter()
+    tables = GENERATORS[kind](plan, chunk)
+    cursor = connection.cursor()
+    try:
+        for table, rows in tables:
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(INSERTS[table], rows[start:start + batch_size])
+        connection.commit()
+    except oracledb.Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return chunk, {table: len(rows) for table, rows in tables}, time.perf_counter() - began
+
+
+def run_phase(executor, kind, plan, count, batch_size):
+    """Load every chunk of one parent table; returns rows per table"""
+    chunks = plan.chunks(count)
+    began = time.perf_counter()
+    totals = {}
+    if executor:
+        results = executor.map(load_chunk, [kind] * chunks, [plan] * chunks, range(chunks),
+                               [batch_size] * chunks)
+    else:
+        results = (load_chunk(kind, plan, chunk, batch_size) for chunk in range(chunks))
+    for done, (chunk, rows, seconds) in enumerate(results, 1):
+        for table, n in rows.items():
+            totals[table] = totals.get(table, 0) + n
+        loaded = sum(totals.values())
+        elapsed = time.perf_counter() - began
+        print(f"\r  {kind:<12} chunk {done}/{chunks}  {loaded:>12,} rows  "
+              f"{loaded / elapsed:>10,.0f} rows/s", end='', flush=True)
+    print()
+    return totals
+
+
+# ---- setup and teardown on the control connection ----
+
+def make_plan(cursor, args):
+    cursor.execute("""
+        SELECT permit_type_id, processing_fee, estimated_days, validity_period, required_docs
+        FROM permit_type WHERE is_active = 'Y' ORDER BY permit_type_id
+    """)
+    permit_types = cursor.fetchall()
+    cursor.execute("SELECT department_id FROM department WHERE is_active = 'Y' ORDER BY department_id")
+    departments = [row[0] for row in cursor.fetchall()]
+    if not permit_types or not departments:
+        sys.exit("No active permit types or departments; load the phase_5 reference data first")
+
+    cursor.execute("""
+        SELECT (SELECT NVL(MAX(citizen_id), 0) FROM citizen),
+               (SELECT NVL(MAX(application_id), 0) FROM application),
+               (SELECT NVL(MAX(step_id), 0) FROM review_step),
+               (SELECT NVL(MAX(document_id), 0) FROM document),
+               (SELECT NVL(MAX(license_id), 0) FROM issued_license)
+        FROM dual
+    """)
+    bases = cursor.fetchone()
+    # last_number is past every cached value, so no live application number can reach the range
+    cursor.execute("SELECT last_number FROM user_sequences WHERE sequence_name = 'SEQ_APPLICATION_NUMBER'")
+    row = cursor.fetchone()
+    return Plan(args.citizens, args.apps_per_citizen, args.years, args.seed, bases,
+                row[0] if row else 0, permit_types, departments)
+
+
+def enabled_triggers(cursor):
+    cursor.execute(f"""
+        SELECT trigger_name FROM user_triggers
+        WHERE table_name IN ({', '.join(f"'{t}'" for t in LOAD_TRIGGER_TABLES)}) AND status = 'ENABLED'
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def check_triggers_allow(cursor):
+    """Stop before loading when the enabled triggers would reject the first batch"""
+    triggers = enabled_triggers(cursor)
+    if not triggers:
+        return
+    cursor.execute("SELECT check_operation_allowed() FROM dual")
+    verdict = cursor.fetchone()[0]
+    if verdict != 'ALLOWED':
+        sys.exit(f"{', '.join(triggers)} would reject the load ({verdict}); "
+                 f"run with --disable-triggers, or load on a non-holiday weekend")
+
+
+def disable_triggers(cursor, triggers, disabled):
+    """Disable triggers one by one, appending each to disabled once it is off"""
+    with open(LOAD_TRIGGER_FILE, 'w', encoding='utf-8') as f:
+        json.dump(triggers, f)      # written first, so a killed run can still be undone
+    print(f"Disabling {', '.join(triggers)} (list saved in {LOAD_TRIGGER_FILE})")
+    for trigger in triggers:
+        cursor.execute(f"ALTER TRIGGER {trigger} DISABLE")
+        disabled.append(trigger)
+
+
+def enable_triggers(cursor, triggers):
+    for trigger in triggers:
+        cursor.execute(f"ALTER TRIGGER {trigger} ENABLE")
+    if os.path.exists(LOAD_TRIGGER_FILE):
+        os.remove(LOAD_TRIGGER_FILE)
+
+
+def restart_sequences(cursor, plan):
+    """Point the id sequences past the loaded rows so sp_submit_application and friends keep working"""
+    for sequence, table, key in SEQUENCES:
+        cursor.execute(f"SELECT NVL(MAX({key}), 0) + 1 FROM {table}")
+        cursor.execute(f"ALTER SEQUENCE {sequence} RESTART START WITH {cursor.fetchone()[0]}")
+    cursor.execute(f"ALTER SEQUENCE seq_application_number RESTART START WITH "
+                   f"{plan.number_base + plan.applications + 1}")
+
+
+def gather_stats(cursor):
+    for table in COLUMNS:
+        cursor.execute("BEGIN DBMS_STATS.GATHER_TABLE_STATS(USER, :t); END;", [table.upper()])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and bulk-load synthetic permit data")
+    parser.add_argument('--citizens', type=int, default=LOAD_CITIZENS)
+    parser.add_argument('--apps-per-citizen', type=float, default=LOAD_APPS_PER_CITIZEN)
+    parser.add_argument('--years', type=int, default=LOAD_YEARS,
+                        help="history covered by registrations and submissions, ending today")
+    parser.add_argument('--seed', type=int, default=LOAD_SEED)
+    parser.add_argument('--workers', type=int, default=LOAD_WORKERS,
+                        help="worker processes; 1 loads on the main process")
+    parser.add_argument('--batch-size', type=int, default=LOAD_BATCH_SIZE,
+                        help="rows per executemany call")
+    parser.add_argument('--disable-triggers', action='store_true',
+                        help="disable the CITIZEN/APPLICATION triggers while loading; other sessions' "
+                             "changes are then neither checked nor audited. Without it the load only "
+                             "runs when check_operation_allowed() allows it (weekends that are not holidays)")
+    parser.add_argument('--restore-triggers', action='store_true',
+                        help=f"re-enable the triggers listed in {LOAD_TRIGGER_FILE} by an interrupted run and exit")
+    parser.add_argument('--no-stats', action='store_true', help="skip DBMS_STATS after loading")
+    parser.add_argument('--dsn')
+    parser.add_argument('--user')
+    parser.add_argument('--password')
+    args = parser.parse_args()
+
+    from permit_management_gui import DB_CONFIG
+    config = dict(DB_CONFIG)
+    for key in ('dsn', 'user', 'password'):
+        if getattr(args, key):
+            config[key] = getattr(args, key)
+
+    control = oracledb.connect(**config)
+    cursor = control.cursor()
+    if os.path.exists(LOAD_TRIGGER_FILE):
+        with open(LOAD_TRIGGER_FILE, encoding='utf-8') as f:
+            left_disabled = json.load(f)
+        if not args.restore_triggers:
+            sys.exit(f"An earlier run left {', '.join(left_disabled)} disabled; "
+                     f"run with --restore-triggers first")
+        enable_triggers(cursor, left_disabled)
+        print(f"Re-enabled {', '.join(left_disabled)}")
+        return
+    if args.restore_triggers:
+        sys.exit(f"{LOAD_TRIGGER_FILE} not found; no triggers to restore")
+    if not args.disable_triggers:
+        check_triggers_allow(cursor)
+    plan = make_plan(cursor, args)
+    print(f"Loading {plan.citizens:,} citizens and {plan.applications:,} applications "
+          f"with {args.workers} worker(s), seed {plan.seed}")
+
+    disabled = []
+    began = time.perf_counter()
+    executor = None
+    try:
+        if args.disable_triggers:
+            disable_triggers(cursor, enabled_triggers(cursor), disabled)
+        if args.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=args.workers, initializer=open_connection,
+                                           initargs=(config,))
+        else:
+            open_connection(config)
+        totals = run_phase(executor, 'citizen', plan, plan.citizens, args.batch_size)
+        totals.update(run_phase(executor, 'application', plan, plan.applications, args.batch_size))
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        elif connection:
+            connection.close()
+        if args.disable_triggers:
+            enable_triggers(cursor, disabled)
+        restart_sequences(cursor, plan)     # also after a failed chunk: earlier chunks stay committed
+    seconds = time.perf_counter() - began
+    if not args.no_stats:
+        print("Gathering optimizer statistics...")
+        gather_stats(cursor)
+    cursor.close()
+    control.close()
+
+    for table, rows in totals.items():
+        print(f"  {table:<16}{rows:>14,}")
+    total = sum(totals.values())
+    print(f"Loaded {total:,} rows in {seconds:.1f} s ({total / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,33 @@
 """
 Complete Permit Management System - ALL ERRORS FIXED
 Requirements: pip install oracledb
+Optional: pip install pyarrow (Parquet export, needs oracledb 3.0+)
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import oracledb
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import argparse
+import threading
+import sys
+import re
+import shutil
+import os
+import queue
+import time
 import csv
 import json
+import gzip
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
 
 # Database configuration
 DB_CONFIG = {
@@ -17,6 +36,263 @@ DB_CONFIG = {
     'dsn': 'localhost:1521/thu_27670_kim_permit_db'
 }
 
+# Session pool configuration
+POOL_CONFIG = {
+    'min': 2,               # connections opened at startup
+    'max': 8,               # upper bound shared by GUI, exports and refreshes
+    'increment': 1,         # connections added when the pool grows
+    'wait_timeout': 10000,  # ms to wait for a free connection before failing
+    'ping_interval': 60,    # s idle before a connection is health-checked on acquire
+    'timeout': 300,         # s before idle connections above min are closed
+    'stmtcachesize': 60     # parsed statements kept per connection (covers every STATEMENTS entry)
+}
+
+# Background task configuration
+TASK_WORKERS = 4        # worker threads running database calls off the Tk loop
+TASK_POLL_MS = 50       # how often the Tk loop collects finished tasks
+
+# Client-side cache configuration
+DASHBOARD_CACHE_TTL = 60    # s a dashboard snapshot is reused before it is re-queried
+REFERENCE_CHECK_SECONDS = 30  # s between change checks of PERMIT_TYPE, DEPARTMENT and HOLIDAYS
+
+# Eligibility matrix configuration
+ELIGIBILITY_MAX_CITIZENS = 500  # citizen IDs evaluated per matrix request (rows = IDs x permit types)
+
+# Type-ahead picker configuration
+SEARCH_DEBOUNCE_MS = 250    # pause in typing before a picker queries the server
+SEARCH_MIN_CHARS = 2        # shorter input is not searched
+SEARCH_LIMIT = 20           # rows returned per type-ahead query
+SEARCH_CACHE_SIZE = 256     # recent (picker, prefix) results kept in the LRU cache
+
+# Data view paging configuration
+DATA_PAGE_SIZE = 200        # rows fetched per OFFSET/FETCH round-trip
+DATA_CACHED_PAGES = 10      # pages kept in memory around the scroll position
+DATA_REFRESH_OVERLAP = 5    # seconds re-read before the last refresh watermark (commits in flight)
+DATA_RECOUNT_SECONDS = 600  # a refresh re-runs the full COUNT(*) at most this often, correcting drift
+DATA_RELOAD_SECONDS = 86400 # a view idle this long reloads; DELETED_ROWS keeps a day of tombstones
+
+# Export configuration
+EXPORT_ARRAYSIZE = 1000     # rows per fetchmany round-trip while streaming exports
+EXPORT_WORKERS = 4          # tables/key ranges exported at once, each on its own pooled connection
+EXPORT_SPLIT_ROWS = 250000  # tables larger than this are split into primary-key ranges
+PARQUET_COMPRESSION = 'zstd'  # per-column codec for Parquet exports
+AUDIT_STATE_FILE = 'audit_export_state.json'  # watermark kept next to the incremental audit files
+
+# Bulk operation configuration
+BULK_UPDATE_CHUNK = 5000    # applications updated and committed per sp_bulk_update_status call
+
+# Bulk import configuration
+IMPORT_BATCH_SIZE = 5000    # rows per duplicate lookup, executemany call and commit
+
+SUBMIT_BATCH_SIZE = 1000    # applications per submit_applications call and commit
+
+# Sequence benchmark configuration (--benchmark-sequences)
+SEQUENCE_BENCH_CACHES = [0, 1000]   # cache sizes compared; 0 runs the sequences NOCACHE
+SEQUENCE_BENCH_INSERTS = 2000       # committed inserts per session per run
+
+# Instrumentation configuration (Tools > Performance)
+PERF_SLOW_MS = 500          # statements at least this slow are appended to the slow-query log
+PERF_SLOW_LOG = None        # JSON-lines slow-query log file (--slow-log); None disables the log
+PERF_SAMPLES = 500          # most recent timings kept per statement for percentiles and histogram
+PERF_BUCKETS_MS = [1, 5, 10, 50, 100, 500, 1000, 5000]  # histogram bucket upper bounds
+PERF_SQL_CHARS = 200        # SQL text kept per slow-log entry
+
+# Tables written by Export All Data: (table, primary key, output file name)
+EXPORT_TABLES = [
+    ('CITIZEN', 'citizen_id', 'citizens'),
+    ('APPLICATION', 'application_id', 'applications'),
+    ('PERMIT_TYPE', 'permit_type_id', 'permit_types'),
+    ('DEPARTMENT', 'department_id', 'departments'),
+    ('ISSUED_LICENSE', 'license_id', 'licenses'),
+    ('REVIEW_STEP', 'step_id', 'review_steps'),
+    ('DOCUMENT', 'document_id', 'documents'),
+    ('HOLIDAYS', 'holiday_id', 'holidays'),
+    ('AUDIT_LOG', 'audit_id', 'audit_logs')
+]
+
+# Errors after which the pool is rebuilt instead of reported
+RECONNECT_ERRORS = {
+    'DPY-4011', 'DPY-6005', 'DPI-1080',
+    'ORA-03113', 'ORA-03114', 'ORA-03135', 'ORA-12514', 'ORA-12541'
+}
+
+# Named statements run by the GUI. Values are always passed as bind variables so
+# each text is hard-parsed once and then served from the statement cache.
+STATEMENTS = {
+    # one round-trip; APPLICATION is scanned once for all three of its figures
+    'dashboard_stats': """
+        SELECT (SELECT COUNT(*) FROM CITIZEN WHERE status = 'Active'),
+               a.total_apps, a.pending_apps, a.revenue,
+               (SELECT COUNT(*) FROM ISSUED_LICENSE WHERE license_status = 'Active'),
+               (SELECT COUNT(*) FROM PERMIT_TYPE WHERE is_active = 'Y'),
+               (SELECT COUNT(*) FROM DEPARTMENT WHERE is_active = 'Y'),
+               (SELECT COUNT(*) FROM AUDIT_LOG)
+        FROM (SELECT COUNT(*) total_apps,
+                     COUNT(CASE WHEN status IN ('Submitted', 'Under Review') THEN 1 END) pending_apps,
+                     NVL(SUM(CASE WHEN payment_status = 'Paid' THEN payment_amount END), 0) revenue
+              FROM APPLICATION) a
+    """,
+    # type-ahead: each branch is a bounded range scan on its own index
+    'citizen_search': """
+        SELECT citizen_id, first_name || ' ' || last_name, national_id FROM (
+            (SELECT citizen_id, first_name, last_name, national_id FROM CITIZEN
+             WHERE UPPER(last_name) LIKE :upper_prefix ESCAPE '\\' AND status = 'Active'
+             FETCH FIRST :limit ROWS ONLY)
+            UNION
+            (SELECT citizen_id, first_name, last_name, national_id FROM CITIZEN
+             WHERE UPPER(first_name) LIKE :upper_prefix ESCAPE '\\' AND status = 'Active'
+             FETCH FIRST :limit ROWS ONLY)
+            UNION
+            (SELECT citizen_id, first_name, last_name, national_id FROM CITIZEN
+             WHERE national_id LIKE :prefix ESCAPE '\\' AND status = 'Active'
+             FETCH FIRST :limit ROWS ONLY)
+            UNION
+            (SELECT citizen_id, first_name, last_name, national_id FROM CITIZEN
+             WHERE phone LIKE :prefix ESCAPE '\\' AND status = 'Active'
+             FETCH FIRST :limit ROWS ONLY)
+        )
+        ORDER BY last_name, first_name, citizen_id
+        FETCH FIRST :limit ROWS ONLY
+    """,
+    # change detection for the reference cache: a commit raises MAX(ORA_ROWSCN),
+    # COUNT(*) catches deletes that emptied a block; SYSDATE gives the server clock
+    'reference_versions': """
+        SELECT 'PERMIT_TYPE', MAX(ORA_ROWSCN), COUNT(*), SYSDATE FROM PERMIT_TYPE
+        UNION ALL
+        SELECT 'DEPARTMENT', MAX(ORA_ROWSCN), COUNT(*), SYSDATE FROM DEPARTMENT
+        UNION ALL
+        SELECT 'HOLIDAYS', MAX(ORA_ROWSCN), COUNT(*), SYSDATE FROM HOLIDAYS
+    """,
+    'reference_permit_types': """
+        SELECT permit_type_id, permit_name, processing_fee, estimated_days, is_active
+        FROM PERMIT_TYPE ORDER BY permit_name
+    """,
+    'reference_departments': """
+        SELECT department_id, department_name, is_active FROM DEPARTMENT ORDER BY department_name
+    """,
+    'reference_holidays': """
+        SELECT holiday_date FROM HOLIDAYS
+    """,
+    'bulk_update_candidates': """
+        SELECT COUNT(*) FROM APPLICATION
+        WHERE status = :old_status AND last_updated < SYSDATE - :days
+    """,
+    # existing rows clashing with an import batch; each branch uses its unique index
+    'citizen_duplicates': """
+        SELECT national_id, email FROM CITIZEN
+        WHERE national_id IN (SELECT column_value FROM TABLE(:national_ids))
+        UNION ALL
+        SELECT national_id, email FROM CITIZEN
+        WHERE email IN (SELECT column_value FROM TABLE(:emails))
+    """,
+    'citizen_insert': """
+        INSERT INTO CITIZEN (citizen_id, first_name, last_name, date_of_birth, national_id,
+                             email, phone, address, residency_status, registration_date, status)
+        VALUES (seq_citizen_id.NEXTVAL, :first_name, :last_name, :date_of_birth, :national_id,
+                :email, :phone, :address, :residency_status, SYSDATE, 'Active')
+    """,
+    # fn_validate_eligibility for every citizen x permit type pair, one query
+    'eligibility_matrix': """
+        SELECT citizen_id, permit_type_id, permit_name, verdict, reason
+        FROM TABLE(fn_eligibility_matrix(:citizen_ids, :permit_type_ids))
+    """,
+    'application_fee': """
+        SELECT payment_amount FROM APPLICATION WHERE application_id = :app_id
+    """,
+    # read from the fast-refresh summary instead of scanning APPLICATION; it refreshes
+    # every 5 minutes, so recent payments may be missing (see revenue_refreshed)
+    'monthly_revenue': """
+        SELECT TO_CHAR(revenue_month, 'YYYY-MM') AS month,
+               SUM(total_amount) AS revenue,
+               SUM(application_count) AS app_count
+        FROM mv_revenue_summary
+        WHERE revenue_month >= TO_DATE(:year || '0101', 'YYYYMMDD')
+          AND revenue_month < ADD_MONTHS(TO_DATE(:year || '0101', 'YYYYMMDD'), 12)
+          AND payment_status = 'Paid'
+        GROUP BY revenue_month
+        ORDER BY revenue_month
+    """,
+    'revenue_refreshed': """
+        SELECT last_refresh_end_time FROM user_mviews WHERE mview_name = 'MV_REVENUE_SUMMARY'
+    """,
+    'audit_log_all': """
+        SELECT * FROM AUDIT_LOG ORDER BY audit_id
+    """,
+    # start of the oldest open transaction, read before the delta: an audit row that is
+    # not committed yet was written at or after this moment
+    'audit_log_horizon': """
+        SELECT LEAST(NVL(CAST(MIN(start_date) AS TIMESTAMP), CAST(SYSTIMESTAMP AS TIMESTAMP)),
+                     CAST(SYSTIMESTAMP AS TIMESTAMP))
+        FROM V$TRANSACTION
+    """,
+    # stop before the first row written at or after the horizon. audit_id comes from a
+    # sequence drawn at insert time, so every row an open transaction may still commit
+    # sorts after the stopping point and the watermark never passes it
+    'audit_log_delta': """
+        SELECT audit_id, table_name, operation_type, operation_date, operation_time,
+               username, status, denial_reason, record_id, old_values, new_values
+        FROM AUDIT_LOG
+        WHERE audit_id > :last_id
+          AND audit_id < NVL((SELECT MIN(audit_id) FROM AUDIT_LOG
+                              WHERE audit_id > :last_id
+                                AND operation_time >= :horizon),
+                             audit_id + 1)
+        ORDER BY audit_id
+    """,
+    # PagedTreeview wrappers around a data view's query; {query}, {key} and
+    # {changed_keys} are filled in per view by statement_text
+    'view_count': """
+        SELECT COUNT(*), SYSDATE FROM ({query})
+    """,
+    'view_count_keyed': """
+        SELECT COUNT(*), SYSDATE, MAX({key}) FROM ({query})
+    """,
+    'view_page': """
+        {query} OFFSET :row_offset ROWS FETCH NEXT :page_size ROWS ONLY
+    """,
+    'view_changes': """
+        SELECT * FROM ({query}) WHERE {key} IN ({changed_keys})
+    """,
+    # tombstones written by the phase_7/change_tracking.sql delete triggers
+    'view_deleted_keys': """
+        SELECT row_key FROM deleted_rows WHERE table_name = :table_name AND deleted_at >= :since
+    """,
+    'server_time': """
+        SELECT SYSDATE FROM dual
+    """,
+    # server-side parse/execute counts for the statements above, found by their tag
+    'statement_stats': """
+        SELECT REGEXP_SUBSTR(sql_text, 'permit:([a-z_0-9]+)', 1, 1, NULL, 1),
+               SUM(executions), SUM(parse_calls), SUM(loads)
+        FROM V$SQL
+        WHERE sql_text LIKE '/* permit:%'
+        GROUP BY REGEXP_SUBSTR(sql_text, 'permit:([a-z_0-9]+)', 1, 1, NULL, 1)
+    """,
+}
+
+# Table names cannot be bound, so each export table gets its own fixed statements
+for _table, _pk, _name in EXPORT_TABLES:
+    STATEMENTS[f'export_{_name}_bounds'] = f"SELECT MIN({_pk}), MAX({_pk}), COUNT(*) FROM {_table}"
+    STATEMENTS[f'export_{_name}'] = f"SELECT * FROM {_table}"
+    STATEMENTS[f'export_{_name}_range'] = f"SELECT * FROM {_table} WHERE {_pk} >= :low AND {_pk} < :high"
+
+# Branches of view_changes' {changed_keys}: rows of the view's table whose change
+# marker moved, and rows pointing at a joined table's changed rows. Both are index
+# range scans (last_updated, then the foreign key index).
+VIEW_CHANGED_ROWS = "SELECT {key} FROM {table} WHERE {changed} >= :since"
+VIEW_CHANGED_PARENTS = ("SELECT {key} FROM {table} WHERE {column} IN "
+                        "(SELECT {column} FROM {parent} WHERE last_updated >= :since)")
+
+def statement_text(name, **parts):
+    """SQL for a registered statement, tagged so it can be found in V$SQL
+    
+    parts fill the {placeholders} of a template such as view_page.
+    """
+    text = STATEMENTS[name].strip()
+    if parts:
+        text = text.format(**{part: value.strip() for part, value in parts.items()})
+    return f"/* permit:{name} */ {text}"
+
 def safe_convert(val):
     """Convert database values safely"""
     if val is None:
@@ -30,53 +306,1911 @@ def safe_convert(val):
             return str(val)
     return str(val)
 
+def lobs_as_strings(cursor, metadata):
+    """Output type handler that fetches CLOB/BLOB columns inline instead of as LOB locators"""
+    if metadata.type_code is oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+    if metadata.type_code is oracledb.DB_TYPE_BLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+
+def export_cursor(connection):
+    """Cursor tuned for streaming large result sets"""
+    cursor = connection.cursor()
+    cursor.arraysize = EXPORT_ARRAYSIZE
+    cursor.prefetchrows = EXPORT_ARRAYSIZE
+    cursor.outputtypehandler = lobs_as_strings
+    return cursor
+
+def date_columns(cursor):
+    """Positions of the date/timestamp columns in an executed cursor"""
+    date_types = (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP,
+                  oracledb.DB_TYPE_TIMESTAMP_TZ, oracledb.DB_TYPE_TIMESTAMP_LTZ)
+    return [i for i, desc in enumerate(cursor.description) if desc[1] in date_types]
+
+def format_dates(rows, columns):
+    """Format only the date columns; csv writes None as '' and str()s everything else"""
+    if not columns:
+        return rows
+    rows = [list(row) for row in rows]
+    for row in rows:
+        for i in columns:
+            row[i] = safe_convert(row[i])
+    return rows
+
+def stream_to_csv(cursor, filepath, header=None, progress=None, write_header=True):
+    """Write an executed cursor to CSV one fetchmany batch at a time, returning the row count"""
+    if header is None:
+        header = [desc[0] for desc in cursor.description]
+    
+    dates = date_columns(cursor)
+    
+    count = 0
+    with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        if write_header:
+            writer.writerow(header)
+        
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            writer.writerows(format_dates(rows, dates))
+            
+            count += len(rows)
+            if progress:
+                progress(count)
+    return count
+
+AUDIT_CSV_HEADER = ['ID', 'Table', 'Operation', 'Date', 'Time', 'User',
+                    'Status', 'Reason', 'Record ID', 'Old Values', 'New Values']
+
+def export_audit_log(db, write):
+    """Open sp_export_audit_log's REF CURSOR and return the row count write(cursor) streams"""
+    with db.acquire() as connection:
+        cursor = connection.cursor()
+        result_cursor = export_cursor(connection)
+        cursor.callproc('sp_export_audit_log', [None, None, None, None, result_cursor])
+        count = write(result_cursor)
+        result_cursor.close()
+        cursor.close()
+    return count
+
+# One audit record per line; values are encoded separately so no dict is built per row
+AUDIT_JSON_TEMPLATE = ('{"id":%s,"table":%s,"operation":%s,"date":%s,"time":%s,"user":%s,'
+                       '"status":%s,"reason":%s,"record_id":%s,"old_values":%s,"new_values":%s}')
+
+def stream_audit_json(cursor, filepath, as_array=False, progress=None):
+    """Write sp_export_audit_log rows as JSON Lines (gzipped for .gz), or a JSON array, batch by batch"""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    
+    def text(value):
+        return encode('' if value is None else safe_convert(value))
+    
+    def number(value):
+        return 'null' if value is None else str(int(value))
+    
+    if filepath.lower().endswith('.gz'):
+        out = gzip.open(filepath, 'wt', encoding='utf-8', newline='\n')
+    else:
+        out = open(filepath, 'w', encoding='utf-8', newline='\n')
+    
+    separator = ',\n' if as_array else '\n'
+    count = 0
+    with out:
+        if as_array:
+            out.write('[\n')
+        
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            lines = [
+                AUDIT_JSON_TEMPLATE % (
+                    number(row[0]), text(row[1]), text(row[2]),
+                    encode(safe_convert(row[3])[:10]) if row[3] else 'null',
+                    text(row[4]), text(row[5]), text(row[6]), text(row[7]),
+                    number(row[8]), text(row[9]), text(row[10])
+                )
+                for row in rows
+            ]
+            if count and as_array:
+                out.write(separator)
+            out.write(separator.join(lines))
+            if not as_array:
+                out.write('\n')
+            
+            count += len(rows)
+            if progress:
+                progress(count)
+        
+        if as_array:
+            out.write('\n]\n')
+    return count
+
+def stream_to_parquet(connection, query, filepath, params=None, progress=None):
+    """Write a query to Parquet one Arrow record batch at a time, keeping native column types"""
+    if pq is None:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+    
+    writer = None
+    count = 0
+    try:
+        for df in connection.fetch_df_batches(statement=query, parameters=params, size=EXPORT_ARRAYSIZE):
+            batch = pa.Table.from_arrays(df.column_arrays(), names=df.column_names())
+            if writer is None:
+                writer = pq.ParquetWriter(filepath, batch.schema, compression=PARQUET_COMPRESSION)
+            writer.write_table(batch)
+            
+            count += batch.num_rows
+            if progress:
+                progress(count)
+        
+        if writer is None:
+            # no batches for an empty result; still write a file carrying the schema
+            df = connection.fetch_df_all(statement=query, parameters=params)
+            pq.write_table(pa.Table.from_arrays(df.column_arrays(), names=df.column_names()),
+                           filepath, compression=PARQUET_COMPRESSION)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+class AuditDeltaExport:
+    """Append audit rows newer than a persisted watermark to daily rolling CSV files"""
+    
+    HEADER = ['ID', 'Table', 'Operation', 'Date', 'Time', 'User', 
+              'Status', 'Reason', 'Record ID', 'Old Values', 'New Values']
+    
+    def __init__(self, db, folder, progress=None, cancelled=None):
+        self.db = db
+        self.folder = folder
+        self.state_path = os.path.join(folder, AUDIT_STATE_FILE)
+        self.progress = progress
+        self.cancelled = cancelled or (lambda: False)
+    
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return {'last_audit_id': 0, 'last_operation_time': None, 'file': None, 'offset': 0}
+        with open(self.state_path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def save_state(self, state):
+        state['updated'] = datetime.now().isoformat(timespec='seconds')
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.state_path)  # atomic, so the state is never half-written
+    
+    def discard_partial_batch(self, state):
+        """Cut off rows written after the last saved watermark by an interrupted run"""
+        if not state['file']:
+            return
+        path = os.path.join(self.folder, state['file'])
+        if os.path.exists(path) and os.path.getsize(path) > state['offset']:
+            with open(path, 'r+b') as f:
+                f.truncate(state['offset'])
+    
+    def run(self):
+        """Export the delta and return (rows, file name, new watermark audit_id)"""
+        state = self.load_state()
+        self.discard_partial_batch(state)
+        
+        filename = f"audit_log_{datetime.now():%Y%m%d}.csv"
+        path = os.path.join(self.folder, filename)
+        count = 0
+        
+        with self.db.acquire() as connection:
+            cursor = export_cursor(connection)
+            cursor.execute(statement_text('audit_log_horizon'))
+            horizon = cursor.fetchone()[0]
+            cursor.execute(statement_text('audit_log_delta'), 
+                           {'last_id': state['last_audit_id'], 'horizon': horizon})
+            dates = date_columns(cursor)
+            
+            with open(path, 'a', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                if csvfile.tell() == 0:
+                    writer.writerow(self.HEADER)
+                
+                while not self.cancelled():
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    last = rows[-1]
+                    writer.writerows(format_dates(rows, dates))
+                    
+                    csvfile.flush()
+                    os.fsync(csvfile.fileno())
+                    state.update(last_audit_id=int(last[0]), last_operation_time=safe_convert(last[4]),
+                                 file=filename, offset=csvfile.tell())
+                    self.save_state(state)
+                    
+                    count += len(rows)
+                    if self.progress:
+                        self.progress(count)
+            cursor.close()
+        
+        return count, filename, state['last_audit_id']
+
+class ParallelExport:
+    """Export tables concurrently on separate pooled connections, splitting large tables into key ranges"""
+    
+    def __init__(self, db, folder, workers=EXPORT_WORKERS, progress=None, cancelled=None, fmt='csv'):
+        self.db = db
+        self.folder = folder
+        self.fmt = fmt
+        self.workers = workers
+        self.progress = progress
+        self.cancelled = cancelled or (lambda: False)
+        self.rows_done = 0
+        self._lock = threading.Lock()
+        self._connections = set()
+    
+    def cancel(self):
+        """Abort the queries in progress on every worker connection"""
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.cancel()
+            except oracledb.Error:
+                pass
+    
+    def plan(self, name):
+        """Primary-key ranges of roughly EXPORT_SPLIT_ROWS rows each, or [None] for a single pass"""
+        low, high, count = self.db.query(f'export_{name}_bounds')[0]
+        chunks = min(self.workers, -(-count // EXPORT_SPLIT_ROWS))
+        if chunks <= 1:
+            return [None]
+        
+        step = (high - low + 1) / chunks
+        bounds = [low + round(step * i) for i in range(chunks)] + [high + 1]
+        return list(zip(bounds, bounds[1:]))
+    
+    def export_chunk(self, name, key_range, filepath, write_header):
+        if self.cancelled():
+            raise RuntimeError("Export cancelled")
+        
+        statement = f'export_{name}'
+        params = None
+        if key_range:
+            statement += '_range'
+            params = {'low': key_range[0], 'high': key_range[1]}
+        query = statement_text(statement)
+        
+        reported = [0]
+        def on_rows(rows):
+            with self._lock:
+                self.rows_done += rows - reported[0]
+                total = self.rows_done
+            reported[0] = rows
+            if self.progress:
+                self.progress(total)
+        
+        started = time.perf_counter()
+        with self.db.acquire() as connection:
+            with self._lock:
+                self._connections.add(connection)
+            try:
+                if self.cancelled():        # cancel() may have run before the connection was added
+                    raise RuntimeError("Export cancelled")
+                if self.fmt == 'parquet':
+                    rows = stream_to_parquet(connection, query, filepath, params=params, progress=on_rows)
+                else:
+                    cursor = export_cursor(connection)
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    rows = stream_to_csv(cursor, filepath, write_header=write_header, progress=on_rows)
+                    cursor.close()
+            finally:
+                with self._lock:
+                    self._connections.discard(connection)
+        return rows, started, time.perf_counter()
+    
+    def output_paths(self, name, chunks):
+        """Final output path and the files the chunks are written to"""
+        if self.fmt == 'parquet':
+            if chunks == 1:
+                filepath = os.path.join(self.folder, f"{name}.parquet")
+                return filepath, [filepath]
+            # split tables become a Parquet dataset directory, one file per key range
+            filepath = os.path.join(self.folder, name)
+            os.makedirs(filepath, exist_ok=True)
+            return filepath, [os.path.join(filepath, f"part-{i:03d}.parquet") for i in range(chunks)]
+        
+        filepath = os.path.join(self.folder, f"{name}.csv")
+        if chunks == 1:
+            return filepath, [filepath]
+        return filepath, [f"{filepath}.part{i}" for i in range(chunks)]
+    
+    def run(self, tables):
+        """Export every (table, pk, name) and return the per-table report"""
+        started_at = datetime.now().isoformat(timespec='seconds')
+        started = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export') as executor:
+            plans = {}
+            for table, pk, name in tables:
+                plans[table] = executor.submit(self.plan, name)
+            
+            jobs = {}
+            for table, pk, name in tables:
+                try:
+                    ranges = plans[table].result()
+                except Exception as e:
+                    jobs[table] = e
+                    continue
+                
+                filepath, parts = self.output_paths(name, len(ranges))
+                jobs[table] = (filepath, [
+                    (part, executor.submit(self.export_chunk, name, key_range, part, i == 0))
+                    for i, (key_range, part) in enumerate(zip(ranges, parts))
+                ])
+            
+            report = []
+            for table, pk, name in tables:
+                report.append(self.collect(table, jobs[table]))
+        
+        return {
+            'started': started_at,
+            'workers': self.workers,
+            'total_rows': sum(entry['rows'] for entry in report),
+            'wall_seconds': round(time.perf_counter() - started, 3),
+            'tables': report
+        }
+    
+    def collect(self, table, jobs):
+        entry = {'table': table, 'file': None, 'rows': 0,
+                 'chunks': 0, 'seconds': 0.0, 'rows_per_sec': 0, 'error': None}
+        if isinstance(jobs, Exception):
+            entry['error'] = str(jobs)
+            return entry
+        
+        filepath, jobs = jobs
+        entry['file'] = os.path.basename(filepath)
+        entry['chunks'] = len(jobs)
+        first_start, last_end = None, None
+        for part, future in jobs:
+            try:
+                rows, chunk_start, chunk_end = future.result()
+            except Exception as e:
+                entry['error'] = entry['error'] or str(e)
+                continue
+            entry['rows'] += rows
+            first_start = chunk_start if first_start is None else min(first_start, chunk_start)
+            last_end = chunk_end if last_end is None else max(last_end, chunk_end)
+        
+        parts = [part for part, _ in jobs if part != filepath]
+        if self.fmt == 'csv' and parts:
+            if not entry['error']:
+                with open(filepath, 'wb') as target:
+                    for part in parts:
+                        with open(part, 'rb') as source:
+                            shutil.copyfileobj(source, target)
+            for part in parts:
+                if os.path.exists(part):
+                    os.remove(part)
+        
+        if first_start is not None:
+            entry['seconds'] = round(last_end - first_start, 3)
+            if entry['seconds']:
+                entry['rows_per_sec'] = round(entry['rows'] / entry['seconds'])
+        return entry
+
+def read_records(path):
+    """Yield (line number, dict) from a CSV, JSON array or JSON Lines file"""
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            for line, record in enumerate(csv.DictReader(f), start=2):
+                yield line, record
+    elif path.lower().endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            for line, text in enumerate(f, start=1):
+                if text.strip():
+                    yield line, json.loads(text)
+    else:
+        with open(path, encoding='utf-8') as f:
+            for index, record in enumerate(json.load(f), start=1):
+                yield index, record
+
+def normalize_record(record, aliases):
+    """Map header spellings like 'First Name' or 'dob' onto column names"""
+    row = {}
+    for key, value in record.items():
+        key = str(key).strip().lower().replace(' ', '_')
+        row[aliases.get(key, key)] = value.strip() if isinstance(value, str) else value
+    return row
+
+class CitizenImport:
+    """Load citizens from CSV/JSON with array DML, rejecting bad and duplicate rows individually"""
+    
+    FIELDS = ['first_name', 'last_name', 'date_of_birth', 'national_id', 
+              'email', 'phone', 'address', 'residency_status']
+    ALIASES = {'dob': 'date_of_birth', 'residency': 'residency_status'}
+    RESIDENCY = ('Citizen', 'Resident', 'Foreigner')
+    
+    def __init__(self, db, path, progress=None, cancelled=None):
+        self.db = db
+        self.path = path
+        self.progress = progress
+        self.cancelled = cancelled or (lambda: False)
+        self.rejects = []
+        self.seen_ids = set()
+        self.seen_emails = set()
+    
+    def records(self):
+        return read_records(self.path)
+    
+    def normalize(self, record):
+        return normalize_record(record, self.ALIASES)
+    
+    def validate(self, record):
+        """Bind values for one record, or raise ValueError with the reject reason"""
+        row = self.normalize(record)
+        row['residency_status'] = row.get('residency_status') or 'Citizen'
+        missing = [field for field in self.FIELDS if not row.get(field)]
+        if missing:
+            raise ValueError(f"Missing {', '.join(missing)}")
+        
+        dob = datetime.strptime(str(row['date_of_birth'])[:10], '%Y-%m-%d')
+        today = datetime.now()
+        age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+        if age < 18:
+            raise ValueError(f"Citizen must be 18 years or older. Current age: {age}")
+        if row['residency_status'] not in self.RESIDENCY:
+            raise ValueError(f"Invalid residency status: {row['residency_status']}")
+        
+        values = {field: str(row[field]) for field in self.FIELDS}
+        values['date_of_birth'] = dob
+        return values
+    
+    def reject(self, line, values, reason):
+        self.rejects.append((line, values.get('national_id', ''), values.get('email', ''), reason))
+    
+    def batches(self):
+        """Validated (line, values) batches; duplicates inside the file are rejected here"""
+        batch = []
+        for line, record in self.records():
+            try:
+                values = self.validate(record)
+            except (ValueError, TypeError, AttributeError) as e:
+                self.reject(line, self.normalize(record) if isinstance(record, dict) else {}, str(e))
+                continue
+            
+            if values['national_id'] in self.seen_ids:
+                self.reject(line, values, f"Duplicate national ID in file: {values['national_id']}")
+                continue
+            if values['email'] in self.seen_emails:
+                self.reject(line, values, f"Duplicate email in file: {values['email']}")
+                continue
+            self.seen_ids.add(values['national_id'])
+            self.seen_emails.add(values['email'])
+            
+            batch.append((line, values))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def existing(self, cursor, list_type, batch):
+        """National IDs and emails of the batch already registered, in one round-trip"""
+        cursor.execute(statement_text('citizen_duplicates'), {
+            'national_ids': list_type.newobject([values['national_id'] for _, values in batch]),
+            'emails': list_type.newobject([values['email'] for _, values in batch])
+        })
+        national_ids, emails = set(), set()
+        for national_id, email in cursor.fetchall():
+            national_ids.add(national_id)
+            emails.add(email)
+        return national_ids, emails
+    
+    def run(self):
+        """Import the file and return (rows imported, rows rejected)"""
+        imported = processed = 0
+        
+        with self.db.acquire() as connection:
+            cursor = connection.cursor()
+            list_type = connection.gettype('SYS.ODCIVARCHAR2LIST')
+            
+            for batch in self.batches():
+                if self.cancelled():
+                    break
+                
+                national_ids, emails = self.existing(cursor, list_type, batch)
+                rows = []
+                for line, values in batch:
+                    if values['national_id'] in national_ids:
+                        self.reject(line, values, f"National ID already exists: {values['national_id']}")
+                    elif values['email'] in emails:
+                        self.reject(line, values, f"Email already exists: {values['email']}")
+                    else:
+                        rows.append((line, values))
+                
+                if rows:
+                    # one round-trip per batch; rows the database refuses are reported, not fatal
+                    cursor.executemany(statement_text('citizen_insert'), 
+                                       [values for _, values in rows], batcherrors=True)
+                    errors = cursor.getbatcherrors()
+                    for error in errors:
+                        line, values = rows[error.offset]
+                        self.reject(line, values, error.message.strip())
+                    connection.commit()
+                    imported += len(rows) - len(errors)
+                
+                processed += len(batch)
+                if self.progress:
+                    self.progress(processed, imported)
+            cursor.close()
+        
+        self.rejects.sort()
+        return imported, len(self.rejects)
+    
+    def write_rejects(self):
+        """Write the rejected rows next to the source file and return its path"""
+        path = os.path.splitext(self.path)[0] + '.rejects.csv'
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Line', 'National ID', 'Email', 'Reason'])
+            writer.writerows(self.rejects)
+        return path
+
+class ApplicationIntake:
+    """Submit applications in batches through pkg_application_mgmt.submit_applications"""
+    
+    ALIASES = {'citizen': 'citizen_id', 'permit_type': 'permit_type_id', 'permit_id': 'permit_type_id',
+               'priority': 'priority_level', 'note': 'notes'}
+    
+    def __init__(self, db, progress=None, cancelled=None):
+        self.db = db
+        self.progress = progress
+        self.cancelled = cancelled or (lambda: False)
+    
+    def submit(self, applications):
+        """Submit (citizen_id, permit_type_id, priority, notes) tuples
+        
+        Returns one (application_id, application_number, error) per input, in
+        input order; rows after a cancel come back with error 'Cancelled'.
+        """
+        applications = list(applications)
+        results = []
+        
+        with self.db.acquire() as connection:
+            cursor = connection.cursor()
+            id_list_type = connection.gettype('T_ID_LIST')
+            text_list_type = connection.gettype('SYS.ODCIVARCHAR2LIST')
+            
+            for start in range(0, len(applications), SUBMIT_BATCH_SIZE):
+                if self.cancelled():
+                    break
+                batch = applications[start:start + SUBMIT_BATCH_SIZE]
+                app_ids = cursor.var(id_list_type)
+                app_numbers = cursor.var(text_list_type)
+                errors = cursor.var(text_list_type)
+                
+                # one round-trip and one commit per batch
+                cursor.callproc('pkg_application_mgmt.submit_applications', [
+                    id_list_type.newobject([row[0] for row in batch]),
+                    id_list_type.newobject([row[1] for row in batch]),
+                    text_list_type.newobject([row[2] or 'Normal' for row in batch]),
+                    text_list_type.newobject([row[3] or None for row in batch]),
+                    app_ids, app_numbers, errors
+                ])
+                
+                results.extend(zip([None if app_id is None else int(app_id) 
+                                    for app_id in app_ids.getvalue().aslist()],
+                                   app_numbers.getvalue().aslist(),
+                                   errors.getvalue().aslist()))
+                if self.progress:
+                    self.progress(len(results), len(applications))
+            cursor.close()
+        
+        results.extend((None, None, 'Cancelled') for _ in range(len(applications) - len(results)))
+        return results
+    
+    def submit_file(self, path):
+        """Submit a CSV/JSON intake file and write <file>.results.csv; returns (submitted, rejected, path)"""
+        lines, applications, results = [], [], {}
+        for line, record in read_records(path):
+            row = normalize_record(record, self.ALIASES) if isinstance(record, dict) else {}
+            try:
+                applications.append((int(row['citizen_id']), int(row['permit_type_id']),
+                                     row.get('priority_level'), row.get('notes')))
+                lines.append(line)
+            except (KeyError, TypeError, ValueError):
+                results[line] = (None, None, 'citizen_id and permit_type_id must be numbers')
+        
+        results.update(zip(lines, self.submit(applications)))
+        
+        results_path = os.path.splitext(path)[0] + '.results.csv'
+        with open(results_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Line', 'Application ID', 'Application Number', 'Error'])
+            for line in sorted(results):
+                writer.writerow([line, *results[line]])
+        
+        submitted = sum(1 for app_id, _, _ in results.values() if app_id is not None)
+        return submitted, len(results) - submitted, results_path
+
+class TTLCache:
+    """Thread-safe store whose entries expire after a fixed number of seconds"""
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if time.monotonic() >= expires:
+                del self._entries[key]
+                return default
+            return value
+    
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+    
+    def get_or_load(self, key, loader):
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            self.put(key, value)
+        return value
+    
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+class ReferenceCache:
+    """In-memory copies of the small reference tables, reloaded only when a table changes"""
+    
+    TABLES = {
+        'PERMIT_TYPE': 'reference_permit_types',
+        'DEPARTMENT': 'reference_departments',
+        'HOLIDAYS': 'reference_holidays',
+    }
+    
+    def __init__(self, db, check_seconds=REFERENCE_CHECK_SECONDS):
+        self.db = db
+        self.check_seconds = check_seconds
+        self.clock_offset = None    # database SYSDATE minus local time, from the last check
+        self.reloads = {table: 0 for table in self.TABLES}
+        self._rows = {}
+        self._versions = {}
+        self._checked = None
+        self._lock = threading.Lock()
+    
+    def fresh(self):
+        return self._checked is not None and time.monotonic() - self._checked < self.check_seconds
+    
+    def refresh(self):
+        """Check every table's version in one query and reload only the ones that changed"""
+        with self._lock:
+            if self.fresh():
+                return
+            # versions are read before the rows: a change in between only causes an extra reload
+            versions = {}
+            for table, scn, count, server_now in self.db.query('reference_versions'):
+                versions[table] = (scn, count)
+                self.clock_offset = server_now - datetime.now()
+            for table, statement in self.TABLES.items():
+                if table not in self._rows or versions.get(table) != self._versions.get(table):
+                    self._rows[table] = self.db.query(statement)
+                    self._versions[table] = versions.get(table)
+                    self.reloads[table] += 1
+            self._checked = time.monotonic()
+    
+    def rows(self, table):
+        """The table's rows, checking for changes at most every check_seconds (worker threads)"""
+        self.refresh()
+        return self._rows[table]
+    
+    def cached_rows(self, table):
+        """The table's rows without touching the database, or None when a check is due"""
+        return self._rows.get(table) if self.fresh() else None
+    
+    def invalidate(self):
+        """Check versions on the next lookup (unchanged tables are not reloaded)"""
+        self._checked = None
+    
+    def permit_types(self, rows=None):
+        """Active (permit_type_id, permit_name) pairs"""
+        rows = self.rows('PERMIT_TYPE') if rows is None else rows
+        return [(row[0], row[1]) for row in rows if row[4] == 'Y']
+    
+    def departments(self, rows=None):
+        """Active (department_id, department_name) pairs"""
+        rows = self.rows('DEPARTMENT') if rows is None else rows
+        return [(row[0], row[1]) for row in rows if row[2] == 'Y']
+    
+    def permit_details(self, permit_type_id):
+        """Same text as fn_get_permit_details, served from memory"""
+        for row in self.rows('PERMIT_TYPE'):
+            if row[0] == permit_type_id:
+                _, name, fee, days, active = row
+                return (f"Permit: {name}\nFee: {fee:,.0f} RWF\n"
+                        f"Estimated Processing: {days} days\n"
+                        f"Status: {'Active' if active == 'Y' else 'Inactive'}")
+        return 'Permit type not found'
+
+class BusinessCalendar:
+    """Client-side mirror of check_operation_allowed backed by the cached HOLIDAYS table"""
+    WEEKDAYS = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+    
+    def __init__(self, reference):
+        self.reference = reference
+    
+    def check(self, holiday_rows=None):
+        """Same verdict strings as check_operation_allowed(); checks the cache if needed"""
+        if holiday_rows is None:
+            holiday_rows = self.reference.rows('HOLIDAYS')
+        # judge "today" by the database clock, as the triggers do
+        today = datetime.now() + self.reference.clock_offset
+        day = self.WEEKDAYS[today.weekday()]
+        if day not in ('SAT', 'SUN'):
+            return f'DENIED: Operations not allowed on weekdays ({day})'
+        if any(row[0].date() == today.date() for row in holiday_rows):
+            return 'DENIED: Operations not allowed on public holidays'
+        return 'ALLOWED'
+    
+    def cached_check(self):
+        """The verdict without touching the database, or None when the cache needs a check"""
+        holiday_rows = self.reference.cached_rows('HOLIDAYS')
+        return self.check(holiday_rows) if holiday_rows is not None else None
+
+class LRUCache:
+    """Thread-safe mapping that keeps only the most recently used entries"""
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+    
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+def search_params(text):
+    """Bind values for the *_search statements: escaped LIKE prefixes and the row bound"""
+    prefix = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    return {'prefix': prefix, 'upper_prefix': prefix.upper(), 'limit': SEARCH_LIMIT}
+
+class TypeAhead:
+    """Fill a ttk.Combobox from debounced, cached lookups as the user types"""
+    
+    def __init__(self, combo, tasks, lookup, cache, name):
+        self.combo = combo
+        self.tasks = tasks
+        self.lookup = lookup      # text -> list of "id: label" values, run on a worker
+        self.cache = cache
+        self.name = name
+        self._after = None
+        combo.bind('<KeyRelease>', self.on_key)
+    
+    def on_key(self, event):
+        if event.keysym in ('Up', 'Down', 'Return', 'Escape', 'Tab'):
+            return
+        if self._after:
+            self.combo.after_cancel(self._after)
+        self._after = self.combo.after(SEARCH_DEBOUNCE_MS, self.search)
+    
+    def search(self):
+        self._after = None
+        text = self.combo.get().strip()
+        if len(text) < SEARCH_MIN_CHARS or ':' in text:
+            return  # too short, or a value already picked from the list
+        
+        key = (self.name, text.upper())
+        values = self.cache.get(key)
+        if values is not None:
+            self.show(text, values)
+            return
+        
+        def done(values):
+            self.cache.put(key, values)
+            self.show(text, values)
+        
+        self.tasks.submit(lambda: self.lookup(text), done, text=f"Searching {self.name}...")
+    
+    def show(self, text, values):
+        # drop answers to input the user has already typed past
+        if self.combo.winfo_exists() and self.combo.get().strip() == text:
+            self.combo['values'] = values
+
+STATEMENT_TAG = re.compile(r'/\* permit:(\S+) \*/')
+
+def statement_name(sql):
+    """Registry name of a tagged statement, else its first words"""
+    match = STATEMENT_TAG.search(sql)
+    if match:
+        return match.group(1)
+    return ' '.join(sql.split())[:60]
+
+def estimate_bytes(rows):
+    """Approximate wire size of rows (or bind sets), from a sample of at most 20"""
+    if not rows:
+        return 0
+    sample = rows[:20]
+    size = 0
+    for row in sample:
+        values = row.values() if isinstance(row, dict) else row
+        for value in values:
+            if isinstance(value, (str, bytes, bytearray)):
+                size += len(value)
+            elif value is not None:
+                size += 8
+    return size * len(rows) // len(sample)
+
+class QueryMetrics:
+    """Per-statement timings, round-trips, rows and bytes, plus the slow-query log"""
+    
+    def __init__(self, slow_ms=PERF_SLOW_MS, slow_log=PERF_SLOW_LOG):
+        self.slow_ms = slow_ms
+        self.slow_log = slow_log
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()   # file writes never hold up record() on other threads
+        self.statements = {}
+        self.started = datetime.now()
+    
+    def record(self, name, kind, ms, round_trips=1, rows=0, bytes_in=0, bytes_out=0,
+               site=None, sql=None, error=None):
+        with self._lock:
+            entry = self.statements.get(name)
+            if entry is None:
+                entry = self.statements[name] = {
+                    'kind': kind, 'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'round_trips': 0, 'rows': 0, 'bytes_in': 0, 'bytes_out': 0,
+                    'samples': deque(maxlen=PERF_SAMPLES), 'sites': {}
+                }
+            entry['calls'] += 1
+            entry['errors'] += 1 if error else 0
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            entry['round_trips'] += round_trips
+            entry['rows'] += rows
+            entry['bytes_in'] += bytes_in
+            entry['bytes_out'] += bytes_out
+            entry['samples'].append(ms)
+            if site:
+                entry['sites'][site] = entry['sites'].get(site, 0) + 1
+        
+        if self.slow_log and ms >= self.slow_ms:
+            self.log_slow({
+                'at': datetime.now().isoformat(timespec='milliseconds'), 'statement': name,
+                'kind': kind, 'ms': round(ms, 1), 'round_trips': round_trips, 'rows': rows,
+                'bytes_in': bytes_in, 'bytes_out': bytes_out, 'site': site,
+                'error': str(error) if error else None,
+                'sql': ' '.join(sql.split())[:PERF_SQL_CHARS] if sql else None
+            })
+    
+    def log_slow(self, entry):
+        try:
+            with self._log_lock, open(self.slow_log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+        except OSError:
+            pass  # the log is diagnostic; never fail the statement over it
+    
+    def reset(self):
+        with self._lock:
+            self.statements.clear()
+            self.started = datetime.now()
+    
+    def calls(self, name):
+        with self._lock:
+            entry = self.statements.get(name)
+            return entry['calls'] if entry else 0
+    
+    def snapshot(self):
+        """One dict per statement, slowest total first, with percentiles and histogram"""
+        with self._lock:
+            items = [(name, dict(entry, samples=list(entry['samples']), sites=dict(entry['sites'])))
+                     for name, entry in self.statements.items()]
+        
+        report = []
+        for name, entry in items:
+            samples = sorted(entry.pop('samples'))
+            histogram = {f"<={edge}": 0 for edge in PERF_BUCKETS_MS}
+            histogram[f">{PERF_BUCKETS_MS[-1]}"] = 0
+            for ms in samples:
+                for edge in PERF_BUCKETS_MS:
+                    if ms <= edge:
+                        histogram[f"<={edge}"] += 1
+                        break
+                else:
+                    histogram[f">{PERF_BUCKETS_MS[-1]}"] += 1
+            sites = sorted(entry.pop('sites').items(), key=lambda item: -item[1])
+            report.append(dict(
+                entry, statement=name,
+                total_ms=round(entry['total_ms'], 1), max_ms=round(entry['max_ms'], 1),
+                avg_ms=round(entry['total_ms'] / entry['calls'], 2),
+                p50_ms=round(samples[len(samples) // 2], 2) if samples else None,
+                p95_ms=round(samples[min(len(samples) - 1, len(samples) * 95 // 100)], 2) if samples else None,
+                histogram=histogram, sites=[{'site': site, 'calls': calls} for site, calls in sites]
+            ))
+        report.sort(key=lambda entry: -entry['total_ms'])
+        return report
+    
+    def dump(self, path):
+        """Write the snapshot as JSON for offline analysis"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'since': self.started.isoformat(timespec='seconds'),
+                       'written': datetime.now().isoformat(timespec='seconds'),
+                       'slow_ms': self.slow_ms, 'statements': self.snapshot()}, f, indent=2)
+
+# frames of the instrumentation itself, skipped when looking for the caller
+CONTEXTLIB_FILE = sys.modules[contextmanager.__module__].__file__  # acquire()'s with-block plumbing
+
+def call_site():
+    """Innermost caller outside the instrumented cursor, connection and DatabaseManager, as function:line"""
+    instrumented = (InstrumentedCursor, InstrumentedConnection, DatabaseManager)
+    frame = sys._getframe(1)
+    # skipped by the object a frame runs on, so app functions that happen to share a
+    # method name (start, close, query, ...) are still reported
+    while frame and (isinstance(frame.f_locals.get('self'), instrumented)
+                     or frame.f_code.co_filename == CONTEXTLIB_FILE):
+        frame = frame.f_back
+    if frame is None:
+        return None
+    code = frame.f_code
+    return f"{getattr(code, 'co_qualname', code.co_name)}:{frame.f_lineno}"
+
+def unwrap(value):
+    """Raw driver cursor for an InstrumentedCursor passed as a bind (REF CURSOR out)"""
+    return value.cursor if isinstance(value, InstrumentedCursor) else value
+
+class InstrumentedCursor:
+    """Cursor proxy timing every execute, call and fetch into QueryMetrics
+    
+    A statement is recorded once its result is fully fetched, the cursor is reused
+    or closed, so its wall time, round-trips and rows cover the whole exchange.
+    """
+    
+    def __init__(self, cursor, metrics):
+        object.__setattr__(self, 'cursor', cursor)
+        object.__setattr__(self, 'metrics', metrics)
+        object.__setattr__(self, 'current', None)
+        object.__setattr__(self, 'source', None)   # set when filled as a REF CURSOR
+    
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+    
+    def __setattr__(self, name, value):
+        setattr(self.cursor, name, value)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany()
+            if not rows:
+                return
+            yield from rows
+    
+    def start(self, name, kind, sql=None, bytes_out=0):
+        self.finish()
+        object.__setattr__(self, 'current', {
+            'name': name, 'kind': kind, 'sql': sql, 'site': call_site(),
+            'ms': 0.0, 'round_trips': 1, 'rows': 0, 'bytes_in': 0, 'bytes_out': bytes_out
+        })
+    
+    def finish(self, error=None):
+        current = self.current
+        if current is None:
+            return
+        object.__setattr__(self, 'current', None)
+        arraysize = self.cursor.arraysize or 1
+        if current['kind'] == 'query':
+            # rows beyond the batch prefetched with the execute arrive arraysize at a time
+            extra = max(0, current['rows'] - (self.cursor.prefetchrows or 0))
+            current['round_trips'] += -(-extra // arraysize)
+        elif current['kind'] == 'fetch':
+            current['round_trips'] = max(1, -(-current['rows'] // arraysize))
+            object.__setattr__(self, 'source', None)
+        self.metrics.record(current.pop('name'), current.pop('kind'), current.pop('ms'), error=error, **current)
+    
+    def timed(self, call, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        except oracledb.Error as e:
+            self.current['ms'] += (time.perf_counter() - started) * 1000
+            self.finish(error=e)
+            raise
+        finally:
+            if self.current is not None:
+                self.current['ms'] += (time.perf_counter() - started) * 1000
+    
+    def execute(self, statement, parameters=None, **kwargs):
+        binds = parameters if parameters is not None else kwargs
+        for value in (binds.values() if isinstance(binds, dict) else binds or []):
+            if isinstance(value, InstrumentedCursor):
+                object.__setattr__(value, 'source', f"{statement_name(statement)} (ref cursor)")
+        if isinstance(binds, dict):
+            binds = {key: unwrap(value) for key, value in binds.items()}
+        elif binds:
+            binds = [unwrap(value) for value in binds]
+        self.start(statement_name(statement), 'query', statement, estimate_bytes([binds]) if binds else 0)
+        if parameters is None and not kwargs:
+            return self.timed(self.cursor.execute, statement)
+        if parameters is None:
+            return self.timed(self.cursor.execute, statement, **binds)
+        return self.timed(self.cursor.execute, statement, binds)
+    
+    def executemany(self, statement, parameters, **kwargs):
+        self.start(statement_name(statement), 'executemany', statement, estimate_bytes(parameters))
+        try:
+            return self.timed(self.cursor.executemany, statement, parameters, **kwargs)
+        finally:
+            if self.current is not None:
+                self.current['rows'] = len(parameters) if hasattr(parameters, '__len__') else 0
+                self.finish()
+    
+    def callproc(self, name, parameters=None, **kwargs):
+        for value in parameters or []:
+            if isinstance(value, InstrumentedCursor):
+                object.__setattr__(value, 'source', f"{name} (ref cursor)")
+        parameters = [unwrap(value) for value in parameters or []]
+        self.start(name, 'procedure', bytes_out=estimate_bytes([parameters]))
+        try:
+            return self.timed(self.cursor.callproc, name, parameters, **kwargs)
+        finally:
+            self.finish()
+    
+    def callfunc(self, name, return_type, parameters=None, **kwargs):
+        self.start(name, 'function', bytes_out=estimate_bytes([parameters or []]))
+        try:
+            result = self.timed(self.cursor.callfunc, name, return_type, parameters or [], **kwargs)
+        finally:
+            self.finish()
+        if return_type is oracledb.CURSOR:
+            # the returned REF CURSOR is fetched separately; measure those fetches too
+            result = InstrumentedCursor(result, self.metrics)
+            object.__setattr__(result, 'source', f"{name} (ref cursor)")
+        return result
+    
+    def fetched(self, rows):
+        if self.current is None:
+            # a REF CURSOR filled by a procedure call: its fetches are their own statement
+            self.start(self.source or 'ref cursor', 'fetch')
+            self.current['round_trips'] = 0
+        self.current['rows'] += len(rows)
+        self.current['bytes_in'] += estimate_bytes(rows)
+    
+    def fetchone(self):
+        if self.current is None and self.source is None:
+            return self.cursor.fetchone()
+        if self.current is None:
+            self.fetched([])
+        row = self.timed(self.cursor.fetchone)
+        if row is None:
+            self.finish()
+        else:
+            self.fetched([row])
+        return row
+    
+    def fetchmany(self, size=None):
+        size = size or self.cursor.arraysize
+        if self.current is None and self.source is None:
+            return self.cursor.fetchmany(size)
+        if self.current is None:
+            self.fetched([])
+        rows = self.timed(self.cursor.fetchmany, size)
+        self.fetched(rows)
+        if len(rows) < size:
+            self.finish()
+        return rows
+    
+    def fetchall(self):
+        if self.current is None and self.source is None:
+            return self.cursor.fetchall()
+        if self.current is None:
+            self.fetched([])
+        rows = self.timed(self.cursor.fetchall)
+        self.fetched(rows)
+        self.finish()
+        return rows
+    
+    def close(self):
+        self.finish()
+        self.cursor.close()
+
+class InstrumentedConnection:
+    """Connection proxy handing out InstrumentedCursors and timing commits"""
+    
+    def __init__(self, connection, metrics):
+        self.connection = connection
+        self.metrics = metrics
+    
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+    
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self.connection.cursor(*args, **kwargs), self.metrics)
+    
+    def commit(self):
+        started = time.perf_counter()
+        self.connection.commit()
+        self.metrics.record('COMMIT', 'commit', (time.perf_counter() - started) * 1000, site=call_site())
+    
+    def fetch_df_all(self, statement, parameters=None, **kwargs):
+        site = call_site()
+        started = time.perf_counter()
+        df = self.connection.fetch_df_all(statement=statement, parameters=parameters, **kwargs)
+        self.metrics.record(statement_name(statement), 'dataframe', (time.perf_counter() - started) * 1000,
+                            rows=df.num_rows(), site=site, sql=statement)
+        return df
+    
+    def fetch_df_batches(self, statement, parameters=None, size=None, **kwargs):
+        """Yield the driver's batches, timing only the fetches, not the consumer"""
+        site = call_site()
+        batches = iter(self.connection.fetch_df_batches(statement=statement, parameters=parameters,
+                                                        size=size, **kwargs))
+        ms, rows, round_trips = 0.0, 0, 0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    df = next(batches)
+                except StopIteration:
+                    return
+                finally:
+                    ms += (time.perf_counter() - started) * 1000
+                    round_trips += 1
+                rows += df.num_rows()
+                yield df
+        finally:
+            self.metrics.record(statement_name(statement), 'dataframe', ms, round_trips=round_trips,
+                                rows=rows, site=site, sql=statement)
+
 class DatabaseManager:
-    def __init__(self, config):
+    def __init__(self, config, pool_config=None, metrics=None):
         self.config = config
-        self.connection = None
+        self.pool_config = pool_config or POOL_CONFIG
+        self.metrics = metrics or QueryMetrics()
+        self.pool = None
+        self._lock = threading.Lock()
+        self._active = {}
+        self.stats = {'acquired': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0,
+                      'dropped': 0, 'reconnects': 0}
         
     def connect(self):
         try:
-            self.connection = oracledb.connect(**self.config)
+            self.pool = self._create_pool()
+            with self.acquire():
+                pass  # validate credentials and network up front
             return True
         except oracledb.Error as e:
             messagebox.showerror("Connection Error", str(e))
             return False
     
+    def _create_pool(self):
+        return oracledb.create_pool(
+            **self.config,
+            min=self.pool_config['min'],
+            max=self.pool_config['max'],
+            increment=self.pool_config['increment'],
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout=self.pool_config['wait_timeout'],
+            ping_interval=self.pool_config['ping_interval'],
+            timeout=self.pool_config['timeout'],
+            stmtcachesize=self.pool_config['stmtcachesize']
+        )
+    
+    def _rebuild_pool(self, broken_pool):
+        """Replace a pool whose connections were lost"""
+        with self._lock:
+            if self.pool is not broken_pool:
+                return  # another worker already reconnected
+            try:
+                broken_pool.close(force=True)
+            except oracledb.Error:
+                pass
+            self.pool = self._create_pool()
+            self.stats['reconnects'] += 1
+    
+    @staticmethod
+    def is_connection_lost(error):
+        err = error.args[0] if error.args else None
+        return (getattr(err, 'full_code', None) in RECONNECT_ERRORS
+                or getattr(err, 'isrecoverable', False))
+    
+    def _acquire_connection(self):
+        pool = self.pool
+        started = time.perf_counter()
+        try:
+            connection = pool.acquire()
+        except oracledb.Error as e:
+            if not self.is_connection_lost(e):
+                raise
+            self._rebuild_pool(pool)
+            connection = self.pool.acquire()
+        
+        waited = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.stats['acquired'] += 1
+            self.stats['wait_ms_total'] += waited
+            self.stats['wait_ms_max'] = max(self.stats['wait_ms_max'], waited)
+        return connection
+    
+    @contextmanager
+    def acquire(self):
+        """Borrow a pooled connection for the duration of a with-block
+        
+        The connection is wrapped so every statement run on it is recorded in
+        self.metrics, whichever code path issues it.
+        """
+        connection = self._acquire_connection()
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._active.setdefault(thread_id, []).append(connection)
+        try:
+            yield InstrumentedConnection(connection, self.metrics)
+        finally:
+            with self._lock:
+                self._active[thread_id].remove(connection)
+                if not self._active[thread_id]:
+                    del self._active[thread_id]
+            try:
+                if connection.is_healthy():
+                    self.pool.release(connection)
+                else:
+                    self.pool.drop(connection)
+                    with self._lock:
+                        self.stats['dropped'] += 1
+            except oracledb.Error:
+                pass
+    
+    def interrupt(self, thread_id):
+        """Abort the call in progress on the connections held by a thread"""
+        with self._lock:
+            connections = list(self._active.get(thread_id, []))
+        for connection in connections:
+            try:
+                connection.cancel()
+            except oracledb.Error:
+                pass
+    
+    def pool_stats(self):
+        if not self.pool:
+            return {}
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update({
+            'opened': self.pool.opened,
+            'busy': self.pool.busy,
+            'min': self.pool.min,
+            'max': self.pool.max,
+            'increment': self.pool.increment,
+            'wait_ms_avg': stats['wait_ms_total'] / stats['acquired'] if stats['acquired'] else 0.0
+        })
+        return stats
+    
     def disconnect(self):
-        if self.connection:
+        if self.pool:
             try:
-                self.connection.close()
+                self.pool.close(force=True)
             except:
                 pass
     
-    def execute_query(self, query, params=None):
+    def fetch_all(self, query, params=None, arraysize=None):
+        """Run a query and return all rows, raising oracledb.Error on failure"""
+        for attempt in range(2):
+            try:
+                with self.acquire() as connection:
+                    cursor = connection.cursor()
+                    if arraysize:
+                        # size the buffers so a bounded result arrives with the execute
+                        cursor.arraysize = arraysize
+                        cursor.prefetchrows = arraysize + 1
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    results = cursor.fetchall()
+                    cursor.close()
+                    return results
+            except oracledb.Error as e:
+                if attempt == 0 and self.is_connection_lost(e):
+                    continue  # the dead connection was dropped; retry on a fresh one
+                raise
+    
+    def query(self, name, params=None, arraysize=None):
+        """Run a registered statement from STATEMENTS and return all rows"""
+        return self.fetch_all(statement_text(name), params, arraysize=arraysize)
+    
+    def statement_stats(self):
+        """Per-statement (name, client executions, server executions, parse calls, hard parses)"""
+        try:
+            server = {row[0]: row[1:] for row in self.query('statement_stats') if row[0]}
+        except oracledb.Error:
+            server = None  # no SELECT privilege on V$SQL
+        
+        counts = {entry['statement']: entry['calls'] for entry in self.metrics.snapshot()
+                  if entry['statement'] in STATEMENTS}
+        rows = []
+        for name in sorted(set(counts) | set(server or {})):
+            executions, parses, loads = (server or {}).get(name, (None, None, None))
+            rows.append((name, counts.get(name, 0), executions, parses, loads))
+        return rows, server is not None
+
+class BackgroundTask:
+    def __init__(self, work, on_success, on_error, text, group):
+        self.work = work
+        self.on_success = on_success
+        self.on_error = on_error
+        self.text = text
+        self.group = group
+        self.future = None
+        self.thread_id = None
+        self.cancelled = False
+        self.on_cancel = None       # set by work that runs queries on threads of its own
+
+class TaskRunner:
+    """Run database work on worker threads and deliver results on the Tk loop"""
+    
+    def __init__(self, root, db, workers=TASK_WORKERS, on_change=None):
+        self.root = root
+        self.db = db
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db-task')
+        self.results = queue.Queue()
+        self.pending = []
+        self.on_change = on_change
+        self._polling = False
+        self._local = threading.local()
+    
+    def submit(self, work, on_success=None, on_error=None, text="Loading...", group=None):
+        """Queue work() on a worker; callbacks run on the Tk thread"""
+        task = BackgroundTask(work, on_success, on_error, text, group)
+        task.future = self.executor.submit(self._run, task)
+        self.pending.append(task)
+        self._changed()
+        
+        if not self._polling:
+            self._polling = True
+            self.root.after(TASK_POLL_MS, self._poll)
+        return task
+    
+    def _run(self, task):
+        if task.cancelled:
+            self.results.put((task, None, None))
+            return
+        
+        task.thread_id = threading.get_ident()
+        self._local.task = task
         try:
-            cursor = self.connection.cursor()
-            if params:
-                cursor.execute(query, params)
+            result = task.work()
+        except Exception as e:
+            self.results.put((task, None, e))
+        else:
+            self.results.put((task, result, None))
+        finally:
+            task.thread_id = None
+            self._local.task = None
+    
+    def current(self):
+        """The task running on the calling worker thread, if any"""
+        return getattr(self._local, 'task', None)
+    
+    def set_text(self, text):
+        """Update the status text of the task running on the calling worker"""
+        task = getattr(self._local, 'task', None)
+        if task is not None:
+            task.text = text
+    
+    def _poll(self):
+        while True:
+            try:
+                task, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self._finish(task, result, error)
+        
+        for task in [t for t in self.pending if t.future.cancelled()]:
+            self.pending.remove(task)
+        self._changed()
+        
+        if self.pending:
+            self.root.after(TASK_POLL_MS, self._poll)
+        else:
+            self._polling = False
+    
+    def _finish(self, task, result, error):
+        if task in self.pending:
+            self.pending.remove(task)
+        if task.cancelled:
+            return
+        
+        if error is not None:
+            if task.on_error:
+                task.on_error(error)
             else:
-                cursor.execute(query)
-            results = cursor.fetchall()
+                messagebox.showerror("Error", str(error))
+        elif task.on_success:
+            task.on_success(result)
+    
+    def _changed(self):
+        if self.on_change:
+            self.on_change(self.pending)
+    
+    def cancel(self, task):
+        task.cancelled = True
+        if not task.future.cancel():
+            thread_id = task.thread_id
+            if thread_id:
+                self.db.interrupt(thread_id)
+            if task.on_cancel:
+                task.on_cancel()
+    
+    def cancel_group(self, group):
+        for task in list(self.pending):
+            if task.group == group:
+                self.cancel(task)
+    
+    def cancel_all(self):
+        for task in list(self.pending):
+            self.cancel(task)
+    
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+def sorts_before(a, b, descending):
+    """Oracle ordering of two column values; NULLs sort as the largest value"""
+    if a is None or b is None:
+        if a is None and b is None:
+            return False
+        return (a is None) == descending
+    return a > b if descending else a < b
+
+class PagedTreeview:
+    """Treeview that materializes only the visible rows of a server-side paged query
+    
+    The first column of the query must be the primary key. When key and table are
+    given, refresh() fetches only the rows changed since the last refresh and merges
+    them into the cached pages instead of reloading the view. The row count is then
+    kept from the inserted and deleted keys, which assumes the query shows every row
+    of table, as the data views do.
+    """
+    
+    def __init__(self, parent, tasks, db, columns, query, params=None, title="rows", on_count=None,
+                 key=None, table=None, changed='last_updated', watch=(), sort=(0, True)):
+        self.tasks = tasks
+        self.db = db
+        self.query = query
+        self.params = params or {}
+        self.title = title
+        self.on_count = on_count
+        self.key = key              # primary key column, as named by both the query and the table
+        self.table = table
+        self.changed = changed      # indexed DATE column stamped on every insert and update
+        self.watch = watch          # (joined table, join column) pairs whose edits show in the view
+        self.sort = sort            # (column index, descending) matching the query's ORDER BY
+        
+        self.pages = {}         # page number -> list of row tuples
+        self.loading = set()
+        self.total = None       # unknown until the COUNT(*) returns or a short page is seen
+        self.since = None       # database time of the last count, minus DATA_REFRESH_OVERLAP
+        self.high_key = None    # largest key counted in total; larger changed keys are inserts
+        self.gone = set()       # deleted keys already taken off total
+        self.counted = None     # time.monotonic() of the last full count
+        self.refreshed = None   # time.monotonic() of the last count or refresh
+        self.refreshing = False
+        self.first = 0          # index of the top visible row
+        self.visible = 20
+        self.selected = None    # row index of the selected item, kept across scrolling
+        self.positions = {}     # Tree item id -> row index of the rendered items
+        self.rendered = {}      # Tree item id -> values last written to the item
+        
+        self.vsb = ttk.Scrollbar(parent, orient="vertical", command=self.on_scrollbar)
+        self.hsb = ttk.Scrollbar(parent, orient="horizontal")
+        
+        self.tree = ttk.Treeview(parent, columns=columns, show='headings',
+                                 xscrollcommand=self.hsb.set)
+        self.hsb.config(command=self.tree.xview)
+        
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+        
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll_by(-3 if e.delta > 0 else 3))
+        self.tree.bind('<Button-4>', lambda e: self.scroll_by(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_by(3))
+        self.tree.bind('<Prior>', lambda e: self.scroll_by(-self.visible))
+        self.tree.bind('<Next>', lambda e: self.scroll_by(self.visible))
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+    
+    def grid(self):
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.vsb.grid(row=0, column=1, sticky='ns')
+        self.hsb.grid(row=1, column=0, sticky='ew')
+    
+    def load(self):
+        """Fetch the row count and the first page in parallel"""
+        if self.key is None:
+            count = statement_text('view_count', query=self.query)
+        else:
+            count = statement_text('view_count_keyed', query=self.query, key=self.key)
+        self.tasks.submit(
+            lambda: self.db.fetch_all(count, self.params),
+            self.set_count, text=f"Counting {self.title}...", group='view'
+        )
+        self.ensure_pages()
+    
+    def reload(self):
+        """Drop every cached page and load the view from scratch"""
+        self.pages.clear()
+        self.total = None
+        self.gone.clear()
+        self.load()
+    
+    # ---- incremental refresh ----
+    
+    def refresh(self):
+        """Fetch the rows changed since the last count and merge them in place"""
+        if self.refreshing:
+            return
+        if (self.key is None or self.since is None
+                or time.monotonic() - self.refreshed >= DATA_RELOAD_SECONDS):
+            self.reload()
+            return
+        
+        recount = time.monotonic() - self.counted >= DATA_RECOUNT_SECONDS
+        self.refreshing = True
+        self.tasks.submit(lambda: self.fetch_changes(recount), self.apply_changes,
+                          on_error=self.refresh_failed,
+                          text=f"Refreshing {self.title}...", group='view')
+    
+    def changed_keys(self):
+        """Subquery of the keys whose rows changed since :since, one branch per watched table"""
+        branches = [VIEW_CHANGED_ROWS.format(key=self.key, table=self.table, changed=self.changed)]
+        branches += [VIEW_CHANGED_PARENTS.format(key=self.key, table=self.table, column=column, parent=parent)
+                     for parent, column in self.watch]
+        return ' UNION ALL '.join(branches)
+    
+    def fetch_changes(self, recount=False):
+        """Return (count, database time, largest key, changed rows, deleted keys)
+        
+        Without recount, count and largest key are None and apply_changes derives
+        them from the changes, so no query touches more than the changed rows.
+        """
+        binds = dict(self.params, since=self.since)
+        with self.db.acquire() as connection:
+            cursor = connection.cursor()
+            cursor.arraysize = DATA_PAGE_SIZE
+            if recount:
+                cursor.execute(statement_text('view_count_keyed', query=self.query, key=self.key),
+                               self.params)
+                total, now, high = cursor.fetchone()
+            else:
+                cursor.execute(statement_text('server_time'))
+                (now,), total, high = cursor.fetchone(), None, None
+            
+            cursor.execute(statement_text('view_changes', query=self.query, key=self.key,
+                                          changed_keys=self.changed_keys()), binds)
+            changed = cursor.fetchall()
+            
+            cursor.execute(statement_text('view_deleted_keys'),
+                           {'table_name': self.table.upper(), 'since': self.since})
+            deleted = {row[0] for row in cursor.fetchall()}
             cursor.close()
-            return results
-        except oracledb.Error as e:
-            messagebox.showerror("Query Error", str(e))
-            return []
+        return total, now, high, changed, deleted
+    
+    def refresh_failed(self, error):
+        # e.g. ORA-00942 when phase_7/change_tracking.sql is not installed
+        self.refreshing = False
+        self.reload()
+    
+    def apply_changes(self, result):
+        self.refreshing = False
+        total, now, high, changed, deleted = result
+        self.since = now - timedelta(seconds=DATA_REFRESH_OVERLAP)
+        self.refreshed = time.monotonic()
+        
+        old_total = self.total
+        changed = {row[0]: row for row in changed if row[0] not in deleted}
+        if total is None:
+            # deletes are counted once (tombstones inside the overlap are read again),
+            # and only for rows that were counted in the first place
+            total, high = old_total, self.high_key or 0
+            total -= len({key for key in deleted if key <= high} - self.gone)
+        else:
+            self.counted = self.refreshed
+            high = high or 0
+        # keys come from sequences, so a key above every counted one is an insert;
+        # one committed out of order is picked up by the next recount
+        inserted = [key for key in changed if key > high]
+        total += len(inserted)
+        self.high_key = max([high, *inserted])
+        self.gone |= deleted
+        
+        selected = self.row(self.selected) if self.selected is not None else None
+        self.merge(changed, deleted, total, old_total)
+        
+        self.selected = None
+        if selected is not None:
+            for page, rows in self.pages.items():
+                for offset, row in enumerate(rows):
+                    if row[0] == selected[0]:
+                        self.selected = page * DATA_PAGE_SIZE + offset
+        
+        self.total = total
+        if self.on_count:
+            self.on_count(total)
+        self.scroll_to(self.first)
+    
+    def merge(self, changed, deleted, total, old_total):
+        """Apply changed and deleted rows to the cached run of pages holding the visible rows
+        
+        Row positions are only known exactly when the run starts at the top of the
+        result. A run further down is patched in place when nothing moved; otherwise
+        it is dropped and its pages are re-fetched.
+        """
+        lo = self.first // DATA_PAGE_SIZE
+        if lo not in self.pages:
+            self.pages.clear()
+            return
+        while lo - 1 in self.pages:
+            lo -= 1
+        hi = lo
+        while hi + 1 in self.pages:
+            hi += 1
+        
+        rows = [row for page in range(lo, hi + 1) for row in self.pages[page]]
+        at_end = len(self.pages[hi]) < DATA_PAGE_SIZE or (
+            old_total is not None and lo * DATA_PAGE_SIZE + len(rows) >= old_total)
+        index, descending = self.sort
+        cached = {row[0] for row in rows}
+        
+        if lo > 0:
+            # rows before the run may have been inserted or deleted; only an in-place
+            # update of rows that kept their sort position is safe to apply
+            moved = deleted or total != old_total or any(
+                key not in cached or row[index] != self.row_by_key(rows, key)[index]
+                for key, row in changed.items()
+            )
+            self.pages.clear()
+            if not moved:
+                rows = [changed.get(row[0], row) for row in rows]
+                for page in range(lo, hi + 1):
+                    start = (page - lo) * DATA_PAGE_SIZE
+                    self.pages[page] = rows[start:start + DATA_PAGE_SIZE]
+            return
+        
+        merged = []
+        pending = []
+        for row in rows:
+            if row[0] in deleted:
+                continue
+            new = changed.pop(row[0], None)
+            if new is None:
+                merged.append(row)
+            elif new[index] == row[index]:
+                merged.append(new)
+            else:
+                pending.append(new)     # sort value changed: re-inserted below
+        pending.extend(changed.values())
+        
+        for new in pending:
+            position = 0
+            while position < len(merged) and not sorts_before(new[index], merged[position][index], descending):
+                position += 1
+            if position < len(merged) or at_end:
+                merged.insert(position, new)
+            # otherwise it sorts after the cached run and is fetched with its page
+        
+        self.pages.clear()
+        if at_end and len(merged) != total:
+            return  # changed again between the count and the delta; start over
+        pages = -(-len(merged) // DATA_PAGE_SIZE) if at_end else len(merged) // DATA_PAGE_SIZE
+        for page in range(pages):
+            self.pages[page] = merged[page * DATA_PAGE_SIZE:(page + 1) * DATA_PAGE_SIZE]
+    
+    @staticmethod
+    def row_by_key(rows, key):
+        for row in rows:
+            if row[0] == key:
+                return row
+        return None
+    
+    # ---- paging ----
+    
+    def page_range(self):
+        """Pages needed for the visible window plus one page of prefetch each way"""
+        first_page = max(0, self.first // DATA_PAGE_SIZE - 1)
+        last_page = (self.first + self.visible) // DATA_PAGE_SIZE + 1
+        if self.total is not None:
+            last_page = min(last_page, max(0, self.total - 1) // DATA_PAGE_SIZE)
+        return range(first_page, last_page + 1)
+    
+    def ensure_pages(self):
+        wanted = self.page_range()
+        for page in wanted:
+            if page not in self.pages and page not in self.loading:
+                self.loading.add(page)
+                self.tasks.submit(lambda page=page: self.fetch_page(page),
+                                  lambda rows, page=page: self.page_loaded(page, rows),
+                                  on_error=lambda error, page=page: self.page_failed(page, error),
+                                  text=f"Loading {self.title}...", group='view')
+        
+        # keep memory bounded: forget pages far from the current position
+        for page in list(self.pages):
+            if len(self.pages) <= DATA_CACHED_PAGES:
+                break
+            if page not in wanted:
+                del self.pages[page]
+    
+    def fetch_page(self, page):
+        if page not in self.page_range():
+            return None  # scrolled away before the worker picked it up
+        params = dict(self.params, row_offset=page * DATA_PAGE_SIZE, page_size=DATA_PAGE_SIZE)
+        return self.db.fetch_all(
+            statement_text('view_page', query=self.query),
+            params, arraysize=DATA_PAGE_SIZE
+        )
+    
+    def page_loaded(self, page, rows):
+        self.loading.discard(page)
+        if rows is None:
+            return
+        self.pages[page] = rows
+        if len(rows) < DATA_PAGE_SIZE and self.total is None:
+            self.set_count([(page * DATA_PAGE_SIZE + len(rows),)])
+        else:
+            self.render()
+    
+    def page_failed(self, page, error):
+        self.loading.discard(page)
+        messagebox.showerror("Query Error", str(error))
+    
+    def set_count(self, result):
+        self.total = result[0][0]
+        if len(result[0]) > 1:
+            self.since = result[0][1] - timedelta(seconds=DATA_REFRESH_OVERLAP)
+            self.counted = self.refreshed = time.monotonic()
+        if len(result[0]) > 2:
+            self.high_key = result[0][2] or 0
+        if self.on_count:
+            self.on_count(self.total)
+        self.scroll_to(self.first)
+    
+    # ---- scrolling ----
+    
+    def last_first(self):
+        total = self.total if self.total is not None else len(self.pages.get(0, []))
+        return max(0, total - self.visible)
+    
+    def scroll_to(self, first):
+        self.first = max(0, min(int(first), self.last_first()))
+        self.ensure_pages()
+        self.render()
+    
+    def scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+        return 'break'
+    
+    def on_scrollbar(self, *args):
+        if args[0] == 'moveto':
+            total = self.total or 0
+            self.scroll_to(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = self.visible if args[2] == 'pages' else 1
+            self.scroll_by(int(args[1]) * step)
+    
+    def on_resize(self, event):
+        rowheight = ttk.Style().lookup('Treeview', 'rowheight') or 20
+        visible = max(1, (event.height - 25) // int(rowheight))
+        if visible != self.visible:
+            self.visible = visible
+            self.scroll_to(self.first)
+    
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection and selection[0] in self.positions:
+            self.selected = self.positions[selection[0]]
+    
+    def row(self, index):
+        page = self.pages.get(index // DATA_PAGE_SIZE)
+        if page is None or index % DATA_PAGE_SIZE >= len(page):
+            return None
+        return page[index % DATA_PAGE_SIZE]
+    
+    def render(self):
+        """Bring the Tree items in line with the rows of the visible window
+        
+        Items are keyed by primary key, so a refresh or a scroll only touches the
+        items whose row appeared, disappeared or changed.
+        """
+        end = self.first + self.visible
+        if self.total is not None:
+            end = min(end, self.total)
+        
+        wanted = []
+        for index in range(self.first, end):
+            values = self.row(index)
+            if values is None:
+                if self.total is None:
+                    break
+                wanted.append((f"loading-{index}", index, ('...',)))
+                continue
+            wanted.append((f"row-{values[0]}", index, tuple(values)))
+        
+        keep = {iid for iid, _, _ in wanted}
+        stale = [iid for iid in self.tree.get_children() if iid not in keep]
+        if stale:
+            self.tree.delete(*stale)
+        for iid in stale:
+            self.rendered.pop(iid, None)
+        
+        self.positions = {}
+        for position, (iid, index, values) in enumerate(wanted):
+            self.positions[iid] = index
+            if not self.tree.exists(iid):
+                self.tree.insert('', position, iid=iid, values=values)
+            else:
+                if self.rendered.get(iid) != values:
+                    self.tree.item(iid, values=values)
+                if self.tree.index(iid) != position:
+                    self.tree.move(iid, '', position)
+            self.rendered[iid] = values
+        
+        selected = [iid for iid, index, _ in wanted if index == self.selected]
+        if selected and self.tree.selection() != tuple(selected):
+            self.tree.selection_set(selected[0])
+        
+        total = self.total or 0
+        if total:
+            self.vsb.set(self.first / total, min(1.0, end / total))
+        else:
+            self.vsb.set(0.0, 1.0)
 
 class PermitManagementApp:
-    def __init__(self, root):
+    def __init__(self, root, metrics=None):
         self.root = root
         self.root.title("Permit & License Management System - Rwanda")
         self.root.geometry("1400x800")
         self.root.configure(bg='#ecf0f1')
         
-        self.db = DatabaseManager(DB_CONFIG)
+        self.db = DatabaseManager(DB_CONFIG, metrics=metrics)
         if not self.db.connect():
             messagebox.showerror("Fatal Error", "Cannot start without database")
             self.root.quit()
             return
         
+        self.tasks = TaskRunner(self.root, self.db, on_change=self.update_busy_indicator)
+        self.dashboard_cache = TTLCache(DASHBOARD_CACHE_TTL)
+        self.reference = ReferenceCache(self.db)
+        self.calendar = BusinessCalendar(self.reference)
+        self.search_cache = LRUCache(SEARCH_CACHE_SIZE)
+        
         self.create_menu()
         self.create_main_layout()
         self.show_dashboard()
@@ -91,14 +2225,20 @@ class PermitManagementApp:
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Export Audit Logs (CSV)", command=self.export_audit_logs)
         file_menu.add_command(label="Export Audit Logs (JSON)", command=self.export_audit_json)
+        file_menu.add_command(label="Export Audit Logs (Parquet)", command=self.export_audit_parquet)
+        file_menu.add_command(label="Export Audit Logs (Incremental)", command=self.export_audit_delta)
         file_menu.add_command(label="Export All Data", command=self.export_all_data)
+        file_menu.add_command(label="Export All Data (Parquet)", 
+                              command=lambda: self.export_all_data('parquet'))
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.on_closing)
         
         ops_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Operations", menu=ops_menu)
         ops_menu.add_command(label="Register Citizen", command=self.show_register_citizen)
+        ops_menu.add_command(label="Import Citizens (CSV/JSON)", command=self.import_citizens)
         ops_menu.add_command(label="Submit Application", command=self.show_submit_application)
+        ops_menu.add_command(label="Submit Applications (CSV/JSON)", command=self.submit_application_file)
         ops_menu.add_command(label="Process Payment", command=self.show_process_payment)
         ops_menu.add_command(label="Add Review Step", command=self.show_add_review)
         ops_menu.add_separator()
@@ -110,13 +2250,36 @@ class PermitManagementApp:
         reports_menu.add_command(label="Monthly Revenue", command=self.show_monthly_revenue)
         reports_menu.add_command(label="Department Performance", command=self.show_dept_performance)
         reports_menu.add_command(label="Top Permit Types", command=self.show_top_permits)
+        reports_menu.add_command(label="Eligibility Matrix", command=self.show_eligibility_matrix)
         reports_menu.add_command(label="Calculate Revenue", command=self.calculate_revenue)
         
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Connection Pool Status", command=self.show_pool_stats)
+        tools_menu.add_command(label="Statement Statistics", command=self.show_statement_stats)
+        tools_menu.add_command(label="Performance", command=self.show_performance)
+        
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
         help_menu.add_command(label="About", command=self.show_about)
     
     def create_main_layout(self):
+        self.status_bar = tk.Frame(self.root, bg='#bdc3c7')
+        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        self.status_label = tk.Label(self.status_bar, text="Ready", bg='#bdc3c7', 
+                                     font=('Arial', 9), anchor='w')
+        self.status_label.pack(side=tk.LEFT, padx=10, pady=3)
+        
+        self.cancel_button = tk.Button(self.status_bar, text="Cancel", command=self.tasks.cancel_all,
+                                       bg='#e74c3c', fg='white', font=('Arial', 8, 'bold'), 
+                                       relief=tk.FLAT, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5, pady=2)
+        
+        self.progress = ttk.Progressbar(self.status_bar, mode='indeterminate', length=150)
+        self.progress.pack(side=tk.RIGHT, padx=5, pady=3)
+        self.busy = False
+        
         self.sidebar = tk.Frame(self.root, bg='#2c3e50', width=200)
         self.sidebar.pack(side=tk.LEFT, fill=tk.Y)
         
@@ -144,7 +2307,24 @@ class PermitManagementApp:
         self.content_frame = tk.Frame(self.root, bg='white')
         self.content_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
     
+    def update_busy_indicator(self, pending):
+        if pending:
+            text = pending[-1].text
+            if len(pending) > 1:
+                text += f"  (+{len(pending) - 1} more)"
+            self.status_label.config(text=text)
+            if not self.busy:
+                self.busy = True
+                self.cancel_button.config(state=tk.NORMAL)
+                self.progress.start(15)
+        elif self.busy:
+            self.busy = False
+            self.status_label.config(text="Ready")
+            self.cancel_button.config(state=tk.DISABLED)
+            self.progress.stop()
+    
     def clear_content(self):
+        self.tasks.cancel_group('view')
         for widget in self.content_frame.winfo_children():
             widget.destroy()
     
@@ -162,60 +2342,51 @@ class PermitManagementApp:
         stats_container = tk.Frame(self.content_frame, bg='white')
         stats_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
-        stats = self.get_dashboard_stats()
-        
-        row, col = 0, 0
-        for label, value, color in stats:
-            card = tk.Frame(stats_container, bg=color, relief=tk.RAISED, bd=3)
-            card.grid(row=row, column=col, padx=15, pady=15, sticky='nsew', ipadx=20, ipady=20)
-            
-            tk.Label(card, text=label, font=('Arial', 11, 'bold'), 
-                    bg=color, fg='white').pack(pady=8)
-            tk.Label(card, text=str(value), font=('Arial', 24, 'bold'), 
-                    bg=color, fg='white').pack(pady=8)
+        def render(stats):
+            row, col = 0, 0
+            for label, value, color in stats:
+                card = tk.Frame(stats_container, bg=color, relief=tk.RAISED, bd=3)
+                card.grid(row=row, column=col, padx=15, pady=15, sticky='nsew', ipadx=20, ipady=20)
+                
+                tk.Label(card, text=label, font=('Arial', 11, 'bold'), 
+                        bg=color, fg='white').pack(pady=8)
+                tk.Label(card, text=str(value), font=('Arial', 24, 'bold'), 
+                        bg=color, fg='white').pack(pady=8)
+                
+                col += 1
+                if col > 2:
+                    col, row = 0, row + 1
             
-            col += 1
-            if col > 2:
-                col, row = 0, row + 1
+            for i in range(3):
+                stats_container.columnconfigure(i, weight=1)
+                stats_container.rowconfigure(i, weight=1)
+        
+        stats = self.dashboard_cache.get('dashboard')
+        if stats is not None:
+            render(stats)
+            return
         
-        for i in range(3):
-            stats_container.columnconfigure(i, weight=1)
-            stats_container.rowconfigure(i, weight=1)
+        self.tasks.submit(self.get_dashboard_stats, render, 
+                          text="Loading dashboard...", group='view')
     
     def get_dashboard_stats(self):
-        stats = []
-        
-        result = self.db.execute_query("SELECT COUNT(*) FROM CITIZEN WHERE status = 'Active'")
-        stats.append(("Active Citizens", result[0][0] if result else 0, '#3498db'))
-        
-        result = self.db.execute_query("SELECT COUNT(*) FROM APPLICATION")
-        stats.append(("Total Applications", result[0][0] if result else 0, '#2ecc71'))
-        
-        result = self.db.execute_query(
-            "SELECT COUNT(*) FROM APPLICATION WHERE status IN ('Submitted', 'Under Review')"
-        )
-        stats.append(("Pending Reviews", result[0][0] if result else 0, '#f39c12'))
-        
-        result = self.db.execute_query(
-            "SELECT COUNT(*) FROM ISSUED_LICENSE WHERE license_status = 'Active'"
-        )
-        stats.append(("Active Licenses", result[0][0] if result else 0, '#9b59b6'))
-        
-        result = self.db.execute_query(
-            "SELECT NVL(SUM(payment_amount), 0) FROM APPLICATION WHERE payment_status = 'Paid'"
-        )
-        stats.append(("Total Revenue (RWF)", f"{result[0][0]:,.0f}" if result else 0, '#e74c3c'))
-        
-        result = self.db.execute_query("SELECT COUNT(*) FROM PERMIT_TYPE WHERE is_active = 'Y'")
-        stats.append(("Permit Types", result[0][0] if result else 0, '#1abc9c'))
-        
-        result = self.db.execute_query("SELECT COUNT(*) FROM DEPARTMENT WHERE is_active = 'Y'")
-        stats.append(("Departments", result[0][0] if result else 0, '#34495e'))
-        
-        result = self.db.execute_query("SELECT COUNT(*) FROM AUDIT_LOG")
-        stats.append(("Audit Records", result[0][0] if result else 0, '#95a5a6'))
-        
-        return stats
+        return self.dashboard_cache.get_or_load('dashboard', self.load_dashboard_stats)
+    
+    def load_dashboard_stats(self):
+        result = self.db.query('dashboard_stats')
+        (citizens, total_apps, pending_apps, revenue, 
+         licenses, permit_types, departments, audit_records) = result[0]
+        
+        return [
+            ("Active Citizens", citizens, '#3498db'),
+            ("Total Applications", total_apps, '#2ecc71'),
+            ("Pending Reviews", pending_apps, '#f39c12'),
+            ("Active Licenses", licenses, '#9b59b6'),
+            ("Total Revenue (RWF)", f"{revenue:,.0f}", '#e74c3c'),
+            ("Permit Types", permit_types, '#1abc9c'),
+            ("Departments", departments, '#34495e'),
+            ("Audit Records", audit_records, '#95a5a6'),
+        ]
     
     def show_citizens(self):
         self.clear_content()
@@ -227,10 +2398,12 @@ class PermitManagementApp:
                        residency_status, status
                 FROM CITIZEN ORDER BY citizen_id DESC
             """,
+            'key': 'citizen_id', 'table': 'CITIZEN',
             'actions': [
                 ('Register New', self.show_register_citizen),
                 ('Calculate Age', lambda t: self.calculate_age(t)),
-                ('Check Eligibility', lambda t: self.check_eligibility(t))
+                ('Check Eligibility', lambda t: self.check_eligibility(t)),
+                ('All Permits', lambda t: self.show_eligibility_matrix(t))
             ]
         })
     
@@ -248,6 +2421,8 @@ class PermitManagementApp:
                 JOIN PERMIT_TYPE pt ON a.permit_type_id = pt.permit_type_id
                 ORDER BY a.application_id DESC
             """,
+            'key': 'application_id', 'table': 'APPLICATION',
+            'watch': [('CITIZEN', 'citizen_id'), ('PERMIT_TYPE', 'permit_type_id')],
             'actions': [
                 ('Submit New', self.show_submit_application),
                 ('View Summary', lambda t: self.view_summary(t)),
@@ -264,6 +2439,7 @@ class PermitManagementApp:
                        validity_period, estimated_days, is_active
                 FROM PERMIT_TYPE ORDER BY permit_name
             """,
+            'key': 'permit_type_id', 'table': 'PERMIT_TYPE', 'sort': (1, False),
             'actions': [('Get Details', lambda t: self.get_permit_details(t))]
         })
     
@@ -276,6 +2452,7 @@ class PermitManagementApp:
                        head_officer, contact_email, is_active
                 FROM DEPARTMENT ORDER BY department_name
             """,
+            'key': 'department_id', 'table': 'DEPARTMENT', 'sort': (1, False),
             'actions': [('Pending Reviews', lambda t: self.count_pending_reviews(t))]
         })
     
@@ -292,6 +2469,7 @@ class PermitManagementApp:
                 JOIN APPLICATION a ON l.application_id = a.application_id
                 ORDER BY l.license_id DESC
             """,
+            'key': 'license_id', 'table': 'ISSUED_LICENSE',
             'actions': [('Calculate Renewal Fee', lambda t: self.calc_renewal_fee(t))]
         })
     
@@ -307,6 +2485,7 @@ class PermitManagementApp:
                 JOIN DEPARTMENT d ON r.department_id = d.department_id
                 ORDER BY r.step_id DESC
             """,
+            'key': 'step_id', 'table': 'REVIEW_STEP', 'watch': [('DEPARTMENT', 'department_id')],
             'actions': [
                 ('Add Review', self.show_add_review),
                 ('Complete Step', lambda t: self.complete_review(t))
@@ -322,6 +2501,7 @@ class PermitManagementApp:
                        ROUND(file_size/1024, 2), TO_CHAR(upload_date, 'YYYY-MM-DD'), verified
                 FROM DOCUMENT ORDER BY document_id DESC
             """,
+            'key': 'document_id', 'table': 'DOCUMENT',
             'actions': []
         })
     
@@ -333,6 +2513,7 @@ class PermitManagementApp:
                 SELECT holiday_id, holiday_name, TO_CHAR(holiday_date, 'YYYY-MM-DD'), holiday_type
                 FROM HOLIDAYS ORDER BY holiday_date
             """,
+            'key': 'holiday_id', 'table': 'HOLIDAYS', 'sort': (2, False),
             'actions': []
         })
     
@@ -344,8 +2525,9 @@ class PermitManagementApp:
                 SELECT audit_id, table_name, operation_type,
                        TO_CHAR(operation_date, 'YYYY-MM-DD HH24:MI:SS'),
                        username, status, record_id
-                FROM AUDIT_LOG ORDER BY audit_id DESC FETCH FIRST 500 ROWS ONLY
+                FROM AUDIT_LOG ORDER BY audit_id DESC
             """,
+            'key': 'audit_id', 'table': 'AUDIT_LOG',
             'actions': [
                 ('Export CSV', lambda t: self.export_audit_logs()),
                 ('Export JSON', lambda t: self.export_audit_json())
@@ -367,172 +2549,192 @@ class PermitManagementApp:
                      padx=10, pady=5).pack(side=tk.LEFT, padx=5)
         
         tk.Button(control_frame, text='🔄 Refresh', 
-                 command=lambda: self.create_data_view(title, config),
+                 command=lambda: view.refresh(),
                  bg='#95a5a6', fg='white', font=('Arial', 9, 'bold'),
                  padx=10, pady=5).pack(side=tk.LEFT, padx=5)
         
+        count_label = tk.Label(control_frame, text="", bg='#ecf0f1', font=('Arial', 9))
+        count_label.pack(side=tk.RIGHT, padx=10)
+        
         tree_frame = tk.Frame(self.content_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical")
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal")
-        
-        tree = ttk.Treeview(tree_frame, columns=config['columns'], show='headings',
-                           yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-        
-        vsb.config(command=tree.yview)
-        hsb.config(command=tree.xview)
-        
-        for col in config['columns']:
-            tree.heading(col, text=col)
-            tree.column(col, width=100)
-        
-        tree.grid(row=0, column=0, sticky='nsew')
-        vsb.grid(row=0, column=1, sticky='ns')
-        hsb.grid(row=1, column=0, sticky='ew')
+        view = PagedTreeview(tree_frame, self.tasks, self.db, config['columns'], config['query'],
+                             params=config.get('params'), title=title,
+                             on_count=lambda total: count_label.config(text=f"{total:,} rows"),
+                             key=config.get('key'), table=config.get('table'),
+                             changed=config.get('changed', 'last_updated'),
+                             watch=config.get('watch', ()),
+                             sort=config.get('sort', (0, True)))
+        view.grid()
         
         tree_frame.grid_rowconfigure(0, weight=1)
         tree_frame.grid_columnconfigure(0, weight=1)
         
-        results = self.db.execute_query(config['query'])
-        for row in results:
-            tree.insert('', tk.END, values=row)
-        
-        config['tree'] = tree
+        config['tree'] = view.tree
+        config['view'] = view
+        view.load()
     
     # ============ FIXED EXPORT METHODS ============
     
     def export_audit_logs(self):
         """Export audit logs to CSV - FIXED"""
-        try:
-            cursor = self.db.connection.cursor()
-            refcursor = cursor.var(oracledb.CURSOR)
-            cursor.callproc('sp_export_audit_log', [None, None, None, None, refcursor])
-            
-            result_cursor = refcursor.getvalue()
-            results = result_cursor.fetchall()
-            result_cursor.close()
-            cursor.close()
-            
-            if not results:
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        
+        def work():
+            count = export_audit_log(self.db, lambda cursor: stream_to_csv(
+                cursor, filename, header=AUDIT_CSV_HEADER,
+                progress=lambda rows: self.tasks.set_text(f"Exporting audit logs: {rows:,} rows...")
+            ))
+            if not count:
+                os.remove(filename)
+            return count
+        
+        def done(count):
+            if not count:
                 messagebox.showinfo("No Data", "No audit logs found")
-                return
-            
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
-            )
-            
-            if filename:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(['ID', 'Table', 'Operation', 'Date', 'Time', 'User', 
-                                   'Status', 'Reason', 'Record ID', 'Old Values', 'New Values'])
-                    
-                    for row in results:
-                        processed_row = [safe_convert(cell) for cell in row]
-                        writer.writerow(processed_row)
-                
+            else:
                 messagebox.showinfo("Success", f"Exported to {filename}")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Export failed: {str(e)}")
+        
+        self.tasks.submit(work, done, 
+                          on_error=lambda e: messagebox.showerror("Error", f"Export failed: {str(e)}"),
+                          text="Exporting audit logs...")
     
     def export_audit_json(self):
-        """Export audit logs to JSON - FIXED"""
-        try:
-            cursor = self.db.connection.cursor()
-            refcursor = cursor.var(oracledb.CURSOR)
-            cursor.callproc('sp_export_audit_log', [None, None, None, None, refcursor])
-            
-            result_cursor = refcursor.getvalue()
-            results = result_cursor.fetchall()
-            result_cursor.close()
-            cursor.close()
-            
-            if not results:
+        """Stream audit logs to JSON Lines (.jsonl, .jsonl.gz) or a JSON array (.json, .json.gz)"""
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("Gzipped JSON Lines", "*.jsonl.gz"),
+                       ("JSON files", "*.json"), ("Gzipped JSON files", "*.json.gz"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        # the layout follows the name under any .gz suffix: audit.json.gz is a gzipped array
+        stem = filename[:-3] if filename.lower().endswith('.gz') else filename
+        
+        def work():
+            count = export_audit_log(self.db, lambda cursor: stream_audit_json(
+                cursor, filename, as_array=stem.lower().endswith('.json'),
+                progress=lambda rows: self.tasks.set_text(f"Exporting audit logs: {rows:,} rows...")
+            ))
+            if not count:
+                os.remove(filename)
+            return count
+        
+        def done(count):
+            if not count:
                 messagebox.showinfo("No Data", "No audit logs found")
-                return
-            
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".json",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
-            )
-            
-            if filename:
-                audit_data = []
-                for row in results:
-                    audit_data.append({
-                        'id': int(row[0]) if row[0] is not None else None,
-                        'table': safe_convert(row[1]),
-                        'operation': safe_convert(row[2]),
-                        'date': safe_convert(row[3])[:10] if row[3] else None,
-                        'time': safe_convert(row[4]),
-                        'user': safe_convert(row[5]),
-                        'status': safe_convert(row[6]),
-                        'reason': safe_convert(row[7]),
-                        'record_id': int(row[8]) if row[8] is not None else None,
-                        'old_values': safe_convert(row[9]),
-                        'new_values': safe_convert(row[10])
-                    })
-                
-                with open(filename, 'w', encoding='utf-8') as jsonfile:
-                    json.dump(audit_data, jsonfile, indent=2)
-                
+            else:
                 messagebox.showinfo("Success", f"Exported to {filename}")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Export failed: {str(e)}")
+        
+        self.tasks.submit(work, done, 
+                          on_error=lambda e: messagebox.showerror("Error", f"Export failed: {str(e)}"),
+                          text="Exporting audit logs...")
     
-    def export_all_data(self):
-        """Export all data to CSV - FIXED"""
-        folder = filedialog.askdirectory(title="Select folder")
+    def export_audit_parquet(self):
+        """Export audit logs to Parquet with native column types"""
+        if pq is None:
+            messagebox.showerror("Parquet Export", "Parquet export needs pyarrow:\n\npip install pyarrow")
+            return
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".parquet",
+            filetypes=[("Parquet files", "*.parquet"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        
+        def work():
+            with self.db.acquire() as connection:
+                return stream_to_parquet(
+                    connection, statement_text('audit_log_all'), filename,
+                    progress=lambda rows: self.tasks.set_text(f"Exporting audit logs: {rows:,} rows...")
+                )
+        
+        def done(count):
+            if not count:
+                messagebox.showinfo("No Data", "No audit logs found")
+            else:
+                messagebox.showinfo("Success", f"Exported {count:,} rows to {filename}")
+        
+        self.tasks.submit(work, done, 
+                          on_error=lambda e: messagebox.showerror("Error", f"Export failed: {str(e)}"),
+                          text="Exporting audit logs...")
+    
+    def export_audit_delta(self):
+        """Append audit rows added since the last incremental export"""
+        folder = filedialog.askdirectory(title="Select audit export folder")
         if not folder:
             return
         
-        tables = [
-            ('CITIZEN', 'citizens.csv'),
-            ('APPLICATION', 'applications.csv'),
-            ('PERMIT_TYPE', 'permit_types.csv'),
-            ('DEPARTMENT', 'departments.csv'),
-            ('ISSUED_LICENSE', 'licenses.csv'),
-            ('REVIEW_STEP', 'review_steps.csv'),
-            ('DOCUMENT', 'documents.csv'),
-            ('HOLIDAYS', 'holidays.csv'),
-            ('AUDIT_LOG', 'audit_logs.csv')
-        ]
+        def work():
+            task = self.tasks.current()
+            def progress(rows):
+                task.text = f"Exporting new audit logs: {rows:,} rows..."
+            return AuditDeltaExport(self.db, folder, progress=progress, 
+                                    cancelled=lambda: task.cancelled).run()
+        
+        def done(result):
+            count, filename, last_id = result
+            if not count:
+                messagebox.showinfo("No Data", f"No new audit logs since audit ID {last_id}")
+            else:
+                messagebox.showinfo("Success", f"Appended {count:,} audit logs to {filename}\n"
+                                               f"Watermark: audit ID {last_id}")
         
-        exported = 0
-        failed = []
+        self.tasks.submit(work, done, 
+                          on_error=lambda e: messagebox.showerror("Error", f"Export failed: {str(e)}"),
+                          text="Exporting new audit logs...")
+    
+    def export_all_data(self, fmt='csv'):
+        """Export all tables to CSV or Parquet in parallel, with a timing report"""
+        if fmt == 'parquet' and pq is None:
+            messagebox.showerror("Parquet Export", "Parquet export needs pyarrow:\n\npip install pyarrow")
+            return
         
-        for table, filename in tables:
-            try:
-                cursor = self.db.connection.cursor()
-                cursor.execute(f"SELECT * FROM {table}")
-                results = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-                cursor.close()
-                
-                filepath = f"{folder}/{filename}"
-                with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(columns)
-                    
-                    for row in results:
-                        processed_row = [safe_convert(cell) for cell in row]
-                        writer.writerow(processed_row)
-                
-                exported += 1
-                
-            except Exception as e:
-                failed.append(f"{table}: {str(e)}")
+        folder = filedialog.askdirectory(title="Select folder")
+        if not folder:
+            return
         
-        summary = f"Exported {exported}/{len(tables)} tables"
-        if failed:
-            summary += "\n\nFailed:\n" + "\n".join(failed)
-            messagebox.showwarning("Export Complete", summary)
-        else:
-            messagebox.showinfo("Success", summary)
+        def work():
+            task = self.tasks.current()
+            def progress(rows):
+                task.text = f"Exporting all tables: {rows:,} rows..."
+            
+            export = ParallelExport(self.db, folder, progress=progress, 
+                                    cancelled=lambda: task.cancelled, fmt=fmt)
+            task.on_cancel = export.cancel      # the workers' pooled connections are not this thread's
+            report = export.run(EXPORT_TABLES)
+            
+            with open(os.path.join(folder, 'export_report.json'), 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            return report
+        
+        def done(report):
+            lines = [f"{'Table':<16}{'Rows':>12}{'Secs':>9}{'Rows/s':>10}"]
+            failed = []
+            for entry in report['tables']:
+                if entry['error']:
+                    failed.append(f"{entry['table']}: {entry['error']}")
+                    continue
+                lines.append(f"{entry['table']:<16}{entry['rows']:>12,}{entry['seconds']:>9.1f}"
+                             f"{entry['rows_per_sec']:>10,}")
+            
+            exported = len(report['tables']) - len(failed)
+            summary = (f"Exported {exported}/{len(report['tables'])} tables, "
+                       f"{report['total_rows']:,} rows in {report['wall_seconds']:.1f}s\n\n" + "\n".join(lines))
+            if failed:
+                summary += "\n\nFailed:\n" + "\n".join(failed)
+                messagebox.showwarning("Export Complete", summary)
+            else:
+                messagebox.showinfo("Success", summary)
+        
+        self.tasks.submit(work, done, text="Exporting all tables...")
     
     # ============ FIXED DIALOG METHODS ============
     
@@ -573,10 +2775,7 @@ class PermitManagementApp:
                     return
             
             try:
-                cursor = self.db.connection.cursor()
-                citizen_id_var = cursor.var(oracledb.NUMBER)
-                
-                cursor.callproc('sp_register_citizen', [
+                args = [
                     entries['first_name'].get(),
                     entries['last_name'].get(),
                     datetime.strptime(entries['dob'].get(), '%Y-%m-%d'),
@@ -584,22 +2783,32 @@ class PermitManagementApp:
                     entries['email'].get(),
                     entries['phone'].get(),
                     entries['address'].get(),
-                    residency_var.get(),
-                    citizen_id_var
-                ])
-                
-                self.db.connection.commit()
-                citizen_id_value = citizen_id_var.getvalue()
-                cursor.close()
-                
+                    residency_var.get()
+                ]
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+                return
+            
+            def work():
+                with self.db.acquire() as connection:
+                    cursor = connection.cursor()
+                    citizen_id_var = cursor.var(oracledb.NUMBER)
+                    
+                    cursor.callproc('sp_register_citizen', args + [citizen_id_var])
+                    
+                    connection.commit()
+                    self.dashboard_cache.invalidate()
+                    self.search_cache.invalidate()
+                    citizen_id_value = citizen_id_var.getvalue()
+                    cursor.close()
+                return citizen_id_value
+            
+            def done(citizen_id_value):
                 messagebox.showinfo("Success", f"Citizen registered! ID: {citizen_id_value}")
                 dialog.destroy()
                 self.show_citizens()
-                
-            except oracledb.Error as e:
-                messagebox.showerror("Error", str(e))
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            self.tasks.submit(work, done, text="Registering citizen...")
         
         btn_frame = tk.Frame(dialog)
         btn_frame.grid(row=len(fields)+1, column=0, columnspan=2, pady=20)
@@ -609,6 +2818,93 @@ class PermitManagementApp:
         tk.Button(btn_frame, text="Cancel", command=dialog.destroy, 
                  bg='#e74c3c', fg='white', width=15, font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
     
+    def import_citizens(self):
+        """Bulk-register citizens from a CSV or JSON file"""
+        path = filedialog.askopenfilename(title="Select citizens file", 
+                                          filetypes=[("Citizen files", "*.csv *.json *.jsonl"),
+                                                     ("All files", "*.*")])
+        if not path:
+            return
+        
+        def work():
+            task = self.tasks.current()
+            def progress(processed, imported):
+                task.text = f"Importing citizens: {imported:,} of {processed:,} rows loaded..."
+            
+            importer = CitizenImport(self.db, path, progress=progress, 
+                                     cancelled=lambda: task.cancelled)
+            try:
+                imported, rejected = importer.run()
+            finally:
+                self.dashboard_cache.invalidate()
+                self.search_cache.invalidate()
+            rejects_path = importer.write_rejects() if rejected else None
+            return imported, rejected, rejects_path
+        
+        def done(result):
+            imported, rejected, rejects_path = result
+            message = f"Imported {imported:,} citizens"
+            if rejected:
+                message += f"\nRejected {rejected:,} rows, listed in:\n{rejects_path}"
+            messagebox.showinfo("Import Citizens", message)
+            self.show_citizens()
+        
+        self.tasks.submit(work, done, 
+                          on_error=lambda e: messagebox.showerror("Error", f"Import failed: {str(e)}"),
+                          text="Importing citizens...")
+    
+    def submit_application_file(self):
+        """Submit an agency intake file of applications in batches"""
+        path = filedialog.askopenfilename(title="Select applications file", 
+                                          filetypes=[("Application files", "*.csv *.json *.jsonl"),
+                                                     ("All files", "*.*")])
+        if not path:
+            return
+        
+        def work():
+            task = self.tasks.current()
+            def progress(done, total):
+                task.text = f"Submitting applications: {done:,} of {total:,}..."
+            
+            intake = ApplicationIntake(self.db, progress=progress, cancelled=lambda: task.cancelled)
+            try:
+                return intake.submit_file(path)
+            finally:
+                self.dashboard_cache.invalidate()
+        
+        def done(result):
+            submitted, rejected, results_path = result
+            messagebox.showinfo("Submit Applications", 
+                                f"Submitted {submitted:,} applications, rejected {rejected:,}\n"
+                                f"Application numbers and errors per row:\n{results_path}")
+            self.show_applications()
+        
+        self.tasks.submit(work, done, 
+                          on_error=lambda e: messagebox.showerror("Error", f"Submission failed: {str(e)}"),
+                          text="Submitting applications...")
+    
+    def fill_reference_combo(self, combo, table, pairs):
+        """Fill a picker from the reference cache; only a due change check runs on a worker"""
+        def fill(values):
+            if combo.winfo_exists():
+                combo['values'] = [f"{key}: {label}" for key, label in values]
+        
+        rows = self.reference.cached_rows(table)
+        if rows is not None:
+            fill(pairs(rows))
+            return
+        
+        self.tasks.submit(pairs, fill, text="Loading reference data...")
+    
+    def search_citizens(self, text):
+        rows = self.db.query('citizen_search', search_params(text), arraysize=SEARCH_LIMIT)
+        return [f"{c[0]}: {c[1]} ({c[2]})" for c in rows]
+    
+    def search_permit_types(self, text):
+        prefix = text.upper()
+        return [f"{p[0]}: {p[1]}" for p in self.reference.permit_types() 
+                if p[1].upper().startswith(prefix)][:SEARCH_LIMIT]
+    
     def show_submit_application(self):
         dialog = tk.Toplevel(self.root)
         dialog.title("Submit New Application")
@@ -616,24 +2912,21 @@ class PermitManagementApp:
         dialog.transient(self.root)
         dialog.grab_set()
         
-        citizens = self.db.execute_query(
-            "SELECT citizen_id, first_name || ' ' || last_name FROM CITIZEN WHERE status = 'Active'"
-        )
-        permits = self.db.execute_query(
-            "SELECT permit_type_id, permit_name FROM PERMIT_TYPE WHERE is_active = 'Y'"
-        )
-        
         tk.Label(dialog, text="Citizen:", font=('Arial', 10)).grid(row=0, column=0, sticky='w', padx=20, pady=10)
         citizen_var = tk.StringVar()
         citizen_combo = ttk.Combobox(dialog, textvariable=citizen_var, width=45)
-        citizen_combo['values'] = [f"{c[0]}: {c[1]}" for c in citizens]
         citizen_combo.grid(row=0, column=1, padx=20, pady=10)
+        TypeAhead(citizen_combo, self.tasks, self.search_citizens, self.search_cache, 'citizens')
         
         tk.Label(dialog, text="Permit Type:", font=('Arial', 10)).grid(row=1, column=0, sticky='w', padx=20, pady=10)
         permit_var = tk.StringVar()
         permit_combo = ttk.Combobox(dialog, textvariable=permit_var, width=45)
-        permit_combo['values'] = [f"{p[0]}: {p[1]}" for p in permits]
         permit_combo.grid(row=1, column=1, padx=20, pady=10)
+        TypeAhead(permit_combo, self.tasks, self.search_permit_types, self.search_cache, 'permit types')
+        self.fill_reference_combo(permit_combo, 'PERMIT_TYPE', self.reference.permit_types)
+        
+        tk.Label(dialog, text="Type a name, national ID or phone prefix, then pick from the list", 
+                font=('Arial', 8), fg='#7f8c8d').grid(row=5, column=0, columnspan=2)
         
         tk.Label(dialog, text="Priority:", font=('Arial', 10)).grid(row=2, column=0, sticky='w', padx=20, pady=10)
         priority_var = tk.StringVar(value='Normal')
@@ -652,28 +2945,34 @@ class PermitManagementApp:
             try:
                 cid = int(citizen_var.get().split(':')[0])
                 pid = int(permit_var.get().split(':')[0])
-                
-                cursor = self.db.connection.cursor()
-                app_id_var = cursor.var(oracledb.NUMBER)
-                
-                cursor.callproc('sp_submit_application', [
-                    cid, pid, priority_var.get(),
-                    notes_text.get('1.0', tk.END).strip() or None,
-                    app_id_var
-                ])
-                
-                self.db.connection.commit()
-                app_id_value = app_id_var.getvalue()
-                cursor.close()
-                
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+                return
+            
+            priority = priority_var.get()
+            notes = notes_text.get('1.0', tk.END).strip() or None
+            
+            def work():
+                with self.db.acquire() as connection:
+                    cursor = connection.cursor()
+                    app_id_var = cursor.var(oracledb.NUMBER)
+                    
+                    cursor.callproc('sp_submit_application', [
+                        cid, pid, priority, notes, app_id_var
+                    ])
+                    
+                    connection.commit()
+                    self.dashboard_cache.invalidate()
+                    app_id_value = app_id_var.getvalue()
+                    cursor.close()
+                return app_id_value
+            
+            def done(app_id_value):
                 messagebox.showinfo("Success", f"Application submitted! ID: {app_id_value}")
                 dialog.destroy()
                 self.show_applications()
-                
-            except oracledb.Error as e:
-                messagebox.showerror("Error", str(e))
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            self.tasks.submit(work, done, text="Submitting application...")
         
         btn_frame = tk.Frame(dialog)
         btn_frame.grid(row=4, column=0, columnspan=2, pady=20)
@@ -704,18 +3003,24 @@ class PermitManagementApp:
         
         def process():
             try:
-                cursor = self.db.connection.cursor()
-                cursor.callproc('sp_process_payment', [
-                    int(app_id.get()),
-                    float(amount.get()),
-                    method_var.get()
-                ])
-                self.db.connection.commit()
-                cursor.close()
-                messagebox.showinfo("Success", "Payment processed!")
-                dialog.destroy()
+                args = [int(app_id.get()), float(amount.get()), method_var.get()]
             except Exception as e:
                 messagebox.showerror("Error", str(e))
+                return
+            
+            def work():
+                with self.db.acquire() as connection:
+                    cursor = connection.cursor()
+                    cursor.callproc('sp_process_payment', args)
+                    connection.commit()
+                    self.dashboard_cache.invalidate()
+                    cursor.close()
+            
+            def done(_):
+                messagebox.showinfo("Success", "Payment processed!")
+                dialog.destroy()
+            
+            self.tasks.submit(work, done, text="Processing payment...")
         
         tk.Button(dialog, text="Process", command=process, bg='#2ecc71', fg='white', width=15).grid(row=3, column=0, columnspan=2, pady=20)
     
@@ -724,8 +3029,6 @@ class PermitManagementApp:
         dialog.title("Add Review Step")
         dialog.geometry("500x350")
         
-        depts = self.db.execute_query("SELECT department_id, department_name FROM DEPARTMENT WHERE is_active = 'Y'")
-        
         tk.Label(dialog, text="Application ID:").grid(row=0, column=0, padx=20, pady=10)
         app_id = tk.Entry(dialog, width=30)
         app_id.grid(row=0, column=1, padx=20, pady=10)
@@ -733,9 +3036,10 @@ class PermitManagementApp:
         tk.Label(dialog, text="Department:").grid(row=1, column=0, padx=20, pady=10)
         dept_var = tk.StringVar()
         dept_combo = ttk.Combobox(dialog, textvariable=dept_var, width=28)
-        dept_combo['values'] = [f"{d[0]}: {d[1]}" for d in depts]
         dept_combo.grid(row=1, column=1, padx=20, pady=10)
         
+        self.fill_reference_combo(dept_combo, 'DEPARTMENT', self.reference.departments)
+        
         tk.Label(dialog, text="Reviewer Name:").grid(row=2, column=0, padx=20, pady=10)
         reviewer = tk.Entry(dialog, width=30)
         reviewer.grid(row=2, column=1, padx=20, pady=10)
@@ -746,37 +3050,49 @@ class PermitManagementApp:
         
         def add():
             try:
-                cursor = self.db.connection.cursor()
-                cursor.callproc('sp_add_review_step', [
+                args = [
                     int(app_id.get()),
                     int(dept_var.get().split(':')[0]),
                     reviewer.get(),
                     comments.get('1.0', tk.END).strip()
-                ])
-                self.db.connection.commit()
-                cursor.close()
+                ]
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+                return
+            
+            def work():
+                with self.db.acquire() as connection:
+                    cursor = connection.cursor()
+                    cursor.callproc('sp_add_review_step', args)
+                    connection.commit()
+                    self.dashboard_cache.invalidate()
+                    cursor.close()
+            
+            def done(_):
                 messagebox.showinfo("Success", "Review step added!")
                 dialog.destroy()
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            self.tasks.submit(work, done, text="Adding review step...")
         
         tk.Button(dialog, text="Add", command=add, bg='#3498db', fg='white', width=15).grid(row=4, column=0, columnspan=2, pady=20)
     
     # ============ REPORT & ACTION METHODS ============
     
     def check_operation_allowed(self):
-        try:
-            cursor = self.db.connection.cursor()
-            result = cursor.callfunc('check_operation_allowed', oracledb.STRING, [])
-            cursor.close()
+        def show(result):
             messagebox.showinfo("Operation Check", result)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        
+        result = self.calendar.cached_check()
+        if result is not None:
+            show(result)
+            return
+        
+        self.tasks.submit(self.calendar.check, show, text="Checking operation rules...")
     
     def show_bulk_update(self):
         dialog = tk.Toplevel(self.root)
         dialog.title("Bulk Update Application Status")
-        dialog.geometry("450x300")
+        dialog.geometry("450x380")
         
         tk.Label(dialog, text="Old Status:").grid(row=0, column=0, padx=20, pady=10)
         old_status_var = tk.StringVar(value='Submitted')
@@ -795,27 +3111,84 @@ class PermitManagementApp:
         days_entry.insert(0, "30")
         days_entry.grid(row=2, column=1, padx=20, pady=10)
         
+        progress_bar = ttk.Progressbar(dialog, length=300, mode='determinate')
+        progress_bar.grid(row=4, column=0, columnspan=2, padx=20)
+        progress_label = tk.Label(dialog, text="")
+        progress_label.grid(row=5, column=0, columnspan=2, pady=5)
+        progress = {'done': 0, 'total': 0}
+        
+        def show_progress(task):
+            if not dialog.winfo_exists():
+                return
+            progress_bar['maximum'] = max(progress['total'], 1)
+            progress_bar['value'] = progress['done']
+            progress_label.config(text=f"{progress['done']:,} of {progress['total']:,} updated")
+            if task in self.tasks.pending:
+                dialog.after(TASK_POLL_MS * 4, show_progress, task)
+        
         def update():
             try:
-                cursor = self.db.connection.cursor()
-                count_updated = cursor.var(oracledb.NUMBER)
-                
-                cursor.callproc('sp_bulk_update_status', [
-                    old_status_var.get(),
-                    new_status_var.get(),
-                    int(days_entry.get()),
-                    count_updated
-                ])
-                
-                self.db.connection.commit()
-                count_value = count_updated.getvalue()
-                cursor.close()
-                
-                messagebox.showinfo("Success", f"Updated {count_value} applications")
-                dialog.destroy()
-                
+                args = [old_status_var.get(), new_status_var.get(), int(days_entry.get())]
             except Exception as e:
                 messagebox.showerror("Error", str(e))
+                return
+            
+            # the APPLICATION triggers would reject the first chunk anyway
+            verdict = self.calendar.cached_check()
+            if verdict is not None and verdict != 'ALLOWED':
+                messagebox.showerror("Operation Not Allowed", verdict)
+                return
+            
+            def work():
+                task = self.tasks.current()
+                if verdict is None:
+                    # cache was due for a check: refresh it here, off the Tk thread
+                    refused = self.calendar.check()
+                    if refused != 'ALLOWED':
+                        return refused
+                progress['total'] = self.db.query('bulk_update_candidates', 
+                                                  {'old_status': args[0], 'days': args[2]})[0][0]
+                updated_ids = []
+                with self.db.acquire() as connection:
+                    cursor = connection.cursor()
+                    id_list_type = connection.gettype('T_ID_LIST')
+                    while not task.cancelled:
+                        count_updated = cursor.var(oracledb.NUMBER)
+                        chunk_ids = cursor.var(id_list_type)
+                        
+                        # one chunk per call, committed before it returns: a cancelled or
+                        # failed run keeps the chunks already done, and running it again
+                        # picks up the applications still in the old status
+                        cursor.callproc('sp_bulk_update_status', 
+                                        args + [count_updated, chunk_ids, BULK_UPDATE_CHUNK, BULK_UPDATE_CHUNK])
+                        
+                        ids = [int(app_id) for app_id in chunk_ids.getvalue().aslist()]
+                        if ids:
+                            self.dashboard_cache.invalidate()
+                        updated_ids.extend(ids)
+                        progress['done'] = len(updated_ids)
+                        task.text = (f"Updating application statuses: "
+                                     f"{len(updated_ids):,} of {progress['total']:,}...")
+                        if len(ids) < BULK_UPDATE_CHUNK:
+                            break
+                    cursor.close()
+                return updated_ids
+            
+            def done(updated_ids):
+                if isinstance(updated_ids, str):
+                    messagebox.showerror("Operation Not Allowed", updated_ids)
+                    return
+                message = f"Updated {len(updated_ids):,} applications"
+                if updated_ids:
+                    shown = ', '.join(str(app_id) for app_id in updated_ids[:20])
+                    more = len(updated_ids) - 20
+                    message += f"\n\nApplication IDs: {shown}" + (f" (+{more:,} more)" if more > 0 else "")
+                messagebox.showinfo("Success", message)
+                dialog.destroy()
+            
+            progress['done'] = progress['total'] = 0
+            task = self.tasks.submit(work, done, text="Updating application statuses...")
+            show_progress(task)
         
         tk.Button(dialog, text="Bulk Update", command=update, 
                  bg='#f39c12', fg='white', width=15).grid(row=3, column=0, columnspan=2, pady=20)
@@ -842,21 +3215,22 @@ class PermitManagementApp:
         
         def load_report():
             try:
-                # Try direct SELECT first
-                query = f"""
-                SELECT 
-                    TO_CHAR(submission_date, 'YYYY-MM') as month,
-                    SUM(payment_amount) as revenue,
-                    COUNT(*) as app_count
-                FROM APPLICATION
-                WHERE TO_CHAR(submission_date, 'YYYY') = '{year_var.get()}'
-                    AND payment_status = 'Paid'
-                GROUP BY TO_CHAR(submission_date, 'YYYY-MM')
-                ORDER BY month
-                """
-                
-                results = self.db.execute_query(query)
-                
+                year = str(int(year_var.get()))
+            except ValueError:
+                messagebox.showerror("Error", "Enter a valid year")
+                return
+            
+            def work():
+                refreshed = self.db.query('revenue_refreshed')
+                return self.db.query('monthly_revenue', {'year': year}), refreshed[0][0] if refreshed else None
+            
+            self.tasks.submit(work, show_report,
+                              on_error=lambda e: messagebox.showerror("Error", f"Failed to load report: {str(e)}"),
+                              text="Loading revenue report...", group='view')
+        
+        def show_report(report):
+            results, refreshed = report
+            try:
                 for widget in report_frame.winfo_children():
                     widget.destroy()
                 
@@ -896,6 +3270,10 @@ class PermitManagementApp:
                                  text=f"Total Revenue: {total_revenue:,.0f} RWF | Total Applications: {total_apps}",
                                  font=('Arial', 12, 'bold'), bg='#ecf0f1')
                 summary.pack(pady=5)
+                if refreshed:
+                    tk.Label(report_frame, text=f"Figures as of {refreshed:%Y-%m-%d %H:%M} "
+                                                f"(refreshed every 5 minutes)",
+                             font=('Arial', 9), bg='white', fg='#7f8c8d').pack()
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load report: {str(e)}")
@@ -913,56 +3291,52 @@ class PermitManagementApp:
         tk.Label(header, text="📊 Department Performance", font=('Arial', 20, 'bold'), 
                 bg='#2c3e50', fg='white').pack(pady=15)
         
-        depts = self.db.execute_query(
-            "SELECT department_id, department_name FROM DEPARTMENT WHERE is_active = 'Y' ORDER BY department_name"
-        )
-        
-        if not depts:
-            tk.Label(self.content_frame, text="No active departments found", 
-                    font=('Arial', 12)).pack(pady=20)
-            return
-        
-        tree_frame = tk.Frame(self.content_frame)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical")
-        tree = ttk.Treeview(tree_frame, columns=('ID', 'Department', 'Performance Score', 'Pending Reviews'), 
-                          show='headings', yscrollcommand=vsb.set)
-        
-        tree.heading('ID', text='ID')
-        tree.heading('Department', text='Department')
-        tree.heading('Performance Score', text='Performance Score')
-        tree.heading('Pending Reviews', text='Pending Reviews')
-        
-        tree.column('ID', width=50)
-        tree.column('Department', width=200)
-        tree.column('Performance Score', width=150)
-        tree.column('Pending Reviews', width=120)
-        
-        for dept_id, dept_name in depts:
-            try:
-                cursor = self.db.connection.cursor()
-                score = cursor.callfunc('pkg_analytics.get_department_performance', 
-                                       oracledb.NUMBER, [dept_id])
-                cursor.close()
-                
-                pending = self.db.execute_query(
-                    f"SELECT fn_count_pending_reviews({dept_id}) FROM dual"
-                )[0][0]
-                
-                tree.insert('', tk.END, values=(dept_id, dept_name, 
-                                              f"{score:.2f}%" if score else "N/A", 
-                                              pending if pending else 0))
-                
-            except Exception:
-                tree.insert('', tk.END, values=(dept_id, dept_name, "Error", "N/A"))
+        def render(rows):
+            if not rows:
+                tk.Label(self.content_frame, text="No active departments found", 
+                        font=('Arial', 12)).pack(pady=20)
+                return
+            
+            tree_frame = tk.Frame(self.content_frame)
+            tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            
+            vsb = ttk.Scrollbar(tree_frame, orient="vertical")
+            tree = ttk.Treeview(tree_frame, columns=('ID', 'Department', 'Performance Score', 'Pending Reviews'), 
+                              show='headings', yscrollcommand=vsb.set)
+            
+            tree.heading('ID', text='ID')
+            tree.heading('Department', text='Department')
+            tree.heading('Performance Score', text='Performance Score')
+            tree.heading('Pending Reviews', text='Pending Reviews')
+            
+            tree.column('ID', width=50)
+            tree.column('Department', width=200)
+            tree.column('Performance Score', width=150)
+            tree.column('Pending Reviews', width=120)
+            
+            for row in rows:
+                tree.insert('', tk.END, values=row)
+            
+            tree.grid(row=0, column=0, sticky='nsew')
+            vsb.grid(row=0, column=1, sticky='ns')
+            vsb.config(command=tree.yview)
+            
+            tree_frame.grid_rowconfigure(0, weight=1)
+            tree_frame.grid_columnconfigure(0, weight=1)
         
-        tree.grid(row=0, column=0, sticky='nsew')
-        vsb.grid(row=0, column=1, sticky='ns')
-        vsb.config(command=tree.yview)
+        self.tasks.submit(self.load_dept_performance, render,
+                          text="Loading department performance...", group='view')
+    
+    def load_dept_performance(self):
+        with self.db.acquire() as connection:
+            cursor = connection.cursor()
+            refcursor = cursor.callfunc('pkg_analytics.get_all_department_performance', 
+                                       oracledb.CURSOR, [])
+            results = refcursor.fetchall()
+            cursor.close()
         
-        tree_frame.grid_rowconfigure(0, weight=1)
-        tree_frame.grid_columnconfigure(0, weight=1)
+        return [(dept_id, dept_name, f"{score:.2f}%" if score else "N/A", pending)
+                for dept_id, dept_name, score, pending in results]
     
     def show_top_permits(self):
         self.clear_content()
@@ -972,14 +3346,7 @@ class PermitManagementApp:
         tk.Label(header, text="🏆 Top Permit Types", font=('Arial', 20, 'bold'), 
                 bg='#2c3e50', fg='white').pack(pady=15)
         
-        try:
-            cursor = self.db.connection.cursor()
-            refcursor = cursor.callfunc('pkg_analytics.get_top_permit_types', 
-                                       oracledb.CURSOR, [5])
-            
-            results = refcursor.fetchall()
-            cursor.close()
-            
+        def render(results):
             if not results:
                 tk.Label(self.content_frame, text="No permit data available", 
                         font=('Arial', 12)).pack(pady=20)
@@ -1000,7 +3367,8 @@ class PermitManagementApp:
             tree.heading('First App', text='First Application')
             tree.heading('Last App', text='Last Application')
             
-            for permit, total, approved, avg_fee, first_app, last_app in results:
+            # the cursor also returns permit_type_id after the name
+            for permit, _, total, approved, avg_fee, first_app, last_app in results:
                 tree.insert('', tk.END, values=(
                     permit,
                     total or 0,
@@ -1016,9 +3384,20 @@ class PermitManagementApp:
             
             tree_frame.grid_rowconfigure(0, weight=1)
             tree_frame.grid_columnconfigure(0, weight=1)
+        
+        self.tasks.submit(self.load_top_permits, render, 
+                          on_error=lambda e: messagebox.showerror("Error", f"Failed to load report: {str(e)}"),
+                          text="Loading top permit types...", group='view')
+    
+    def load_top_permits(self, limit=5):
+        with self.db.acquire() as connection:
+            cursor = connection.cursor()
+            refcursor = cursor.callfunc('pkg_analytics.get_top_permit_types', 
+                                       oracledb.CURSOR, [limit])
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load report: {str(e)}")
+            results = refcursor.fetchall()
+            cursor.close()
+        return results
     
     def calculate_revenue(self):
         dialog = tk.Toplevel(self.root)
@@ -1039,22 +3418,27 @@ class PermitManagementApp:
         
         def calculate():
             try:
-                cursor = self.db.connection.cursor()
-                
                 start = datetime.strptime(start_date.get(), '%Y-%m-%d') if start_date.get() else None
                 end = datetime.strptime(end_date.get(), '%Y-%m-%d') if end_date.get() else None
                 permit = int(permit_id.get()) if permit_id.get() else None
-                
-                revenue = cursor.callfunc('fn_calculate_revenue', oracledb.NUMBER, 
-                                         [start, end, permit])
-                cursor.close()
-                
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+                return
+            
+            def work():
+                with self.db.acquire() as connection:
+                    cursor = connection.cursor()
+                    revenue = cursor.callfunc('fn_calculate_revenue', oracledb.NUMBER, 
+                                             [start, end, permit])
+                    cursor.close()
+                return revenue
+            
+            def done(revenue):
                 messagebox.showinfo("Revenue Calculation", 
                                   f"Total Revenue: {revenue:,.0f} RWF")
                 dialog.destroy()
-                
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            self.tasks.submit(work, done, text="Calculating revenue...")
         
         tk.Button(dialog, text="Calculate", command=calculate, 
                  bg='#2ecc71', fg='white', width=15).grid(row=3, column=0, columnspan=2, pady=20)
@@ -1068,15 +3452,17 @@ class PermitManagementApp:
             return
         
         citizen_id = tree.item(selection[0])['values'][0]
-        try:
-            cursor = self.db.connection.cursor()
-            age = cursor.callfunc('fn_calculate_citizen_age', oracledb.NUMBER, [citizen_id])
-            cursor.close()
-            
-            messagebox.showinfo("Age Calculation", f"Citizen ID {citizen_id} is {age} years old")
-            
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        
+        def work():
+            with self.db.acquire() as connection:
+                cursor = connection.cursor()
+                age = cursor.callfunc('fn_calculate_citizen_age', oracledb.NUMBER, [citizen_id])
+                cursor.close()
+            return age
+        
+        self.tasks.submit(work, lambda age: messagebox.showinfo(
+            "Age Calculation", f"Citizen ID {citizen_id} is {age} years old"
+        ), text="Calculating age...")
     
     def check_eligibility(self, tree):
         selection = tree.selection()
@@ -1092,15 +3478,12 @@ class PermitManagementApp:
         
         tk.Label(dialog, text="Select Permit Type:").pack(pady=10)
         
-        permits = self.db.execute_query(
-            "SELECT permit_type_id, permit_name FROM PERMIT_TYPE WHERE is_active = 'Y'"
-        )
-        
         permit_var = tk.StringVar()
         permit_combo = ttk.Combobox(dialog, textvariable=permit_var, width=30)
-        permit_combo['values'] = [f"{p[0]}: {p[1]}" for p in permits]
         permit_combo.pack(pady=10)
         
+        self.fill_reference_combo(permit_combo, 'PERMIT_TYPE', self.reference.permit_types)
+        
         def check():
             if not permit_var.get():
                 messagebox.showerror("Error", "Please select a permit type")
@@ -1108,20 +3491,124 @@ class PermitManagementApp:
             
             try:
                 permit_id = int(permit_var.get().split(':')[0])
-                cursor = self.db.connection.cursor()
-                result = cursor.callfunc('fn_validate_eligibility', oracledb.STRING, 
-                                        [citizen_id, permit_id])
-                cursor.close()
-                
-                messagebox.showinfo("Eligibility Check", result)
-                dialog.destroy()
-                
             except Exception as e:
                 messagebox.showerror("Error", str(e))
+                return
+            
+            def work():
+                with self.db.acquire() as connection:
+                    cursor = connection.cursor()
+                    result = cursor.callfunc('fn_validate_eligibility', oracledb.STRING, 
+                                            [citizen_id, permit_id])
+                    cursor.close()
+                return result
+            
+            def done(result):
+                messagebox.showinfo("Eligibility Check", result)
+                dialog.destroy()
+            
+            self.tasks.submit(work, done, text="Checking eligibility...")
         
         tk.Button(dialog, text="Check", command=check, 
                  bg='#3498db', fg='white').pack(pady=10)
     
+    def load_eligibility(self, citizen_ids, permit_type_ids=None):
+        """(citizen, permit type, permit name, verdict, reason) for every pair, one round-trip"""
+        with self.db.acquire() as connection:
+            cursor = connection.cursor()
+            id_list_type = connection.gettype('T_ID_LIST')
+            # an empty list means every permit type; a bare None would bind as VARCHAR2
+            cursor.execute(statement_text('eligibility_matrix'), {
+                'citizen_ids': id_list_type.newobject(citizen_ids),
+                'permit_type_ids': id_list_type.newobject(permit_type_ids or [])
+            })
+            rows = cursor.fetchall()
+            cursor.close()
+        return rows
+    
+    def show_eligibility_matrix(self, tree=None):
+        """Every permit type a citizen (or cohort of citizens) can apply for"""
+        citizen_ids = []
+        if tree is not None:
+            citizen_ids = [tree.item(item)['values'][0] for item in tree.selection()]
+        
+        self.clear_content()
+        
+        header = tk.Frame(self.content_frame, bg='#2c3e50', height=60)
+        header.pack(fill=tk.X)
+        tk.Label(header, text="✅ Eligibility Matrix", font=('Arial', 20, 'bold'), 
+                bg='#2c3e50', fg='white').pack(pady=15)
+        
+        control_frame = tk.Frame(self.content_frame, bg='#ecf0f1')
+        control_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        tk.Label(control_frame, text="Citizen IDs:").pack(side=tk.LEFT, padx=5)
+        ids_entry = tk.Entry(control_frame, width=40)
+        ids_entry.insert(0, ', '.join(str(citizen_id) for citizen_id in citizen_ids))
+        ids_entry.pack(side=tk.LEFT, padx=5)
+        
+        loaded = {'rows': []}
+        eligible_only = tk.BooleanVar(value=False)
+        tk.Checkbutton(control_frame, text="Eligible only", variable=eligible_only, bg='#ecf0f1',
+                      command=lambda: render(loaded['rows'])).pack(side=tk.LEFT, padx=5)
+        
+        count_label = tk.Label(control_frame, text="", bg='#ecf0f1', font=('Arial', 9))
+        count_label.pack(side=tk.RIGHT, padx=10)
+        
+        tree_frame = tk.Frame(self.content_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        columns = ('Citizen', 'Permit ID', 'Permit', 'Verdict', 'Reason')
+        vsb = ttk.Scrollbar(tree_frame, orient="vertical")
+        matrix = ttk.Treeview(tree_frame, columns=columns, show='headings', yscrollcommand=vsb.set)
+        for col, width in zip(columns, (80, 80, 200, 110, 420)):
+            matrix.heading(col, text=col)
+            matrix.column(col, width=width)
+        matrix.tag_configure('eligible', foreground='#27ae60')
+        matrix.tag_configure('not_eligible', foreground='#c0392b')
+        
+        matrix.grid(row=0, column=0, sticky='nsew')
+        vsb.grid(row=0, column=1, sticky='ns')
+        vsb.config(command=matrix.yview)
+        tree_frame.grid_rowconfigure(0, weight=1)
+        tree_frame.grid_columnconfigure(0, weight=1)
+        
+        def render(rows):
+            if not matrix.winfo_exists():
+                return
+            loaded['rows'] = rows
+            matrix.delete(*matrix.get_children())
+            for citizen_id, permit_id, permit_name, verdict, reason in rows:
+                if eligible_only.get() and verdict != 'ELIGIBLE':
+                    continue
+                matrix.insert('', tk.END, values=(citizen_id, permit_id, permit_name, verdict, reason or ''),
+                              tags=('eligible' if verdict == 'ELIGIBLE' else 'not_eligible',))
+            eligible = sum(1 for row in rows if row[3] == 'ELIGIBLE')
+            count_label.config(text=f"{eligible:,} eligible of {len(rows):,} pairs")
+        
+        def evaluate():
+            try:
+                ids = sorted({int(part) for part in ids_entry.get().replace(',', ' ').split()})
+            except ValueError:
+                messagebox.showerror("Error", "Citizen IDs must be numbers separated by commas")
+                return
+            if not ids:
+                messagebox.showerror("Error", "Enter at least one citizen ID")
+                return
+            if len(ids) > ELIGIBILITY_MAX_CITIZENS:
+                messagebox.showerror("Error", f"At most {ELIGIBILITY_MAX_CITIZENS} citizens per request")
+                return
+            
+            self.tasks.submit(lambda: self.load_eligibility(ids), render, 
+                              text="Evaluating eligibility...", group='view')
+        
+        tk.Button(control_frame, text="Evaluate", command=evaluate, 
+                 bg='#3498db', fg='white', font=('Arial', 9, 'bold'),
+                 padx=10, pady=5).pack(side=tk.LEFT, padx=5)
+        
+        if citizen_ids:
+            evaluate()
+    
     def view_summary(self, tree):
         selection = tree.selection()
         if not selection:
@@ -1129,15 +3616,16 @@ class PermitManagementApp:
             return
         
         app_id = tree.item(selection[0])['values'][0]
-        try:
-            cursor = self.db.connection.cursor()
-            summary = cursor.callfunc('fn_get_app_status_summary', oracledb.STRING, [app_id])
-            cursor.close()
-            
-            messagebox.showinfo("Application Summary", summary)
-            
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        
+        def work():
+            with self.db.acquire() as connection:
+                cursor = connection.cursor()
+                summary = cursor.callfunc('fn_get_app_status_summary', oracledb.STRING, [app_id])
+                cursor.close()
+            return summary
+        
+        self.tasks.submit(work, lambda summary: messagebox.showinfo("Application Summary", summary),
+                          text="Loading application summary...")
     
     def process_payment(self, tree):
         selection = tree.selection()
@@ -1147,16 +3635,18 @@ class PermitManagementApp:
         
         app_id = tree.item(selection[0])['values'][0]
         
-        result = self.db.execute_query(
-            f"SELECT payment_amount FROM APPLICATION WHERE application_id = {app_id}"
-        )
-        
-        if not result:
-            messagebox.showerror("Error", "Application not found")
-            return
-        
-        fee = result[0][0]
+        def open_dialog(result):
+            if not result:
+                messagebox.showerror("Error", "Application not found")
+                return
+            self.show_payment_dialog(app_id, result[0][0])
         
+        self.tasks.submit(
+            lambda: self.db.query('application_fee', {'app_id': app_id}),
+            open_dialog, text="Loading application fee..."
+        )
+    
+    def show_payment_dialog(self, app_id, fee):
         dialog = tk.Toplevel(self.root)
         dialog.title(f"Process Payment - App {app_id}")
         dialog.geometry("400x200")
@@ -1177,21 +3667,25 @@ class PermitManagementApp:
         
         def process():
             try:
-                cursor = self.db.connection.cursor()
-                cursor.callproc('sp_process_payment', [
-                    app_id,
-                    float(amount_entry.get()),
-                    method_var.get()
-                ])
-                self.db.connection.commit()
-                cursor.close()
-                
+                args = [app_id, float(amount_entry.get()), method_var.get()]
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+                return
+            
+            def work():
+                with self.db.acquire() as connection:
+                    cursor = connection.cursor()
+                    cursor.callproc('sp_process_payment', args)
+                    connection.commit()
+                    self.dashboard_cache.invalidate()
+                    cursor.close()
+            
+            def done(_):
                 messagebox.showinfo("Success", "Payment processed successfully!")
                 dialog.destroy()
                 self.show_applications()
-                
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            self.tasks.submit(work, done, text="Processing payment...")
         
         tk.Button(dialog, text="Process Payment", command=process, 
                  bg='#2ecc71', fg='white').pack(pady=10)
@@ -1203,15 +3697,16 @@ class PermitManagementApp:
             return
         
         permit_id = tree.item(selection[0])['values'][0]
-        try:
-            cursor = self.db.connection.cursor()
-            details = cursor.callfunc('fn_get_permit_details', oracledb.STRING, [permit_id])
-            cursor.close()
-            
+        
+        def show(details):
             messagebox.showinfo("Permit Details", details)
-            
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        
+        if self.reference.fresh():
+            show(self.reference.permit_details(permit_id))
+            return
+        
+        self.tasks.submit(lambda: self.reference.permit_details(permit_id), show,
+                          text="Loading permit details...")
     
     def count_pending_reviews(self, tree):
         selection = tree.selection()
@@ -1222,16 +3717,16 @@ class PermitManagementApp:
         dept_id = tree.item(selection[0])['values'][0]
         dept_name = tree.item(selection[0])['values'][1]
         
-        try:
-            cursor = self.db.connection.cursor()
-            count = cursor.callfunc('fn_count_pending_reviews', oracledb.NUMBER, [dept_id])
-            cursor.close()
-            
-            messagebox.showinfo("Pending Reviews", 
-                              f"Department: {dept_name}\nPending Reviews: {count}")
-            
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        def work():
+            with self.db.acquire() as connection:
+                cursor = connection.cursor()
+                count = cursor.callfunc('fn_count_pending_reviews', oracledb.NUMBER, [dept_id])
+                cursor.close()
+            return count
+        
+        self.tasks.submit(work, lambda count: messagebox.showinfo(
+            "Pending Reviews", f"Department: {dept_name}\nPending Reviews: {count}"
+        ), text="Counting pending reviews...")
     
     def calc_renewal_fee(self, tree):
         selection = tree.selection()
@@ -1240,16 +3735,17 @@ class PermitManagementApp:
             return
         
         license_id = tree.item(selection[0])['values'][0]
-        try:
-            cursor = self.db.connection.cursor()
-            fee = cursor.callfunc('fn_calculate_renewal_fee', oracledb.NUMBER, [license_id])
-            cursor.close()
-            
-            messagebox.showinfo("Renewal Fee", 
-                              f"License ID {license_id}\nRenewal Fee: {fee:,.0f} RWF")
-            
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        
+        def work():
+            with self.db.acquire() as connection:
+                cursor = connection.cursor()
+                fee = cursor.callfunc('fn_calculate_renewal_fee', oracledb.NUMBER, [license_id])
+                cursor.close()
+            return fee
+        
+        self.tasks.submit(work, lambda fee: messagebox.showinfo(
+            "Renewal Fee", f"License ID {license_id}\nRenewal Fee: {fee:,.0f} RWF"
+        ), text="Calculating renewal fee...")
     
     def complete_review(self, tree):
         selection = tree.selection()
@@ -1273,26 +3769,140 @@ class PermitManagementApp:
         comments_entry.pack(pady=5)
         
         def complete():
-            try:
-                cursor = self.db.connection.cursor()
-                cursor.callproc('sp_complete_review_step', [
-                    step_id,
-                    decision_var.get(),
-                    comments_entry.get()
-                ])
-                self.db.connection.commit()
-                cursor.close()
-                
+            args = [step_id, decision_var.get(), comments_entry.get()]
+            
+            def work():
+                with self.db.acquire() as connection:
+                    cursor = connection.cursor()
+                    cursor.callproc('sp_complete_review_step', args)
+                    connection.commit()
+                    self.dashboard_cache.invalidate()
+                    cursor.close()
+            
+            def done(_):
                 messagebox.showinfo("Success", "Review step completed!")
                 dialog.destroy()
                 self.show_review_steps()
-                
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            self.tasks.submit(work, done, text="Completing review step...")
         
         tk.Button(dialog, text="Complete", command=complete, 
                  bg='#2ecc71', fg='white').pack(pady=10)
     
+    def show_pool_stats(self):
+        stats = self.db.pool_stats()
+        if not stats:
+            messagebox.showwarning("Connection Pool", "Pool is not open")
+            return
+        
+        messagebox.showinfo("Connection Pool", 
+                          f"Open connections: {stats['opened']} (min {stats['min']}, max {stats['max']})\n"
+                          f"Busy connections: {stats['busy']}\n"
+                          f"Acquisitions: {stats['acquired']}\n"
+                          f"Avg wait: {stats['wait_ms_avg']:.1f} ms | Max wait: {stats['wait_ms_max']:.1f} ms\n"
+                          f"Dropped (unhealthy): {stats['dropped']}\n"
+                          f"Reconnects: {stats['reconnects']}")
+    
+    def show_statement_stats(self):
+        def render(result):
+            rows, has_server_stats = result
+            
+            dialog = tk.Toplevel(self.root)
+            dialog.title("Statement Statistics")
+            dialog.geometry("700x400")
+            
+            if not has_server_stats:
+                tk.Label(dialog, text="Server counts need SELECT on V$SQL; showing application counts only",
+                        fg='#e74c3c').pack(pady=5)
+            
+            columns = ('Statement', 'App Executions', 'Server Executions', 'Parse Calls', 'Hard Parses')
+            tree = ttk.Treeview(dialog, columns=columns, show='headings')
+            for col in columns:
+                tree.heading(col, text=col)
+                tree.column(col, width=200 if col == 'Statement' else 110)
+            for row in rows:
+                tree.insert('', tk.END, values=[safe_convert(v) for v in row])
+            tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        self.tasks.submit(self.db.statement_stats, render, text="Loading statement statistics...")
+    
+    def show_performance(self):
+        """Per-statement timings recorded by the instrumented connections, slowest total first"""
+        metrics = self.db.metrics
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Performance")
+        dialog.geometry("1100x500")
+        
+        slow = f"slow-query log: {metrics.slow_log} (>= {metrics.slow_ms} ms)" if metrics.slow_log else "slow-query log off"
+        summary = tk.Label(dialog, text="", anchor='w', font=('Arial', 9))
+        summary.pack(fill=tk.X, padx=10, pady=(10, 0))
+        
+        columns = ('Statement', 'Kind', 'Calls', 'Errors', 'Total ms', 'Avg ms', 'p50 ms', 'p95 ms',
+                   'Max ms', 'Round-trips', 'Rows', 'KB in', 'KB out', 'Top call site')
+        tree = ttk.Treeview(dialog, columns=columns, show='headings')
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=220 if col in ('Statement', 'Top call site') else 70,
+                        anchor='w' if col in ('Statement', 'Kind', 'Top call site') else 'e')
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        detail = tk.Label(dialog, text="Select a statement to see its latency histogram and call sites",
+                          anchor='w', justify=tk.LEFT, font=('Courier', 9))
+        detail.pack(fill=tk.X, padx=10)
+        
+        report = {}
+        
+        def load():
+            tree.delete(*tree.get_children())
+            report.clear()
+            for entry in metrics.snapshot():
+                report[entry['statement']] = entry
+                tree.insert('', tk.END, iid=entry['statement'], values=(
+                    entry['statement'], entry['kind'], entry['calls'], entry['errors'],
+                    f"{entry['total_ms']:,.1f}", entry['avg_ms'], entry['p50_ms'], entry['p95_ms'],
+                    entry['max_ms'], entry['round_trips'], f"{entry['rows']:,}",
+                    f"{entry['bytes_in'] / 1024:,.1f}", f"{entry['bytes_out'] / 1024:,.1f}",
+                    entry['sites'][0]['site'] if entry['sites'] else ''
+                ))
+            total_ms = sum(entry['total_ms'] for entry in report.values())
+            summary.config(text=f"{len(report)} statements, {sum(e['calls'] for e in report.values()):,} calls, "
+                                f"{total_ms / 1000:,.1f} s in the database since "
+                                f"{metrics.started:%H:%M:%S} | {slow}")
+        
+        def on_select(event):
+            selection = tree.selection()
+            if not selection or selection[0] not in report:
+                return
+            entry = report[selection[0]]
+            peak = max(entry['histogram'].values()) or 1
+            lines = [f"{bucket:>7} ms {'#' * (40 * count // peak)} {count}"
+                     for bucket, count in entry['histogram'].items()]
+            lines.append("call sites: " + ", ".join(f"{s['site']} ({s['calls']})" for s in entry['sites'][:5]))
+            detail.config(text="\n".join(lines))
+        
+        def save():
+            filename = filedialog.asksaveasfilename(
+                parent=dialog, defaultextension=".json",
+                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            )
+            if filename:
+                metrics.dump(filename)
+                messagebox.showinfo("Performance", f"Saved to {filename}", parent=dialog)
+        
+        def reset():
+            metrics.reset()
+            load()
+        
+        tree.bind('<<TreeviewSelect>>', on_select)
+        
+        buttons = tk.Frame(dialog)
+        buttons.pack(fill=tk.X, padx=10, pady=10)
+        tk.Button(buttons, text="Refresh", command=load, width=12).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons, text="Save JSON...", command=save, width=12).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons, text="Reset", command=reset, width=12).pack(side=tk.LEFT, padx=5)
+        load()
+    
     def show_about(self):
         about_text = """Permit & License Management System
 Version 2.0 - ALL ERRORS FIXED
@@ -1318,14 +3928,119 @@ Fixed Issues:
     
     def on_closing(self):
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
+            self.tasks.shutdown()
             self.db.disconnect()
             self.root.destroy()
 
 
+def export_audit_delta(folder, metrics=None):
+    """Headless incremental audit export for scheduled jobs"""
+    db = DatabaseManager(DB_CONFIG, metrics=metrics)
+    db.pool = db._create_pool()
+    try:
+        count, filename, last_id = AuditDeltaExport(db, folder).run()
+    finally:
+        db.disconnect()
+    print(f"Appended {count} audit rows to {os.path.join(folder, filename)} (watermark audit_id {last_id})")
+
+SEQUENCE_BENCH_INSERT = """
+    INSERT INTO seq_bench (id, app_number)
+    VALUES (seq_bench_id.NEXTVAL,
+            'APP-' || TO_CHAR(SYSDATE, 'YYYY') || '-' || LPAD(seq_bench_number.NEXTVAL, 8, '0'))
+"""
+
+def benchmark_sequences(sessions, inserts=SEQUENCE_BENCH_INSERTS, caches=SEQUENCE_BENCH_CACHES, metrics=None):
+    """Committed inserts/sec from concurrent sessions for each sequence cache size
+    
+    Mirrors sp_submit_application (surrogate key plus ordered application number,
+    one commit per insert) against a scratch table so real sequences are untouched.
+    """
+    db = DatabaseManager(DB_CONFIG, dict(POOL_CONFIG, min=sessions, max=sessions, increment=0), metrics)
+    db.pool = db._create_pool()
+    
+    def run_ddl(*statements):
+        with db.acquire() as connection:
+            cursor = connection.cursor()
+            for statement in statements:
+                try:
+                    cursor.execute(statement)
+                except oracledb.Error:
+                    if not statement.startswith('DROP'):
+                        raise  # nothing to drop on the first run
+            cursor.close()
+    
+    def session(start):
+        with db.acquire() as connection:
+            cursor = connection.cursor()
+            start.wait()
+            for _ in range(inserts):
+                cursor.execute(SEQUENCE_BENCH_INSERT)
+                connection.commit()
+            cursor.close()
+    
+    results = []
+    try:
+        run_ddl('DROP TABLE seq_bench PURGE',
+                'CREATE TABLE seq_bench (id NUMBER PRIMARY KEY, app_number VARCHAR2(30))')
+        for cache in caches:
+            cache_clause = f'CACHE {cache}' if cache else 'NOCACHE'
+            run_ddl('DROP SEQUENCE seq_bench_id', 'DROP SEQUENCE seq_bench_number',
+                    f'CREATE SEQUENCE seq_bench_id {cache_clause}',
+                    f'CREATE SEQUENCE seq_bench_number {cache_clause} ORDER')
+            
+            start = threading.Barrier(sessions + 1)
+            with ThreadPoolExecutor(max_workers=sessions) as pool:
+                futures = [pool.submit(session, start) for _ in range(sessions)]
+                start.wait()
+                began = time.perf_counter()
+                for future in futures:
+                    future.result()
+                seconds = time.perf_counter() - began
+            
+            total = sessions * inserts
+            results.append({'cache': cache, 'sessions': sessions, 'inserts': total,
+                            'seconds': round(seconds, 3), 'inserts_per_sec': round(total / seconds, 1)})
+    finally:
+        try:
+            run_ddl('DROP TABLE seq_bench PURGE', 'DROP SEQUENCE seq_bench_id',
+                    'DROP SEQUENCE seq_bench_number')
+        finally:
+            db.disconnect()
+    
+    print(f"{'Cache':>8}{'Sessions':>10}{'Inserts':>10}{'Secs':>9}{'Inserts/s':>11}")
+    for r in results:
+        print(f"{r['cache'] or 'NOCACHE':>8}{r['sessions']:>10}{r['inserts']:>10}"
+              f"{r['seconds']:>9.2f}{r['inserts_per_sec']:>11,.0f}")
+    return results
+
 def main():
-    root = tk.Tk()
-    app = PermitManagementApp(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser(description="Permit & License Management System")
+    parser.add_argument('--export-audit-delta', metavar='FOLDER',
+                        help="append audit rows newer than the saved watermark to FOLDER and exit")
+    parser.add_argument('--benchmark-sequences', metavar='SESSIONS', type=int,
+                        help="compare NOCACHE and cached sequence insert rates with SESSIONS "
+                             "concurrent sessions and exit")
+    parser.add_argument('--slow-ms', metavar='MS', type=float, default=PERF_SLOW_MS,
+                        help=f"log statements taking at least MS milliseconds (default {PERF_SLOW_MS})")
+    parser.add_argument('--slow-log', metavar='FILE', default=PERF_SLOW_LOG,
+                        help="append statements at least --slow-ms slow to FILE as JSON lines (default off)")
+    parser.add_argument('--perf-dump', metavar='FILE',
+                        help="write per-statement timings as JSON to FILE on exit")
+    args = parser.parse_args()
+    metrics = QueryMetrics(slow_ms=args.slow_ms, slow_log=args.slow_log)
+    
+    try:
+        if args.benchmark_sequences:
+            benchmark_sequences(args.benchmark_sequences, metrics=metrics)
+        elif args.export_audit_delta:
+            export_audit_delta(args.export_audit_delta, metrics=metrics)
+        else:
+            root = tk.Tk()
+            app = PermitManagementApp(root, metrics=metrics)
+            root.mainloop()
+    finally:
+        if args.perf_dump:
+            metrics.dump(args.perf_dump)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,30 @@
+"""
+Shared setup for the GUI tests: oracledb is served by fake_oracledb, so
+permit_management_gui imports and runs its database code without an Oracle instance.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_oracledb
+
+fake_oracledb.install(1000, latency_ms=0)     # before the GUI imports oracledb
+
+import permit_management_gui as gui
+
+
+@pytest.fixture
+def fake():
+    """A fresh FakeDatabase with 1,000 rows per large table and no simulated latency"""
+    return fake_oracledb.install(1000, latency_ms=0)
+
+@pytest.fixture
+def db(fake):
+    manager = gui.DatabaseManager(gui.DB_CONFIG, metrics=gui.QueryMetrics(slow_log=None))
+    manager.pool = manager._create_pool()
+    yield manager
+    manager.disconnect()
@@ -0,0 +1,72 @@
+import permit_management_gui as gui
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(gui.time, 'monotonic', clock)
+    cache = gui.TTLCache(30)
+    cache.put('stats', (1, 2, 3))
+
+    clock.now += 29.9
+    assert cache.get('stats') == (1, 2, 3)
+    clock.now += 0.1
+    assert cache.get('stats') is None
+    assert cache.get('stats', 'missing') == 'missing'
+
+def test_ttl_cache_loads_once_until_expired(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(gui.time, 'monotonic', clock)
+    cache = gui.TTLCache(30)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return len(loads)
+
+    assert cache.get_or_load('stats', loader) == 1
+    assert cache.get_or_load('stats', loader) == 1
+    clock.now += 30
+    assert cache.get_or_load('stats', loader) == 2
+
+def test_ttl_cache_invalidate():
+    cache = gui.TTLCache(30)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.invalidate('a')
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    cache.invalidate()
+    assert cache.get('b') is None
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = gui.LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1      # 'b' is now the oldest
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+def test_lru_cache_put_refreshes_existing_key():
+    cache = gui.LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('a', 10)
+    cache.put('c', 3)
+    assert cache.get('a') == 10
+    assert cache.get('b') is None
+
+def test_lru_cache_invalidate():
+    cache = gui.LRUCache(2)
+    cache.put('a', 1)
+    cache.invalidate()
+    assert cache.get('a', 'missing') == 'missing'
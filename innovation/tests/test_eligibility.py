@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+
+import permit_management_gui as gui
+
+
+def load(db, citizen_ids, permit_type_ids=None):
+    return gui.PermitManagementApp.load_eligibility(SimpleNamespace(db=db), citizen_ids, permit_type_ids)
+
+
+def test_no_filter_binds_an_empty_list_for_all_permit_types(fake, db):
+    rows = load(db, [1, 2])
+    assert len(rows) == 2 * fake.sizes['PERMIT_TYPE']
+    assert {row[0] for row in rows} == {1, 2}
+
+def test_permit_type_filter(db):
+    rows = load(db, [1], [2, 3])
+    assert [(row[0], row[1]) for row in rows] == [(1, 2), (1, 3)]
+    assert rows[0][3] == 'ELIGIBLE'
+
+def test_unknown_citizen_is_not_eligible(fake, db):
+    row, = load(db, [fake.sizes['CITIZEN'] + 1], [1])
+    assert row[3:] == ('NOT_ELIGIBLE', 'Citizen or Permit Type not found')
@@ -0,0 +1,83 @@
+import gzip
+import json
+from datetime import datetime
+
+import permit_management_gui as gui
+
+
+class BatchCursor:
+    """Executed cursor stand-in that returns the given batches from fetchmany"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def fetchmany(self):
+        return self.batches.pop(0) if self.batches else []
+
+
+def audit_row(audit_id, reason=None, record_id=7):
+    return (audit_id, 'CITIZEN', 'INSERT', datetime(2025, 1, 2, 3, 4, 5), '03:04:05',
+            'gakuba', 'ALLOWED', reason, record_id, None, '{"status":"Active"}')
+
+EXPECTED_FIRST = {
+    'id': 1, 'table': 'CITIZEN', 'operation': 'INSERT', 'date': '2025-01-02',
+    'time': '03:04:05', 'user': 'gakuba', 'status': 'ALLOWED', 'reason': '',
+    'record_id': 7, 'old_values': '', 'new_values': '{"status":"Active"}'
+}
+
+
+def test_stream_audit_json_lines(tmp_path):
+    path = str(tmp_path / 'audit.jsonl')
+    cursor = BatchCursor([[audit_row(1), audit_row(2)], [audit_row(3, reason='Weekday', record_id=None)]])
+    assert gui.stream_audit_json(cursor, path) == 3
+
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 3
+    assert records[0] == EXPECTED_FIRST
+    assert records[2]['reason'] == 'Weekday'
+    assert records[2]['record_id'] is None
+
+def test_stream_audit_json_array(tmp_path):
+    path = str(tmp_path / 'audit.json')
+    cursor = BatchCursor([[audit_row(1)], [audit_row(2), audit_row(3)]])
+    assert gui.stream_audit_json(cursor, path, as_array=True) == 3
+
+    with open(path, encoding='utf-8') as f:
+        records = json.load(f)
+    assert [record['id'] for record in records] == [1, 2, 3]
+    assert records[0] == EXPECTED_FIRST
+
+def test_stream_audit_json_empty_array(tmp_path):
+    path = str(tmp_path / 'audit.json')
+    assert gui.stream_audit_json(BatchCursor([]), path, as_array=True) == 0
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == []
+
+def test_stream_audit_json_gzip(tmp_path):
+    path = str(tmp_path / 'audit.jsonl.gz')
+    gui.stream_audit_json(BatchCursor([[audit_row(1), audit_row(2)]]), path)
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [record['id'] for record in records] == [1, 2]
+
+def test_stream_audit_json_gzip_array(tmp_path):
+    path = str(tmp_path / 'audit.json.gz')
+    gui.stream_audit_json(BatchCursor([[audit_row(1), audit_row(2)]]), path, as_array=True)
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert [record['id'] for record in json.load(f)] == [1, 2]
+
+def test_parallel_export_cancel_reaches_the_worker_connections(fake, db, tmp_path):
+    cancelled = []
+
+    def progress(rows):
+        if not cancelled:
+            cancelled.append(True)
+            export.cancel()         # as TaskRunner.cancel does from the Tk thread
+
+    export = gui.ParallelExport(db, str(tmp_path), workers=2, progress=progress,
+                                cancelled=lambda: bool(cancelled))
+    export.run([('CITIZEN', 'citizen_id', 'citizens'), ('APPLICATION', 'application_id', 'applications')])
+    assert fake.cancels >= 1
+    assert export._connections == set()
@@ -0,0 +1,67 @@
+import csv
+from datetime import datetime
+
+import pytest
+
+import permit_management_gui as gui
+
+FIELDS = gui.CitizenImport.FIELDS
+
+
+def record(**overrides):
+    values = {'first_name': 'Aline', 'last_name': 'Uwase', 'date_of_birth': '1990-05-17',
+              'national_id': '1199080012345678', 'email': 'aline@example.rw',
+              'phone': '+250788000001', 'address': 'Kigali', 'residency_status': 'Citizen'}
+    values.update(overrides)
+    return values
+
+def importer(path=None, db=None):
+    return gui.CitizenImport(db, path)
+
+
+def test_validate_returns_bind_values():
+    values = importer().validate(record())
+    assert values['date_of_birth'] == datetime(1990, 5, 17)
+    assert values['national_id'] == '1199080012345678'
+    assert set(values) == set(FIELDS)
+
+def test_validate_accepts_header_spellings_and_defaults_residency():
+    raw = {'First Name': ' Aline ', 'Last Name': 'Uwase', 'dob': '1990-05-17T00:00:00',
+           'National ID': '1199080012345678', 'Email': 'aline@example.rw',
+           'Phone': '+250788000001', 'Address': 'Kigali'}
+    values = importer().validate(raw)
+    assert values['first_name'] == 'Aline'
+    assert values['residency_status'] == 'Citizen'
+    assert values['date_of_birth'] == datetime(1990, 5, 17)
+
+def test_validate_reports_missing_fields():
+    with pytest.raises(ValueError, match='Missing email, phone'):
+        importer().validate(record(email='', phone=None))
+
+def test_validate_rejects_minors():
+    dob = datetime.now().replace(year=datetime.now().year - 17).strftime('%Y-%m-%d')
+    with pytest.raises(ValueError, match='18 years or older'):
+        importer().validate(record(date_of_birth=dob))
+
+def test_validate_rejects_bad_residency_and_dates():
+    with pytest.raises(ValueError, match='Invalid residency status'):
+        importer().validate(record(residency_status='Tourist'))
+    with pytest.raises(ValueError):
+        importer().validate(record(date_of_birth='17/05/1990'))
+
+def test_run_rejects_duplicates_in_file_and_database(tmp_path, fake, db):
+    path = str(tmp_path / 'citizens.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, FIELDS)
+        writer.writeheader()
+        writer.writerow(record())
+        writer.writerow(record(email='other@example.rw'))                   # same national ID
+        writer.writerow(record(national_id=fake.value('CITIZEN', 'national_id', 0),
+                               email='new@example.rw'))                     # already registered
+        writer.writerow(record(national_id='1199080099999999', email='fine@example.rw'))
+
+    job = importer(path, db)
+    assert job.run() == (2, 2)
+    reasons = {line: reason for line, _, _, reason in job.rejects}
+    assert reasons[3].startswith('Duplicate national ID in file')
+    assert reasons[4].startswith('National ID already exists')
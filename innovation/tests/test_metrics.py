@@ -0,0 +1,51 @@
+import json
+
+import permit_management_gui as gui
+
+
+def test_snapshot_percentiles_and_histogram():
+    metrics = gui.QueryMetrics(slow_log=None)
+    for ms in range(100, 0, -1):
+        metrics.record('dashboard_stats', 'execute', float(ms), rows=1, site='load:10')
+
+    entry, = metrics.snapshot()
+    assert entry['statement'] == 'dashboard_stats'
+    assert entry['calls'] == 100
+    assert entry['p50_ms'] == 51
+    assert entry['p95_ms'] == 96
+    assert entry['max_ms'] == 100
+    assert entry['avg_ms'] == 50.5
+    assert entry['histogram'] == {'<=1': 1, '<=5': 4, '<=10': 5, '<=50': 40, '<=100': 50,
+                                  '<=500': 0, '<=1000': 0, '<=5000': 0, '>5000': 0}
+    assert entry['sites'] == [{'site': 'load:10', 'calls': 100}]
+
+def test_snapshot_uses_recent_samples_and_orders_by_total(monkeypatch):
+    monkeypatch.setattr(gui, 'PERF_SAMPLES', 10)
+    metrics = gui.QueryMetrics(slow_log=None)
+    for ms in range(1, 21):
+        metrics.record('page', 'execute', float(ms))
+    metrics.record('count', 'execute', 1000.0)
+
+    count, page = metrics.snapshot()
+    assert count['statement'] == 'count'
+    assert page['calls'] == 20
+    assert page['max_ms'] == 20
+    assert page['p50_ms'] == 16        # median of the last ten: 11..20
+    assert sum(page['histogram'].values()) == 10
+
+def test_reset_clears_every_statement():
+    metrics = gui.QueryMetrics(slow_log=None)
+    assert metrics.snapshot() == []
+    metrics.record('q', 'execute', 2.0)
+    metrics.reset()
+    assert metrics.calls('q') == 0
+
+def test_slow_log_gets_only_slow_statements(tmp_path):
+    path = tmp_path / 'slow.jsonl'
+    metrics = gui.QueryMetrics(slow_ms=10, slow_log=str(path))
+    metrics.record('fast', 'execute', 5.0, sql='SELECT 1 FROM dual')
+    metrics.record('slow', 'execute', 50.0, sql='SELECT  *\n FROM citizen')
+
+    entries = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [entry['statement'] for entry in entries] == ['slow']
+    assert entries[0]['sql'] == 'SELECT * FROM citizen'
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import permit_management_gui as gui
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    monkeypatch.setattr(gui, 'DATA_PAGE_SIZE', 3)
+
+def view(rows, first=0, first_page=0, sort=(0, True)):
+    """PagedTreeview with rows cached from first_page on, without creating any widgets"""
+    paged = gui.PagedTreeview.__new__(gui.PagedTreeview)
+    paged.first = first
+    paged.sort = sort
+    paged.pages = {first_page + i // 3: rows[i:i + 3] for i in range(0, len(rows), 3)}
+    return paged
+
+def keys(paged):
+    return [row[0] for page in sorted(paged.pages) for row in paged.pages[page]]
+
+def rows(*ids):
+    return [(key, f'row {key}') for key in ids]
+
+
+def test_merge_inserts_and_deletes_in_sort_order():
+    paged = view(rows(5, 4, 3, 2, 1))
+    paged.merge({6: (6, 'new')}, {2}, total=5, old_total=5)
+    assert keys(paged) == [6, 5, 4, 3, 1]
+    assert sorted(paged.pages) == [0, 1]
+
+def test_merge_updates_rows_in_place():
+    paged = view(rows(5, 4, 3, 2, 1))
+    paged.merge({4: (4, 'edited')}, set(), total=5, old_total=5)
+    assert paged.pages[0][1] == (4, 'edited')
+
+def test_merge_moves_a_row_whose_sort_value_changed():
+    paged = view([(1, 'e'), (2, 'd'), (3, 'c'), (4, 'b'), (5, 'a')], sort=(1, True))
+    paged.merge({5: (5, 'z')}, set(), total=5, old_total=5)
+    assert keys(paged) == [5, 1, 2, 3, 4]
+
+def test_merge_starts_over_when_the_count_disagrees():
+    paged = view(rows(5, 4, 3, 2, 1))
+    paged.merge({6: (6, 'new')}, set(), total=7, old_total=5)
+    assert paged.pages == {}
+
+def test_merge_leaves_rows_past_a_partial_run_to_their_page():
+    paged = view(rows(9, 8, 7, 6, 5, 4))
+    paged.merge({1: (1, 'new')}, set(), total=10, old_total=9)
+    assert keys(paged) == [9, 8, 7, 6, 5, 4]
+
+def test_merge_patches_a_lower_run_only_when_nothing_moved():
+    paged = view(rows(6, 5, 4, 3, 2, 1), first=3, first_page=1)
+    paged.merge({5: (5, 'edited')}, set(), total=9, old_total=9)
+    assert paged.pages[1][1] == (5, 'edited')
+
+    paged = view(rows(6, 5, 4, 3, 2, 1), first=3, first_page=1)
+    paged.merge({}, {5}, total=8, old_total=9)
+    assert paged.pages == {}
+
+def test_merge_drops_the_cache_when_the_visible_page_is_missing():
+    paged = view(rows(5, 4, 3), first=6)
+    paged.merge({}, set(), total=3, old_total=3)
+    assert paged.pages == {}
+
+
+# ---- incremental refresh ----
+
+def refreshing_view(total, high_key, cached):
+    paged = view(cached)
+    paged.total = total
+    paged.high_key = high_key
+    paged.gone = set()
+    paged.selected = None
+    paged.on_count = None
+    paged.refreshing = True
+    paged.scroll_to = lambda first: None
+    return paged
+
+def test_apply_changes_keeps_the_count_from_inserts_and_deletes():
+    now = datetime(2026, 1, 1, 12, 0)
+    paged = refreshing_view(5, 5, rows(5, 4, 3, 2, 1))
+    paged.apply_changes((None, now, None, rows(6), {2}))
+    assert paged.total == 5
+    assert paged.high_key == 6
+    assert keys(paged) == [6, 5, 4, 3, 1]
+    assert paged.since == now - timedelta(seconds=gui.DATA_REFRESH_OVERLAP)
+
+    # the overlap reads the same insert and tombstone again
+    paged.apply_changes((None, now, None, rows(6), {2}))
+    assert paged.total == 5
+
+def test_apply_changes_ignores_rows_inserted_and_deleted_between_refreshes():
+    paged = refreshing_view(5, 5, rows(5, 4, 3, 2, 1))
+    paged.apply_changes((None, datetime.now(), None, rows(7), {6, 7}))
+    assert paged.total == 5
+    assert keys(paged) == [5, 4, 3, 2, 1]
+
+def test_apply_changes_takes_a_recount_as_is():
+    paged = refreshing_view(5, 5, rows(5, 4, 3, 2, 1))
+    paged.apply_changes((4, datetime.now(), 5, [], {2}))
+    assert paged.total == 4
+    assert paged.high_key == 5
+    assert paged.gone == {2}
+
+def test_changed_keys_watches_joined_tables():
+    paged = view([])
+    paged.key, paged.table, paged.changed = 'application_id', 'APPLICATION', 'last_updated'
+    paged.watch = [('CITIZEN', 'citizen_id')]
+    assert paged.changed_keys() == (
+        "SELECT application_id FROM APPLICATION WHERE last_updated >= :since UNION ALL "
+        "SELECT application_id FROM APPLICATION WHERE citizen_id IN "
+        "(SELECT citizen_id FROM CITIZEN WHERE last_updated >= :since)")
+
+def test_fetch_changes_reads_only_the_changes(fake, db):
+    paged = gui.PagedTreeview.__new__(gui.PagedTreeview)
+    paged.db, paged.params, paged.since = db, {}, datetime.now()
+    paged.key, paged.table, paged.changed, paged.watch = 'citizen_id', 'CITIZEN', 'last_updated', ()
+    paged.query = "SELECT citizen_id, national_id FROM CITIZEN ORDER BY citizen_id DESC"
+    fake.touch('CITIZEN', 3)
+    fake.deleted['CITIZEN'] = {17}
+
+    total, now, high, changed, deleted = paged.fetch_changes()
+    assert (total, high) == (None, None)
+    assert [row[0] for row in changed] == [1000, 999, 998]
+    assert deleted == {17}
+    assert {entry['statement'] for entry in db.metrics.snapshot()} == {
+        'server_time', 'view_changes', 'view_deleted_keys'}
+
+    total, now, high, changed, deleted = paged.fetch_changes(recount=True)
+    assert (total, high) == (1000, 1000)
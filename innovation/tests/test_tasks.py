@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+import permit_management_gui as gui
+
+
+class LoopStub:
+    """Stands in for the Tk root: after() callbacks are queued and run by step()"""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def step(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+class DatabaseStub:
+    def __init__(self):
+        self.interrupted = []
+
+    def interrupt(self, thread_id):
+        self.interrupted.append(thread_id)
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+@pytest.fixture
+def loop():
+    return LoopStub()
+
+@pytest.fixture
+def runner(loop):
+    tasks = gui.TaskRunner(loop, DatabaseStub(), workers=1)
+    yield tasks
+    tasks.shutdown()
+
+
+def test_poll_delivers_results_on_the_loop(loop, runner):
+    results = []
+    task = runner.submit(lambda: 42, results.append)
+    task.future.result(timeout=5)
+    assert results == []            # nothing runs until the loop polls
+
+    loop.step()
+    assert results == [42]
+    assert runner.pending == []
+    assert loop.callbacks == []     # polling stops once nothing is pending
+
+def test_poll_routes_errors_to_on_error(loop, runner):
+    errors = []
+
+    def work():
+        raise ValueError("boom")
+
+    task = runner.submit(work, on_error=errors.append)
+    task.future.result(timeout=5)
+    loop.step()
+    assert [str(error) for error in errors] == ["boom"]
+
+def test_poll_keeps_polling_while_tasks_are_pending(loop, runner):
+    release = threading.Event()
+    results = []
+    runner.submit(release.wait, results.append)
+    loop.step()
+    assert results == []
+    assert len(loop.callbacks) == 1
+
+    release.set()
+    wait_for(lambda: not runner.results.empty())
+    loop.step()
+    assert results == [True]
+
+def test_cancel_queued_task_never_runs(loop, runner):
+    release = threading.Event()
+    ran = []
+    blocker = runner.submit(release.wait)
+    queued = runner.submit(lambda: ran.append(1), ran.append)
+
+    runner.cancel(queued)
+    release.set()
+    blocker.future.result(timeout=5)
+    loop.step()
+    assert ran == []
+    assert runner.pending == []
+    assert runner.db.interrupted == []
+
+def test_cancel_running_task_interrupts_and_drops_the_result(loop, runner):
+    started, release = threading.Event(), threading.Event()
+    workers, results, hooks = [], [], []
+
+    def work():
+        workers.append(threading.get_ident())
+        started.set()
+        release.wait(5)
+        return 'late'
+
+    task = runner.submit(work, results.append)
+    started.wait(5)
+    task.on_cancel = lambda: hooks.append(1)
+    runner.cancel(task)
+    assert runner.db.interrupted == workers
+    assert hooks == [1]
+
+    release.set()
+    task.future.result(timeout=5)
+    loop.step()
+    assert results == []
+    assert runner.pending == []
+
+def test_cancel_group_leaves_other_groups(loop, runner):
+    results = []
+    release = threading.Event()
+    runner.submit(release.wait)
+    view = runner.submit(lambda: 'view', results.append, group='view')
+    other = runner.submit(lambda: 'other', results.append, group='report')
+
+    runner.cancel_group('view')
+    release.set()
+    other.future.result(timeout=5)
+    loop.step()
+    assert view.cancelled
+    assert results == ['other']
@@ -1,49 +1,50 @@
 CREATE SEQUENCE seq_citizen_id
   START WITH 1000
   INCREMENT BY 1
-  NOCACHE
+  CACHE 100   -- registration drives insert citizens in bursts
   NOCYCLE;
   
   CREATE SEQUENCE seq_permit_type_id
   START WITH 100
   INCREMENT BY 1
-  NOCACHE
+  CACHE 20   -- reference data, rarely inserted
   NOCYCLE;
   
   CREATE SEQUENCE seq_department_id
   START WITH 10
   INCREMENT BY 1
-  NOCACHE
+  CACHE 20   -- reference data, rarely inserted
   NOCYCLE;
   
   CREATE SEQUENCE seq_application_id
   START WITH 10000
   INCREMENT BY 1
-  NOCACHE
+  CACHE 1000   -- highest insert rate; gaps are harmless for surrogate keys
   NOCYCLE;
   
   CREATE SEQUENCE seq_review_step_id
   START WITH 1
   INCREMENT BY 1
-  NOCACHE
+  CACHE 1000   -- several review steps per application
   NOCYCLE;
   
   CREATE SEQUENCE seq_license_id
   START WITH 1000
   INCREMENT BY 1
-  NOCACHE
+  CACHE 500   -- one per approved application
   NOCYCLE;
   
   CREATE SEQUENCE seq_document_id
   START WITH 1
   INCREMENT BY 1
-  NOCACHE
+  CACHE 1000   -- several documents per application
   NOCYCLE;
   
   CREATE SEQUENCE seq_application_number
   START WITH 20250001
   INCREMENT BY 1
-  NOCACHE
+  CACHE 1000
+  ORDER   -- ORDER keeps public numbers in issue order across instances
   NOCYCLE;
   
   
@@ -59,6 +60,17 @@ CREATE SEQUENCE seq_citizen_id
   
   
   
+  -- Existing databases: resize the caches in place (values already issued are kept)
+  ALTER SEQUENCE seq_citizen_id CACHE 100;
+  ALTER SEQUENCE seq_permit_type_id CACHE 20;
+  ALTER SEQUENCE seq_department_id CACHE 20;
+  ALTER SEQUENCE seq_application_id CACHE 1000;
+  ALTER SEQUENCE seq_review_step_id CACHE 1000;
+  ALTER SEQUENCE seq_license_id CACHE 500;
+  ALTER SEQUENCE seq_document_id CACHE 1000;
+  ALTER SEQUENCE seq_application_number CACHE 1000 ORDER;
+  
+  
   -- Check current sequence values
 SELECT 
     sequence_name,
@@ -23,6 +23,11 @@ CREATE TABLE citizen (
 CREATE INDEX idx_citizen_lastname ON citizen(last_name) TABLESPACE PERMIT_IDX;
 CREATE INDEX idx_citizen_status ON citizen(status) TABLESPACE PERMIT_IDX;
 CREATE INDEX idx_citizen_residency ON citizen(residency_status) TABLESPACE PERMIT_IDX;
+-- Type-ahead pickers: case-insensitive name prefixes and phone prefixes
+-- (national_id prefixes use uk_citizen_national_id)
+CREATE INDEX idx_citizen_last_upper ON citizen(UPPER(last_name)) TABLESPACE PERMIT_IDX;
+CREATE INDEX idx_citizen_first_upper ON citizen(UPPER(first_name)) TABLESPACE PERMIT_IDX;
+CREATE INDEX idx_citizen_phone ON citizen(phone) TABLESPACE PERMIT_IDX;
 
 
 
@@ -144,12 +144,13 @@ BEGIN
     -- Calculate estimated completion date
     v_completion_date := SYSDATE + v_estimated_days;
     
-    -- Get the next sequence value first
-    SELECT seq_application_id.NEXTVAL INTO v_next_seq_val FROM DUAL;
+    -- Surrogate key from the cached sequence (gaps are harmless)
+    v_next_seq_val := seq_application_id.NEXTVAL;
     
-    -- Generate application number (format: APP-YYYY-NNNNNN)
+    -- Generate application number (format: APP-YYYY-NNNNNNNN) from the
+    -- cached ORDER sequence: numbers are issued in order, gaps are tolerated
     v_app_number := 'APP-' || TO_CHAR(SYSDATE, 'YYYY') || '-' || 
-                    LPAD(v_next_seq_val, 6, '0');
+                    LPAD(seq_application_number.NEXTVAL, 8, '0');
     
     -- Insert application
     INSERT INTO application (
@@ -528,27 +529,40 @@ END sp_complete_review_step;
 
 
 -- ============================================================================
--- PROCEDURE 7: Bulk Update Status (with cursor)
+-- PROCEDURE 7: Bulk Update Status (set-based, chunked)
 -- Purpose: Update status for multiple applications matching criteria
--- Parameters: IN (old_status, new_status), OUT (count_updated)
+-- Parameters: IN (old_status, new_status, chunk_size, max_rows, commit_each_chunk),
+--             OUT (count_updated, updated_ids)
+-- Each chunk is one UPDATE ... RETURNING BULK COLLECT. By default the whole
+-- run is one transaction, committed at the end and rolled back entirely on
+-- error. With p_commit_each_chunk = 'Y' every chunk is committed, so undo
+-- stays bounded by p_chunk_size rows, but an error then rolls back only the
+-- failing chunk: earlier chunks stay committed and, since the error is raised,
+-- the OUT values are not returned. Updated rows leave p_old_status, so calling
+-- again finishes the remaining rows. p_max_rows stops after that many rows,
+-- letting a client call once per chunk and report progress.
 -- ============================================================================
 
+CREATE OR REPLACE TYPE t_id_list AS TABLE OF NUMBER;
+/
+
 CREATE OR REPLACE PROCEDURE sp_bulk_update_status (
     p_old_status        IN VARCHAR2,
     p_new_status        IN VARCHAR2,
     p_days_in_status    IN NUMBER DEFAULT 30,
-    p_count_updated     OUT NUMBER
+    p_count_updated     OUT NUMBER,
+    p_updated_ids       OUT t_id_list,
+    p_chunk_size        IN NUMBER DEFAULT 5000,
+    p_max_rows          IN NUMBER DEFAULT NULL,
+    p_commit_each_chunk IN CHAR DEFAULT 'N'
 ) AS
-    CURSOR c_applications IS
-        SELECT application_id, application_number
-        FROM application
-        WHERE status = p_old_status
-        AND last_updated < SYSDATE - p_days_in_status;
-    
-    v_app_id NUMBER;
-    v_app_num VARCHAR2(30);
+    v_cutoff DATE := SYSDATE - p_days_in_status;
+    v_note VARCHAR2(200);
+    v_limit NUMBER;
+    v_chunk_ids t_id_list;
 BEGIN
     p_count_updated := 0;
+    p_updated_ids := t_id_list();
     
     -- Validate status values
     IF p_new_status NOT IN ('Submitted', 'Under Review', 'Documentation Required', 
@@ -556,23 +570,47 @@ BEGIN
         RAISE_APPLICATION_ERROR(-20015, 'Invalid new status: ' || p_new_status);
     END IF;
     
-    OPEN c_applications;
+    IF p_new_status = p_old_status THEN
+        RETURN;
+    END IF;
+    
+    IF NVL(p_chunk_size, 0) < 1 THEN
+        RAISE_APPLICATION_ERROR(-20016, 'Chunk size must be at least 1');
+    END IF;
+    
+    v_note := CHR(10) || TO_CHAR(SYSDATE, 'YYYY-MM-DD HH24:MI:SS') || 
+              ': Bulk status update from ' || p_old_status || ' to ' || p_new_status;
+    
     LOOP
-        FETCH c_applications INTO v_app_id, v_app_num;
-        EXIT WHEN c_applications%NOTFOUND;
+        v_limit := p_chunk_size;
+        IF p_max_rows IS NOT NULL THEN
+            v_limit := LEAST(v_limit, p_max_rows - p_count_updated);
+        END IF;
+        EXIT WHEN v_limit <= 0;
         
+        -- Updated rows leave the old status, so the next chunk picks up fresh rows
         UPDATE application
         SET status = p_new_status,
             last_updated = SYSDATE,
-            notes = COALESCE(notes, '') || CHR(10) || TO_CHAR(SYSDATE, 'YYYY-MM-DD HH24:MI:SS') || 
-                    ': Bulk status update from ' || p_old_status || ' to ' || p_new_status
-        WHERE application_id = v_app_id;
+            notes = COALESCE(notes, '') || v_note
+        WHERE status = p_old_status
+        AND last_updated < v_cutoff
+        AND ROWNUM <= v_limit
+        RETURNING application_id BULK COLLECT INTO v_chunk_ids;
+        
+        IF p_commit_each_chunk = 'Y' THEN
+            COMMIT;
+        END IF;
         
-        p_count_updated := p_count_updated + 1;
+        -- appended in place; MULTISET UNION ALL would copy the whole list every chunk
+        p_updated_ids.EXTEND(v_chunk_ids.COUNT);
+        FOR i IN 1 .. v_chunk_ids.COUNT LOOP
+            p_updated_ids(p_count_updated + i) := v_chunk_ids(i);
+        END LOOP;
+        p_count_updated := p_count_updated + v_chunk_ids.COUNT;
         
-        DBMS_OUTPUT.PUT_LINE('Updated: ' || v_app_num || ' (ID: ' || v_app_id || ')');
+        EXIT WHEN v_chunk_ids.COUNT < v_limit;
     END LOOP;
-    CLOSE c_applications;
     
     COMMIT;
     
@@ -580,9 +618,6 @@ BEGIN
     
 EXCEPTION
     WHEN OTHERS THEN
-        IF c_applications%ISOPEN THEN
-            CLOSE c_applications;
-        END IF;
         ROLLBACK;
         RAISE_APPLICATION_ERROR(-20099, 'Error in bulk update: ' || SQLERRM);
 END sp_bulk_update_status;
@@ -813,6 +848,7 @@ END;
 -- Test 6: Bulk update
 DECLARE
     v_count_updated NUMBER;
+    v_updated_ids t_id_list;
     v_test_app_id NUMBER;
 BEGIN
     -- Get our test application
@@ -840,10 +876,13 @@ BEGIN
         p_old_status => 'Submitted',
         p_new_status => 'On Hold',
         p_days_in_status => 1,
-        p_count_updated => v_count_updated
+        p_count_updated => v_count_updated,
+        p_updated_ids => v_updated_ids,
+        p_chunk_size => 500
     );
     
-    DBMS_OUTPUT.PUT_LINE('Test 6 PASSED: Bulk update executed. Records updated: ' || v_count_updated);
+    DBMS_OUTPUT.PUT_LINE('Test 6 PASSED: Bulk update executed. Records updated: ' || v_count_updated ||
+                         ', IDs returned: ' || v_updated_ids.COUNT);
 EXCEPTION
     WHEN NO_DATA_FOUND THEN
         DBMS_OUTPUT.PUT_LINE('Test 6 SKIPPED: No test application found for bulk update');
@@ -18,6 +18,18 @@ CREATE OR REPLACE PACKAGE pkg_application_mgmt AS
         p_application_id    OUT NUMBER
     );
     
+    -- Batch intake: row k of the inputs yields p_application_ids(k) and
+    -- p_app_numbers(k), or p_errors(k) when that row was rejected
+    PROCEDURE submit_applications (
+        p_citizen_ids       IN  t_id_list,
+        p_permit_type_ids   IN  t_id_list,
+        p_priority_levels   IN  SYS.ODCIVARCHAR2LIST,
+        p_notes             IN  SYS.ODCIVARCHAR2LIST,
+        p_application_ids   OUT t_id_list,
+        p_app_numbers       OUT SYS.ODCIVARCHAR2LIST,
+        p_errors            OUT SYS.ODCIVARCHAR2LIST
+    );
+    
     PROCEDURE update_status (
         p_application_id    IN NUMBER,
         p_new_status        IN VARCHAR2,
@@ -62,8 +74,8 @@ CREATE OR REPLACE PACKAGE BODY pkg_application_mgmt AS
         v_days NUMBER;
         v_next_seq NUMBER;
     BEGIN
-        -- Get the next sequence value first
-        SELECT seq_application_id.NEXTVAL INTO v_next_seq FROM DUAL;
+        -- Surrogate key from the cached sequence (gaps are harmless)
+        v_next_seq := seq_application_id.NEXTVAL;
         
         -- Get permit details
         SELECT processing_fee, estimated_days
@@ -71,9 +83,9 @@ CREATE OR REPLACE PACKAGE BODY pkg_application_mgmt AS
         FROM permit_type
         WHERE permit_type_id = p_permit_type_id;
         
-        -- Generate application number
+        -- Generate application number from the cached ORDER sequence
         v_app_number := 'APP-' || TO_CHAR(SYSDATE, 'YYYY') || '-' || 
-                        LPAD(v_next_seq, 6, '0');
+                        LPAD(seq_application_number.NEXTVAL, 8, '0');
         
         -- Insert application
         INSERT INTO application (
@@ -91,6 +103,116 @@ CREATE OR REPLACE PACKAGE BODY pkg_application_mgmt AS
         DBMS_OUTPUT.PUT_LINE('Application submitted: ' || v_app_number);
     END submit_application;
     
+    -- Submit a batch of applications: set-based validation, one fee lookup
+    -- per batch and a single FORALL insert
+    PROCEDURE submit_applications (
+        p_citizen_ids       IN  t_id_list,
+        p_permit_type_ids   IN  t_id_list,
+        p_priority_levels   IN  SYS.ODCIVARCHAR2LIST,
+        p_notes             IN  SYS.ODCIVARCHAR2LIST,
+        p_application_ids   OUT t_id_list,
+        p_app_numbers       OUT SYS.ODCIVARCHAR2LIST,
+        p_errors            OUT SYS.ODCIVARCHAR2LIST
+    ) AS
+        TYPE t_flags IS TABLE OF BOOLEAN INDEX BY PLS_INTEGER;
+        TYPE t_amounts IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+        TYPE t_numbers IS TABLE OF NUMBER;
+        TYPE t_rows IS TABLE OF PLS_INTEGER;
+        
+        e_bulk_errors EXCEPTION;
+        PRAGMA EXCEPTION_INIT(e_bulk_errors, -24381);
+        
+        v_count PLS_INTEGER := p_citizen_ids.COUNT;
+        v_active_citizens t_flags;
+        v_permit_fees t_amounts;
+        v_permit_days t_amounts;
+        v_found_ids t_numbers;
+        v_found_fees t_numbers;
+        v_found_days t_numbers;
+        v_fees t_amounts;
+        v_days t_amounts;
+        v_rows t_rows := t_rows();   -- positions of the rows that passed validation
+        v_row PLS_INTEGER;
+        v_failed PLS_INTEGER := 0;
+    BEGIN
+        p_application_ids := t_id_list();
+        p_app_numbers := SYS.ODCIVARCHAR2LIST();
+        p_errors := SYS.ODCIVARCHAR2LIST();
+        p_application_ids.EXTEND(v_count);
+        p_app_numbers.EXTEND(v_count);
+        p_errors.EXTEND(v_count);
+        
+        -- Validate every citizen of the batch in one query
+        SELECT citizen_id BULK COLLECT INTO v_found_ids
+        FROM citizen
+        WHERE status = 'Active'
+        AND citizen_id IN (SELECT column_value FROM TABLE(p_citizen_ids));
+        
+        FOR i IN 1 .. v_found_ids.COUNT LOOP
+            v_active_citizens(v_found_ids(i)) := TRUE;
+        END LOOP;
+        
+        -- Fee and processing time of each permit type in the batch, read once
+        SELECT permit_type_id, processing_fee, estimated_days
+        BULK COLLECT INTO v_found_ids, v_found_fees, v_found_days
+        FROM permit_type
+        WHERE is_active = 'Y'
+        AND permit_type_id IN (SELECT column_value FROM TABLE(p_permit_type_ids));
+        
+        FOR i IN 1 .. v_found_ids.COUNT LOOP
+            v_permit_fees(v_found_ids(i)) := v_found_fees(i);
+            v_permit_days(v_found_ids(i)) := v_found_days(i);
+        END LOOP;
+        
+        FOR i IN 1 .. v_count LOOP
+            IF p_citizen_ids(i) IS NULL OR NOT v_active_citizens.EXISTS(p_citizen_ids(i)) THEN
+                p_errors(i) := 'Invalid or inactive citizen ID: ' || p_citizen_ids(i);
+            ELSIF p_permit_type_ids(i) IS NULL OR NOT v_permit_fees.EXISTS(p_permit_type_ids(i)) THEN
+                p_errors(i) := 'Invalid or inactive permit type ID: ' || p_permit_type_ids(i);
+            ELSE
+                v_rows.EXTEND;
+                v_rows(v_rows.LAST) := i;
+                v_fees(i) := v_permit_fees(p_permit_type_ids(i));
+                v_days(i) := v_permit_days(p_permit_type_ids(i));
+                p_application_ids(i) := seq_application_id.NEXTVAL;
+                p_app_numbers(i) := 'APP-' || TO_CHAR(SYSDATE, 'YYYY') || '-' || 
+                                    LPAD(seq_application_number.NEXTVAL, 8, '0');
+            END IF;
+        END LOOP;
+        
+        BEGIN
+            FORALL i IN VALUES OF v_rows SAVE EXCEPTIONS
+                INSERT INTO application (
+                    application_id, citizen_id, permit_type_id, application_number,
+                    status, priority_level, payment_amount, payment_status,
+                    submission_date, last_updated, estimated_completion, notes
+                ) VALUES (
+                    p_application_ids(i), p_citizen_ids(i), p_permit_type_ids(i), p_app_numbers(i),
+                    'Submitted', NVL(p_priority_levels(i), 'Normal'), v_fees(i), 'Pending',
+                    SYSDATE, SYSDATE, SYSDATE + v_days(i), p_notes(i)
+                );
+        EXCEPTION
+            WHEN e_bulk_errors THEN
+                -- ERROR_INDEX counts FORALL iterations, i.e. positions in v_rows
+                v_failed := SQL%BULK_EXCEPTIONS.COUNT;
+                FOR e IN 1 .. v_failed LOOP
+                    v_row := v_rows(SQL%BULK_EXCEPTIONS(e).ERROR_INDEX);
+                    p_errors(v_row) := SQLERRM(-SQL%BULK_EXCEPTIONS(e).ERROR_CODE);
+                    p_application_ids(v_row) := NULL;
+                    p_app_numbers(v_row) := NULL;
+                END LOOP;
+        END;
+        
+        COMMIT;
+        
+        DBMS_OUTPUT.PUT_LINE('Batch submitted: ' || (v_rows.COUNT - v_failed) || 
+                             ' of ' || v_count || ' applications');
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE_APPLICATION_ERROR(-20099, 'Error submitting application batch: ' || SQLERRM);
+    END submit_applications;
+    
     -- Update application status
     PROCEDURE update_status (
         p_application_id    IN NUMBER,
@@ -216,6 +338,56 @@ END pkg_application_mgmt;
 
 
 
+-- ============================================================================
+-- REVENUE SUMMARY: Fast-refresh materialized view
+-- Purpose: Keep revenue per (month, permit type, payment status) at most five
+--          minutes behind APPLICATION, so revenue reports never scan it
+-- Requires: CREATE MATERIALIZED VIEW privilege
+-- Refreshing on demand from a schedule keeps the refresh out of the commits of
+-- bulk updates, batch submissions and bulk loads; ON COMMIT would make every
+-- one of them maintain the view and serialize on its refresh
+-- ============================================================================
+
+-- Change log used for incremental (fast) refresh
+CREATE MATERIALIZED VIEW LOG ON application
+    WITH ROWID, SEQUENCE (submission_date, permit_type_id, payment_status, payment_amount)
+    INCLUDING NEW VALUES;
+
+-- COUNT(payment_amount) is required for SUM to be fast-refreshable
+CREATE MATERIALIZED VIEW mv_revenue_summary
+    TABLESPACE PERMIT_DATA
+    BUILD IMMEDIATE
+    REFRESH FAST ON DEMAND
+    START WITH SYSDATE NEXT SYSDATE + 5/1440
+AS
+SELECT 
+    TRUNC(submission_date, 'MM') AS revenue_month,
+    permit_type_id,
+    payment_status,
+    COUNT(*) AS application_count,
+    SUM(payment_amount) AS total_amount,
+    COUNT(payment_amount) AS amount_count
+FROM application
+GROUP BY TRUNC(submission_date, 'MM'), permit_type_id, payment_status;
+
+CREATE INDEX idx_revenue_summary_month 
+    ON mv_revenue_summary(revenue_month, payment_status) TABLESPACE PERMIT_IDX;
+
+-- Verify the view is fast-refreshable and see when it last refreshed
+-- (refresh now with: EXEC DBMS_MVIEW.REFRESH('MV_REVENUE_SUMMARY', 'F');)
+SELECT mview_name, refresh_mode, refresh_method, fast_refreshable, staleness,
+       last_refresh_end_time
+FROM user_mviews
+WHERE mview_name = 'MV_REVENUE_SUMMARY';
+
+
+
+
+
+
+
+
+
 -- ============================================================================
 -- PACKAGE 2: Analytics Package
 -- Purpose: Provide analytical functions and reports
@@ -241,6 +413,10 @@ CREATE OR REPLACE PACKAGE pkg_analytics AS
         p_department_id IN NUMBER
     ) RETURN NUMBER;
     
+    -- All active departments in one call:
+    -- (department_id, department_name, score, pending_reviews)
+    FUNCTION get_all_department_performance RETURN SYS_REFCURSOR;
+    
     FUNCTION get_top_permit_types (
         p_limit IN NUMBER DEFAULT 5
     ) RETURN SYS_REFCURSOR;
@@ -251,22 +427,25 @@ END pkg_analytics;
 -- Package Body
 CREATE OR REPLACE PACKAGE BODY pkg_analytics AS
     
-    -- Get monthly revenue (pipelined function)
+    -- Get monthly revenue (pipelined function, read from mv_revenue_summary;
+    -- the figures may trail APPLICATION by up to the view's 5-minute refresh)
     FUNCTION get_monthly_revenue (
         p_year IN NUMBER DEFAULT EXTRACT(YEAR FROM SYSDATE)
     ) RETURN t_revenue_table PIPELINED AS
         v_rec t_revenue_rec;
+        v_year_start DATE := TO_DATE(TO_CHAR(p_year) || '0101', 'YYYYMMDD');
     BEGIN
         FOR rec IN (
             SELECT 
-                TO_CHAR(submission_date, 'YYYY-MM') AS month,
-                SUM(payment_amount) AS total_revenue,
-                COUNT(*) AS application_count
-            FROM application
-            WHERE EXTRACT(YEAR FROM submission_date) = p_year
+                TO_CHAR(revenue_month, 'YYYY-MM') AS month,
+                SUM(total_amount) AS total_revenue,
+                SUM(application_count) AS application_count
+            FROM mv_revenue_summary
+            WHERE revenue_month >= v_year_start
+            AND revenue_month < ADD_MONTHS(v_year_start, 12)
             AND payment_status = 'Paid'
-            GROUP BY TO_CHAR(submission_date, 'YYYY-MM')
-            ORDER BY month
+            GROUP BY revenue_month
+            ORDER BY revenue_month
         ) LOOP
             v_rec.month := rec.month;
             v_rec.total_revenue := rec.total_revenue;
@@ -311,6 +490,46 @@ CREATE OR REPLACE PACKAGE BODY pkg_analytics AS
         RETURN ROUND(LEAST(v_score, 100), 2); -- Cap at 100
     END get_department_performance;
     
+    -- Get performance score and pending reviews for every active department
+    -- (same scoring as get_department_performance, one pass over review_step)
+    FUNCTION get_all_department_performance RETURN SYS_REFCURSOR AS
+        v_cursor SYS_REFCURSOR;
+    BEGIN
+        OPEN v_cursor FOR
+            SELECT 
+                d.department_id,
+                d.department_name,
+                CASE 
+                    WHEN NVL(r.total_reviews, 0) = 0 THEN 0
+                    ELSE ROUND(LEAST(
+                        ((r.completed / r.total_reviews) * 70) + 
+                        (CASE 
+                            WHEN r.avg_time = 0 THEN 30
+                            WHEN r.avg_time < 1000 THEN 25
+                            WHEN r.avg_time < 5000 THEN 20
+                            WHEN r.avg_time < 10000 THEN 10
+                            ELSE 5
+                        END), 100), 2)
+                END AS score,
+                NVL(r.pending_reviews, 0) AS pending_reviews
+            FROM department d
+            LEFT JOIN (
+                SELECT 
+                    department_id,
+                    COUNT(*) AS total_reviews,
+                    SUM(CASE WHEN step_status = 'Completed' THEN 1 ELSE 0 END) AS completed,
+                    AVG(NVL(processing_time, 0)) AS avg_time,
+                    SUM(CASE WHEN step_status IN ('In Progress', 'Pending', 'Awaiting Review') 
+                             THEN 1 ELSE 0 END) AS pending_reviews
+                FROM review_step
+                GROUP BY department_id
+            ) r ON r.department_id = d.department_id
+            WHERE d.is_active = 'Y'
+            ORDER BY d.department_name;
+        
+        RETURN v_cursor;
+    END get_all_department_performance;
+    
     -- Get top permit types by application count (FIXED - removed category column)
     FUNCTION get_top_permit_types (
         p_limit IN NUMBER DEFAULT 5
@@ -509,6 +728,9 @@ PROMPT =========================================================================
 -- Test Application Management Package
 DECLARE
     v_app_id NUMBER;
+    v_app_ids t_id_list;
+    v_app_numbers SYS.ODCIVARCHAR2LIST;
+    v_errors SYS.ODCIVARCHAR2LIST;
     v_count NUMBER;
     v_rate NUMBER;
     v_citizen_id NUMBER;
@@ -531,6 +753,21 @@ BEGIN
     );
     DBMS_OUTPUT.PUT_LINE('Submitted Application ID: ' || v_app_id);
     
+    -- Test batch submission: one valid row and one rejected row
+    pkg_application_mgmt.submit_applications(
+        p_citizen_ids => t_id_list(v_citizen_id, -1),
+        p_permit_type_ids => t_id_list(v_permit_id, v_permit_id),
+        p_priority_levels => SYS.ODCIVARCHAR2LIST('Normal', 'High'),
+        p_notes => SYS.ODCIVARCHAR2LIST('Batch test from package', NULL),
+        p_application_ids => v_app_ids,
+        p_app_numbers => v_app_numbers,
+        p_errors => v_errors
+    );
+    FOR i IN 1 .. v_app_ids.COUNT LOOP
+        DBMS_OUTPUT.PUT_LINE('Batch row ' || i || ': ' || 
+                             NVL(v_app_numbers(i), 'rejected - ' || v_errors(i)));
+    END LOOP;
+    
     -- Test get application count
     v_count := pkg_application_mgmt.get_application_count(v_citizen_id);
     DBMS_OUTPUT.PUT_LINE('Total applications for citizen: ' || v_count);
@@ -601,6 +838,26 @@ BEGIN
     END LOOP;
 END;
 /
+
+-- Test all-department performance (single call)
+DECLARE
+    v_cursor SYS_REFCURSOR;
+    v_dept_id NUMBER;
+    v_dept_name VARCHAR2(100);
+    v_score NUMBER;
+    v_pending NUMBER;
+BEGIN
+    DBMS_OUTPUT.PUT_LINE('All Department Performance:');
+    v_cursor := pkg_analytics.get_all_department_performance;
+    LOOP
+        FETCH v_cursor INTO v_dept_id, v_dept_name, v_score, v_pending;
+        EXIT WHEN v_cursor%NOTFOUND;
+        DBMS_OUTPUT.PUT_LINE('  ' || v_dept_name || ': ' || v_score || '/100, ' || 
+                            v_pending || ' pending reviews');
+    END LOOP;
+    CLOSE v_cursor;
+END;
+/
 -- Test top permit types
 DECLARE
     v_cursor SYS_REFCURSOR;
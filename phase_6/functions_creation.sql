@@ -282,4 +282,89 @@ EXCEPTION
     WHEN NO_DATA_FOUND THEN RETURN NULL;
     WHEN OTHERS THEN RETURN -1;
 END fn_calculate_citizen_age;
-/
\ No newline at end of file
+/
+
+-- ADDITIONAL FUNCTION: Eligibility Matrix
+-- Applies the fn_validate_eligibility rules to every (citizen, permit type)
+-- pair in one set-based query instead of up to five queries per pair.
+-- p_permit_type_ids NULL or empty = all permit types.
+-- Usage: SELECT * FROM TABLE(fn_eligibility_matrix(t_id_list(1000, 1001)));
+CREATE OR REPLACE TYPE t_eligibility_row AS OBJECT (
+    citizen_id      NUMBER,
+    permit_type_id  NUMBER,
+    permit_name     VARCHAR2(100),
+    verdict         VARCHAR2(20),
+    reason          VARCHAR2(300)
+);
+/
+
+CREATE OR REPLACE TYPE t_eligibility_table AS TABLE OF t_eligibility_row;
+/
+
+CREATE OR REPLACE FUNCTION fn_eligibility_matrix (
+    p_citizen_ids       IN t_id_list,
+    p_permit_type_ids   IN t_id_list DEFAULT NULL
+) RETURN t_eligibility_table PIPELINED AS
+BEGIN
+    FOR r IN (
+        WITH cit AS (
+            SELECT ids.citizen_id, c.status, c.residency_status,
+                   FLOOR(MONTHS_BETWEEN(SYSDATE, c.date_of_birth) / 12) AS age
+            FROM (SELECT DISTINCT column_value AS citizen_id FROM TABLE(p_citizen_ids)) ids
+            LEFT JOIN citizen c ON c.citizen_id = ids.citizen_id
+        ),
+        prm AS (
+            SELECT permit_type_id, permit_name, is_active
+            FROM permit_type
+            WHERE NVL(CARDINALITY(p_permit_type_ids), 0) = 0
+               OR permit_type_id IN (SELECT column_value FROM TABLE(p_permit_type_ids))
+        ),
+        pending AS (
+            SELECT citizen_id, permit_type_id, COUNT(*) AS pending_count
+            FROM application
+            WHERE citizen_id IN (SELECT column_value FROM TABLE(p_citizen_ids))
+            AND status IN ('Submitted', 'Under Review', 'Documentation Required')
+            GROUP BY citizen_id, permit_type_id
+        ),
+        licensed AS (
+            SELECT DISTINCT a.citizen_id, a.permit_type_id
+            FROM issued_license il
+            JOIN application a ON il.application_id = a.application_id
+            WHERE a.citizen_id IN (SELECT column_value FROM TABLE(p_citizen_ids))
+            AND il.license_status = 'Active'
+            AND il.expiration_date > SYSDATE
+        )
+        SELECT cit.citizen_id, prm.permit_type_id, prm.permit_name,
+               CASE
+                   WHEN cit.status IS NULL THEN 
+                       'Citizen or Permit Type not found'
+                   WHEN cit.status != 'Active' THEN 
+                       'Citizen status is ' || cit.status
+                   WHEN prm.is_active != 'Y' THEN 
+                       'Permit type "' || prm.permit_name || '" is inactive'
+                   WHEN cit.age < 18 THEN 
+                       'Minimum age requirement is 18. Current age: ' || cit.age
+                   WHEN UPPER(prm.permit_name) LIKE '%BUSINESS%'
+                        AND cit.residency_status NOT IN ('Citizen', 'Permanent Resident') THEN
+                       prm.permit_name || ' requires Citizen or Permanent Resident status. Current: ' || 
+                       cit.residency_status
+                   WHEN pending.pending_count > 0 THEN 
+                       'Has ' || pending.pending_count || ' pending application(s) for "' || 
+                       prm.permit_name || '"'
+                   WHEN licensed.citizen_id IS NOT NULL THEN 
+                       'Already has an active "' || prm.permit_name || '" license'
+               END AS reason
+        FROM cit
+        CROSS JOIN prm
+        LEFT JOIN pending ON pending.citizen_id = cit.citizen_id 
+                         AND pending.permit_type_id = prm.permit_type_id
+        LEFT JOIN licensed ON licensed.citizen_id = cit.citizen_id 
+                          AND licensed.permit_type_id = prm.permit_type_id
+        ORDER BY cit.citizen_id, prm.permit_type_id
+    ) LOOP
+        PIPE ROW (t_eligibility_row(r.citizen_id, r.permit_type_id, r.permit_name,
+                                    NVL2(r.reason, 'NOT_ELIGIBLE', 'ELIGIBLE'), r.reason));
+    END LOOP;
+    RETURN;
+END fn_eligibility_matrix;
+/
@@ -386,6 +386,21 @@ BEGIN
 END;
 /
 
+-- Test 4b: Eligibility matrix (every permit type for two citizens in one query)
+DECLARE
+    v_first_citizen_id NUMBER;
+BEGIN
+    SELECT MIN(citizen_id) INTO v_first_citizen_id FROM citizen;
+    
+    DBMS_OUTPUT.PUT_LINE('Test 4b: Eligibility Matrix');
+    FOR rec IN (SELECT * FROM TABLE(fn_eligibility_matrix(t_id_list(v_first_citizen_id, v_first_citizen_id + 1)))) LOOP
+        DBMS_OUTPUT.PUT_LINE(rec.citizen_id || ' / ' || rec.permit_name || ': ' || 
+                             rec.verdict || NVL2(rec.reason, ' - ' || rec.reason, ''));
+    END LOOP;
+    DBMS_OUTPUT.PUT_LINE('');
+END;
+/
+
 -- Test 5: Calculate IPEI
 BEGIN
     DBMS_OUTPUT.PUT_LINE('Test 5: Calculate IPEI');
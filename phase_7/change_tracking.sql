@@ -0,0 +1,123 @@
+CONNECT gakuba/Kim@localhost:1521/thu_27670_kim_permit_db;
+SET SERVEROUTPUT ON;
+
+PROMPT ============================================================================
+PROMPT PHASE VII: CHANGE TRACKING FOR THE GUI DATA VIEWS
+PROMPT ============================================================================
+
+-- The GUI data views refresh by fetching only the rows changed since their
+-- last refresh. Every table they show gets an indexed last_updated column kept
+-- current by a trigger, and deletes leave a tombstone in DELETED_ROWS, so a
+-- refresh costs index range scans proportional to the rows that changed
+-- instead of a scan of the table. Run after triggers.sql.
+
+-- ============================================================================
+-- STEP 1: LAST_UPDATED MARKERS
+-- ============================================================================
+
+PROMPT Adding last_updated columns...
+
+-- APPLICATION already has last_updated
+ALTER TABLE citizen ADD last_updated DATE DEFAULT SYSDATE NOT NULL;
+ALTER TABLE permit_type ADD last_updated DATE DEFAULT SYSDATE NOT NULL;
+ALTER TABLE department ADD last_updated DATE DEFAULT SYSDATE NOT NULL;
+ALTER TABLE issued_license ADD last_updated DATE DEFAULT SYSDATE NOT NULL;
+ALTER TABLE review_step ADD last_updated DATE DEFAULT SYSDATE NOT NULL;
+ALTER TABLE document ADD last_updated DATE DEFAULT SYSDATE NOT NULL;
+ALTER TABLE holidays ADD last_updated DATE DEFAULT SYSDATE NOT NULL;
+ALTER TABLE audit_log ADD last_updated DATE DEFAULT SYSDATE NOT NULL;
+
+PROMPT Indexing last_updated...
+
+CREATE INDEX idx_citizen_last_updated ON citizen(last_updated) TABLESPACE PERMIT_IDX;
+CREATE INDEX idx_permit_last_updated ON permit_type(last_updated) TABLESPACE PERMIT_IDX;
+CREATE INDEX idx_dept_last_updated ON department(last_updated) TABLESPACE PERMIT_IDX;
+CREATE INDEX idx_app_last_updated ON application(last_updated) TABLESPACE PERMIT_IDX;
+CREATE INDEX idx_license_last_updated ON issued_license(last_updated) TABLESPACE PERMIT_IDX;
+CREATE INDEX idx_step_last_updated ON review_step(last_updated) TABLESPACE PERMIT_IDX;
+CREATE INDEX idx_doc_last_updated ON document(last_updated) TABLESPACE PERMIT_IDX;
+CREATE INDEX idx_holiday_last_updated ON holidays(last_updated) TABLESPACE PERMIT_IDX;
+CREATE INDEX idx_audit_last_updated ON audit_log(last_updated) TABLESPACE PERMIT_IDX;
+
+-- ============================================================================
+-- STEP 2: TOMBSTONES FOR DELETED ROWS
+-- ============================================================================
+
+PROMPT Creating DELETED_ROWS table...
+
+CREATE TABLE deleted_rows (
+    table_name  VARCHAR2(30) NOT NULL,
+    row_key     NUMBER(10) NOT NULL,
+    deleted_at  DATE DEFAULT SYSDATE NOT NULL
+);
+
+CREATE INDEX idx_deleted_rows_table ON deleted_rows(table_name, deleted_at) TABLESPACE PERMIT_IDX;
+
+-- A view older than a day reloads instead of refreshing, so older tombstones
+-- are never read
+BEGIN
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name        => 'PURGE_DELETED_ROWS',
+        job_type        => 'PLSQL_BLOCK',
+        job_action      => 'BEGIN DELETE FROM deleted_rows WHERE deleted_at < SYSDATE - 1; COMMIT; END;',
+        repeat_interval => 'FREQ=HOURLY',
+        enabled         => TRUE
+    );
+END;
+/
+
+-- ============================================================================
+-- STEP 3: CHANGE TRACKING TRIGGERS
+-- ============================================================================
+
+PROMPT Creating change tracking triggers...
+
+-- One BEFORE INSERT OR UPDATE and one AFTER DELETE trigger per table.
+-- APPLICATION keeps an explicit last_updated on insert, so loaded history
+-- keeps its dates; every other table's column is only a change marker.
+DECLARE
+    TYPE t_names IS TABLE OF VARCHAR2(30);
+    v_tables t_names := t_names('CITIZEN', 'PERMIT_TYPE', 'DEPARTMENT', 'APPLICATION',
+                                'ISSUED_LICENSE', 'REVIEW_STEP', 'DOCUMENT', 'HOLIDAYS', 'AUDIT_LOG');
+    v_keys t_names := t_names('CITIZEN_ID', 'PERMIT_TYPE_ID', 'DEPARTMENT_ID', 'APPLICATION_ID',
+                              'LICENSE_ID', 'STEP_ID', 'DOCUMENT_ID', 'HOLIDAY_ID', 'AUDIT_ID');
+    v_stamp VARCHAR2(200);
+BEGIN
+    FOR i IN 1 .. v_tables.COUNT LOOP
+        IF v_tables(i) = 'APPLICATION' THEN
+            v_stamp := ':NEW.last_updated := CASE WHEN INSERTING THEN NVL(:NEW.last_updated, SYSDATE) ELSE SYSDATE END;';
+        ELSE
+            v_stamp := ':NEW.last_updated := SYSDATE;';
+        END IF;
+
+        EXECUTE IMMEDIATE
+            'CREATE OR REPLACE TRIGGER trg_' || LOWER(v_tables(i)) || '_stamp ' ||
+            'BEFORE INSERT OR UPDATE ON ' || v_tables(i) || ' FOR EACH ROW ' ||
+            'BEGIN ' || v_stamp || ' END;';
+
+        EXECUTE IMMEDIATE
+            'CREATE OR REPLACE TRIGGER trg_' || LOWER(v_tables(i)) || '_tombstone ' ||
+            'AFTER DELETE ON ' || v_tables(i) || ' FOR EACH ROW ' ||
+            'BEGIN INSERT INTO deleted_rows (table_name, row_key) ' ||
+            'VALUES (''' || v_tables(i) || ''', :OLD.' || v_keys(i) || '); END;';
+
+        DBMS_OUTPUT.PUT_LINE('trg_' || LOWER(v_tables(i)) || '_stamp and _tombstone created.');
+    END LOOP;
+END;
+/
+
+-- ============================================================================
+-- VERIFICATION
+-- ============================================================================
+
+PROMPT Change tracking triggers:
+
+SELECT trigger_name, table_name, status
+FROM user_triggers
+WHERE trigger_name LIKE 'TRG\_%\_STAMP' ESCAPE '\'
+   OR trigger_name LIKE 'TRG\_%\_TOMBSTONE' ESCAPE '\'
+ORDER BY table_name, trigger_name;
+
+-- A refresh should use the last_updated indexes, e.g.
+-- EXPLAIN PLAN FOR SELECT application_id FROM application WHERE last_updated >= SYSDATE - 1/1440;
+-- SELECT * FROM TABLE(DBMS_XPLAN.DISPLAY);
@@ -82,5 +82,5 @@ CREATE TABLE AUDIT_LOG (
 
 PROMPT AUDIT_LOG table created successfully.
 
--- Create sequence for audit_id
-CREATE SEQUENCE audit_log_seq START WITH 1 INCREMENT BY 1;
\ No newline at end of file
+-- Create sequence for audit_id (cached: audit rows are inserted in bulk)
+CREATE SEQUENCE audit_log_seq START WITH 1 INCREMENT BY 1 CACHE 1000;
\ No newline at end of file
@@ -2,8 +2,16 @@
 -- STEP 3: AUDIT LOGGING PROCEDURE
 -- ============================================================================
 
+-- Audit ids are drawn in bulk by trg_application_compound; caching avoids a
+-- dictionary update on every NEXTVAL (gaps after a restart are acceptable)
+ALTER SEQUENCE audit_log_seq CACHE 1000;
+
 PROMPT Creating log_audit_entry procedure...
 
+-- Records DENIED attempts. Runs as an autonomous transaction so the entry
+-- survives the rollback of the rejected statement (a plain COMMIT inside a
+-- trigger fails with ORA-04092). ALLOWED row changes are written set-based by
+-- the compound trigger inside the caller's own transaction instead.
 CREATE OR REPLACE PROCEDURE log_audit_entry(
     p_table_name IN VARCHAR2,
     p_operation IN VARCHAR2,
@@ -13,6 +21,7 @@ CREATE OR REPLACE PROCEDURE log_audit_entry(
     p_old_values IN CLOB DEFAULT NULL,
     p_new_values IN CLOB DEFAULT NULL
 ) AS
+    PRAGMA AUTONOMOUS_TRANSACTION;
 BEGIN
     INSERT INTO AUDIT_LOG (
         audit_id,
@@ -42,6 +51,7 @@ BEGIN
     COMMIT;
 EXCEPTION
     WHEN OTHERS THEN
+        ROLLBACK;
         DBMS_OUTPUT.PUT_LINE('Error logging audit: ' || SQLERRM);
 END log_audit_entry;
 /
@@ -54,12 +64,92 @@ END log_audit_entry;
 -- STEP 4: RESTRICTION CHECK FUNCTION
 -- ============================================================================
 
+PROMPT Creating business calendar...
+
+-- HOLIDAYS is loaded once per session into a collection keyed by Julian day,
+-- so the restriction check runs no SQL in the steady state. Committed changes
+-- to HOLIDAYS bump a version in a global context; every session compares it
+-- with the version it loaded and reloads when they differ.
+CREATE OR REPLACE CONTEXT permit_calendar_ctx USING pkg_business_calendar ACCESSED GLOBALLY;
+
+CREATE OR REPLACE PACKAGE pkg_business_calendar AS
+    FUNCTION is_holiday(p_date IN DATE DEFAULT SYSDATE) RETURN BOOLEAN;
+    
+    -- Forces every session to reload HOLIDAYS on its next check
+    PROCEDURE invalidate;
+    
+    -- Queues invalidate as a DBMS_JOB, once per transaction. Such a job only
+    -- starts after the transaction commits and is discarded on rollback, so no
+    -- session can reload the old holidays under the new version. Called by
+    -- trg_holidays_calendar.
+    PROCEDURE invalidate_after_commit;
+END pkg_business_calendar;
+/
+
+CREATE OR REPLACE PACKAGE BODY pkg_business_calendar AS
+    TYPE t_day_set IS TABLE OF BOOLEAN INDEX BY PLS_INTEGER;
+    
+    g_holidays t_day_set;
+    g_version VARCHAR2(40);
+    g_loaded BOOLEAN := FALSE;
+    g_queued_txn VARCHAR2(100);
+    
+    PROCEDURE load_holidays IS
+        TYPE t_dates IS TABLE OF DATE;
+        v_dates t_dates;
+    BEGIN
+        g_version := SYS_CONTEXT('permit_calendar_ctx', 'version');
+        
+        SELECT holiday_date BULK COLLECT INTO v_dates FROM HOLIDAYS;
+        
+        g_holidays.DELETE;
+        FOR i IN 1 .. v_dates.COUNT LOOP
+            g_holidays(TO_NUMBER(TO_CHAR(v_dates(i), 'J'))) := TRUE;
+        END LOOP;
+        g_loaded := TRUE;
+    END load_holidays;
+    
+    FUNCTION is_holiday(p_date IN DATE DEFAULT SYSDATE) RETURN BOOLEAN IS
+    BEGIN
+        IF NOT g_loaded
+           OR NVL(SYS_CONTEXT('permit_calendar_ctx', 'version'), '-') != NVL(g_version, '-') THEN
+            load_holidays;
+        END IF;
+        RETURN g_holidays.EXISTS(TO_NUMBER(TO_CHAR(p_date, 'J')));
+    END is_holiday;
+    
+    PROCEDURE invalidate IS
+    BEGIN
+        DBMS_SESSION.SET_CONTEXT('permit_calendar_ctx', 'version',
+                                 TO_CHAR(SYSTIMESTAMP, 'YYYYMMDDHH24MISSFF6'));
+        g_loaded := FALSE;
+    END invalidate;
+    
+    PROCEDURE invalidate_after_commit IS
+        v_job BINARY_INTEGER;
+        v_txn VARCHAR2(100) := DBMS_TRANSACTION.LOCAL_TRANSACTION_ID(TRUE);
+    BEGIN
+        IF v_txn = g_queued_txn THEN
+            RETURN;
+        END IF;
+        DBMS_JOB.SUBMIT(v_job, 'pkg_business_calendar.invalidate;');
+        g_queued_txn := v_txn;
+    END invalidate_after_commit;
+END pkg_business_calendar;
+/
+
+CREATE OR REPLACE TRIGGER trg_holidays_calendar
+AFTER INSERT OR UPDATE OR DELETE ON HOLIDAYS
+BEGIN
+    pkg_business_calendar.invalidate_after_commit;
+END;
+/
+
 PROMPT Creating check_operation_allowed function...
 
 CREATE OR REPLACE FUNCTION check_operation_allowed
 RETURN VARCHAR2 AS
     v_day_of_week VARCHAR2(10);
-    v_is_holiday NUMBER;
     v_error_msg VARCHAR2(200);
 BEGIN
     -- Get current day of week
@@ -71,12 +161,8 @@ BEGIN
         RETURN v_error_msg;
     END IF;
     
-    -- Check if today is a public holiday
-    SELECT COUNT(*) INTO v_is_holiday
-    FROM HOLIDAYS
-    WHERE TRUNC(holiday_date) = TRUNC(SYSDATE);
-    
-    IF v_is_holiday > 0 THEN
+    -- Check if today is a public holiday (session-cached calendar)
+    IF pkg_business_calendar.is_holiday(SYSDATE) THEN
         v_error_msg := 'DENIED: Operations not allowed on public holidays';
         RETURN v_error_msg;
     END IF;
@@ -197,20 +283,43 @@ CREATE OR REPLACE TRIGGER trg_application_compound
 FOR INSERT OR UPDATE OR DELETE ON APPLICATION
 COMPOUND TRIGGER
 
-    -- Variables to store operation details
-    TYPE t_operation_rec IS RECORD (
-        operation VARCHAR2(10),
-        application_id NUMBER,
-        old_status VARCHAR2(50),
-        new_status VARCHAR2(50),
-        citizen_id NUMBER
-    );
+    -- Rows buffered before each bulk insert into AUDIT_LOG
+    c_flush_limit CONSTANT PLS_INTEGER := 1000;
+
+    -- Audit values captured per row, one collection per AUDIT_LOG column
+    TYPE t_id_table IS TABLE OF AUDIT_LOG.record_id%TYPE INDEX BY PLS_INTEGER;
+    TYPE t_operation_table IS TABLE OF AUDIT_LOG.operation_type%TYPE INDEX BY PLS_INTEGER;
+    TYPE t_values_table IS TABLE OF VARCHAR2(200) INDEX BY PLS_INTEGER;
     
-    TYPE t_operations_table IS TABLE OF t_operation_rec INDEX BY PLS_INTEGER;
-    v_operations t_operations_table;
-    v_index PLS_INTEGER := 0;
+    v_record_ids t_id_table;
+    v_operations t_operation_table;
+    v_old_values t_values_table;
+    v_new_values t_values_table;
     v_check_result VARCHAR2(200);
 
+    -- Write the buffered rows with one FORALL insert; no commit, so the audit
+    -- rows belong to (and roll back with) the caller's transaction
+    PROCEDURE flush_audit IS
+    BEGIN
+        IF v_record_ids.COUNT = 0 THEN
+            RETURN;
+        END IF;
+        
+        FORALL i IN 1..v_record_ids.COUNT
+            INSERT INTO AUDIT_LOG (
+                audit_id, table_name, operation_type, operation_date, operation_time,
+                username, status, record_id, old_values, new_values
+            ) VALUES (
+                audit_log_seq.NEXTVAL, 'APPLICATION', v_operations(i), SYSDATE, SYSTIMESTAMP,
+                USER, 'ALLOWED', v_record_ids(i), v_old_values(i), v_new_values(i)
+            );
+        
+        v_record_ids.DELETE;
+        v_operations.DELETE;
+        v_old_values.DELETE;
+        v_new_values.DELETE;
+    END flush_audit;
+
     -- BEFORE STATEMENT: Check if operations are allowed
     BEFORE STATEMENT IS
     BEGIN
@@ -231,58 +340,39 @@ COMPOUND TRIGGER
         END IF;
     END BEFORE STATEMENT;
 
-    -- BEFORE EACH ROW: Capture operation details
-    BEFORE EACH ROW IS
+    -- AFTER EACH ROW: Capture operation details once the row change has succeeded
+    AFTER EACH ROW IS
+        v_index PLS_INTEGER := v_record_ids.COUNT + 1;
     BEGIN
-        v_index := v_index + 1;
-        
         IF INSERTING THEN
-            v_operations(v_index).operation := 'INSERT';
-            v_operations(v_index).application_id := :NEW.application_id;
-            v_operations(v_index).new_status := :NEW.status;
-            v_operations(v_index).citizen_id := :NEW.citizen_id;
+            v_operations(v_index) := 'INSERT';
+            v_record_ids(v_index) := :NEW.application_id;
+            v_old_values(v_index) := NULL;
+            v_new_values(v_index) := 'Status: ' || :NEW.status || ', Citizen ID: ' || :NEW.citizen_id;
             
         ELSIF UPDATING THEN
-            v_operations(v_index).operation := 'UPDATE';
-            v_operations(v_index).application_id := :OLD.application_id;
-            v_operations(v_index).old_status := :OLD.status;
-            v_operations(v_index).new_status := :NEW.status;
-            v_operations(v_index).citizen_id := :NEW.citizen_id;
+            v_operations(v_index) := 'UPDATE';
+            v_record_ids(v_index) := :OLD.application_id;
+            v_old_values(v_index) := 'Status: ' || :OLD.status;
+            v_new_values(v_index) := 'Status: ' || :NEW.status || ', Citizen ID: ' || :NEW.citizen_id;
             
         ELSIF DELETING THEN
-            v_operations(v_index).operation := 'DELETE';
-            v_operations(v_index).application_id := :OLD.application_id;
-            v_operations(v_index).old_status := :OLD.status;
-            v_operations(v_index).citizen_id := :OLD.citizen_id;
+            v_operations(v_index) := 'DELETE';
+            v_record_ids(v_index) := :OLD.application_id;
+            v_old_values(v_index) := 'Status: ' || :OLD.status;
+            v_new_values(v_index) := NULL;
+        END IF;
+        
+        -- keep memory flat for very large statements
+        IF v_record_ids.COUNT >= c_flush_limit THEN
+            flush_audit;
         END IF;
-    END BEFORE EACH ROW;
+    END AFTER EACH ROW;
 
-    -- AFTER STATEMENT: Log all successful operations
+    -- AFTER STATEMENT: Log the remaining operations
     AFTER STATEMENT IS
     BEGIN
-        FOR i IN 1..v_operations.COUNT LOOP
-            log_audit_entry(
-                p_table_name => 'APPLICATION',
-                p_operation => v_operations(i).operation,
-                p_status => 'ALLOWED',
-                p_record_id => v_operations(i).application_id,
-                p_old_values => CASE 
-                    WHEN v_operations(i).old_status IS NOT NULL 
-                    THEN 'Status: ' || v_operations(i).old_status 
-                    ELSE NULL 
-                END,
-                p_new_values => CASE 
-                    WHEN v_operations(i).new_status IS NOT NULL 
-                    THEN 'Status: ' || v_operations(i).new_status || 
-                         ', Citizen ID: ' || v_operations(i).citizen_id 
-                    ELSE NULL 
-                END
-            );
-        END LOOP;
-        
-        -- Clear the collection
-        v_operations.DELETE;
-        v_index := 0;
+        flush_audit;
     END AFTER STATEMENT;
 
 END trg_application_compound;